@@ -114,32 +114,182 @@
 
 
 
-import torch
-import torch.nn.functional as F
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
+import os
+import threading
+import nltk
+import numpy as np
 from nltk.sentiment.vader import SentimentIntensityAnalyzer
+from sentiment_cache import SentimentCache, normalize_text
+from truncation import cache_model, default_policy
+
+# torch/transformers are imported lazily (load_finbert / inference) so that importing this
+# module (and serving VADER or DB-only endpoints) does not pay their import cost.
+
+FINBERT_MODEL_NAME = os.getenv("FINBERT_MODEL_NAME", "ProsusAI/finbert")
+FINBERT_REVISION = os.getenv("FINBERT_REVISION") or None
+# Inference backend: "torch" (fp32), "quantized" (dynamic int8) or "onnx" (onnxruntime)
+FINBERT_BACKEND = os.getenv("FINBERT_BACKEND", "torch")
+
+# Result cache: LRU size, plus an optional SQLite file for a persistent tier
+SENTIMENT_CACHE_SIZE = int(os.getenv("SENTIMENT_CACHE_SIZE", "10000"))
+SENTIMENT_CACHE_DB = os.getenv("SENTIMENT_CACHE_DB") or None
+
+_default_cache = None
+
+
+def get_default_cache():
+    """Process-wide cache shared by every CryptoAI instance"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = SentimentCache(max_entries=SENTIMENT_CACHE_SIZE, db_path=SENTIMENT_CACHE_DB)
+    return _default_cache
+
+
+def cached_results(cache, model, revision, texts, compute):
+    """
+    Serve texts from the result cache and call compute(missing_texts) for the rest.
+    Identical texts are only computed once; results come back in input order.
+    """
+    texts = [str(t) if t is not None else "" for t in texts]
+    results = cache.get_many(model, revision, texts)
+
+    missing = {}
+    for i, result in enumerate(results):
+        if result is None:
+            missing.setdefault(normalize_text(texts[i]), []).append(i)
+    if missing:
+        positions = list(missing.values())
+        missing_texts = [texts[group[0]] for group in positions]
+        computed = compute(missing_texts)
+        cache.put_many(model, revision, missing_texts, computed)
+        for group, result in zip(positions, computed):
+            for i in group:
+                results[i] = dict(result)
+    return results
+
 
 class CryptoAI:
-    def __init__(self):
+    def __init__(self, model_name=FINBERT_MODEL_NAME, revision=FINBERT_REVISION, cache=None,
+                 backend=FINBERT_BACKEND, load_finbert=True, truncation=None):
+        """
+        VADER is always ready when the constructor returns. With load_finbert=False,
+        FinBERT stays unloaded until load_finbert() is called (e.g. on a background thread).
+        truncation: default truncation.TruncationPolicy for FinBERT (FINBERT_TRUNCATION etc.)
+        """
         print("--- Initializing AI Engines ---")
+        self.model_name = model_name
+        self.revision = revision
+        self.backend_name = backend
+        self.truncation = truncation or default_policy()
+        self.cache = cache if cache is not None else get_default_cache()
+        self.model_revisions = {"vader": f"vader@nltk-{nltk.__version__}"}
+        self.cache.set_revision("vader", self.model_revisions["vader"])
+
+        self.tokenizer = None
+        self.tokenizer_revision = None
+        self.finbert_model = None
+        self.backend = None
+        self.finbert_state = "not_loaded"
+        self.finbert_error = None
+        # Notified on every state change, so waiters wake when a load succeeds or fails
+        self._finbert_changed = threading.Condition()
+        self._finbert_lock = threading.Lock()
         
         # 1. راه اندازی VADER
         try:
             self.vader = SentimentIntensityAnalyzer()
             print("✅ VADER Loaded")
         except:
-            import nltk
             nltk.download('vader_lexicon')
             self.vader = SentimentIntensityAnalyzer()
 
         # 2. راه اندازی FinBERT
-        print("⏳ Loading FinBERT (ProsusAI)...")
-        model_name = "ProsusAI/finbert"
-        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-        self.finbert_model = AutoModelForSequenceClassification.from_pretrained(model_name)
-        print("✅ FinBERT Loaded")
+        if load_finbert:
+            self.load_finbert()
+
+    def load_finbert(self):
+        """Load tokenizer, weights and inference backend; safe to call from any thread"""
+        with self._finbert_lock:
+            if self.finbert_state == "ready":
+                return
+            self._set_finbert_state("loading")
+            try:
+                tokenizer, model, weights_revision, backend = self._load_finbert_components()
+            except Exception as e:
+                self._set_finbert_state("error", str(e))
+                print(f"❌ FinBERT failed to load: {e}")
+                raise
+
+            self.tokenizer = tokenizer
+            # Pre-tokenized corpora (tokenized_corpus.py) are keyed by this
+            self.tokenizer_revision = weights_revision
+            self.finbert_model = model
+            self.backend = backend
+            # 3. کش نتایج؛ کلید شامل نسخه مدل و backend است تا با تغییر مدل نتایج قدیمی استفاده نشوند
+            # The truncation policy changes results too, so it is part of the revision
+            self.model_revisions["finbert"] = f"{weights_revision}+{backend.name}+{self.truncation.key}"
+            self.cache.set_revision("finbert", self.model_revisions["finbert"])
+            self._set_finbert_state("ready")
+            print(f"✅ FinBERT Loaded (backend: {backend.name})")
+
+    def _load_finbert_components(self):
+        """Returns (tokenizer, model, weights_revision, backend)"""
+        from transformers import AutoTokenizer, AutoModelForSequenceClassification
+        from finbert_backends import create_backend
+
+        print(f"⏳ Loading FinBERT ({self.model_name})...")
+        tokenizer = AutoTokenizer.from_pretrained(self.model_name, revision=self.revision)
+        model = AutoModelForSequenceClassification.from_pretrained(self.model_name, revision=self.revision)
+
+        commit = getattr(model.config, "_commit_hash", None)
+        weights_revision = f"{self.model_name}@{commit or self.revision or 'main'}"
+        backend = create_backend(self.backend_name, model, tokenizer, weights_revision)
+        return tokenizer, model, weights_revision, backend
+
+    def _set_finbert_state(self, state, error=None):
+        with self._finbert_changed:
+            self.finbert_state = state
+            self.finbert_error = error
+            self._finbert_changed.notify_all()
+
+    def load_finbert_in_background(self):
+        """Start loading FinBERT on a daemon thread; progress is visible via model_states()"""
+        with self._finbert_lock:
+            if self.finbert_state in ("loading", "ready"):
+                return
+            # Marked before the thread starts so waiters never see "not_loaded" in between
+            self._set_finbert_state("loading")
+        threading.Thread(target=self._load_finbert_quietly, name="finbert-loader", daemon=True).start()
+
+    def _load_finbert_quietly(self):
+        try:
+            self.load_finbert()
+        except Exception:
+            # State and error message stay on the instance for readiness reporting
+            pass
+
+    def wait_for_finbert(self, timeout=None):
+        """Block while FinBERT is loading (or until timeout); returns True if it is ready"""
+        with self._finbert_changed:
+            self._finbert_changed.wait_for(lambda: self.finbert_state != "loading", timeout)
+            return self.finbert_state == "ready"
+
+    def model_states(self):
+        return {"vader": "ready", "finbert": self.finbert_state}
+
+    def cached(self, model, texts, compute):
+        return cached_results(self.cache, model, self.model_revisions[model], texts, compute)
 
     def analyze_vader(self, text):
+        return self.cached("vader", [text], self._analyze_vader_batch)[0]
+
+    def analyze_vader_batch(self, texts):
+        return self.cached("vader", texts, self._analyze_vader_batch)
+
+    def _analyze_vader_batch(self, texts):
+        return [self._analyze_vader(text) for text in texts]
+
+    def _analyze_vader(self, text):
         score = self.vader.polarity_scores(text)['compound']
         if score >= 0.05:
             label = "positive"
@@ -149,26 +299,61 @@ class CryptoAI:
             label = "neutral"
         return {"label": label, "score": score}
 
-    def analyze_finbert(self, text):
-        inputs = self.tokenizer(text, return_tensors="pt", padding=True, truncation=True)
-        
-        with torch.no_grad():
-            outputs = self.finbert_model(**inputs)
-            logits = outputs.logits
-            
-            # تبدیل خروجی خام به درصد احتمالات
-            probabilities = F.softmax(logits, dim=1)
-            
-            # پیدا کردن بالاترین احتمال
-            highest_prob_score = torch.max(probabilities).item()
-            predicted_class_index = torch.argmax(probabilities).item()
-            
-            # --- بخش اصلاح شده: دریافت برچسب واقعی از کانفیگ مدل ---
-            # مدل ProsusAI معمولاً اینطوری است: {0: 'positive', 1: 'negative', 2: 'neutral'}
-            labels_map = self.finbert_model.config.id2label
-            predicted_label = labels_map[predicted_class_index]
-            
-            # نرمال سازی نام لیبل ها (چون گاهی با حروف بزرگ هستند)
-            predicted_label = predicted_label.lower()
-
-        return {"label": predicted_label, "score": highest_prob_score}
\ No newline at end of file
+    def analyze_finbert(self, text, policy=None):
+        return self.analyze_finbert_batch([text], batch_size=1, policy=policy)[0]
+
+    def analyze_finbert_batch(self, texts, batch_size=32, policy=None):
+        """
+        Run FinBERT over many texts in length-bucketed batches, results in input order.
+        policy: truncation.TruncationPolicy for this call (default: the engine's)
+        """
+        from batching import FinBERTScheduler
+
+        self._require_finbert()
+        return FinBERTScheduler(self, max_batch_size=batch_size, policy=policy).analyze(texts)
+
+    def finbert_cached(self, texts, compute, policy=None):
+        """cached() for FinBERT; results under a policy other than the engine's are cached separately"""
+        model = cache_model(policy, self.truncation)
+        return cached_results(self.cache, model, self.model_revisions["finbert"], texts, compute)
+
+    def _require_finbert(self):
+        # Callers that race a background load wait for it instead of failing
+        if not self.wait_for_finbert():
+            reason = f": {self.finbert_error}" if self.finbert_error else ""
+            raise RuntimeError(f"FinBERT is not available (state: {self.finbert_state}){reason}")
+
+    def tokenize_finbert(self, texts):
+        """Content token ids of texts, without special tokens or truncation (the policy picks the windows)"""
+        self._require_finbert()
+        texts = [str(t) if t is not None else "" for t in texts]
+        return self.tokenizer(texts, add_special_tokens=False, truncation=False, verbose=False)["input_ids"]
+
+    def finbert_special_ids(self):
+        """(cls, sep, pad) token ids"""
+        return self.tokenizer.cls_token_id, self.tokenizer.sep_token_id, self.tokenizer.pad_token_id or 0
+
+    def finbert_logits(self, input_ids, attention_mask):
+        """Logits (NumPy, one row per sequence) for padded int64 NumPy arrays; the tensors share their memory"""
+        import torch
+
+        ids = torch.from_numpy(input_ids)
+        inputs = {
+            "input_ids": ids,
+            "attention_mask": torch.from_numpy(attention_mask),
+            "token_type_ids": torch.zeros_like(ids),
+        }
+        with torch.inference_mode():
+            return self.backend.logits(inputs).float().numpy()
+
+    def finbert_result(self, logits):
+        """{"label", "score"} from one row of logits"""
+        # تبدیل خروجی خام به درصد احتمالات
+        probabilities = np.exp(logits - logits.max())
+        probabilities /= probabilities.sum()
+        # پیدا کردن بالاترین احتمال
+        index = int(probabilities.argmax())
+        # مدل ProsusAI معمولاً اینطوری است: {0: 'positive', 1: 'negative', 2: 'neutral'}
+        labels_map = self.finbert_model.config.id2label
+        # نرمال سازی نام لیبل ها (چون گاهی با حروف بزرگ هستند)
+        return {"label": labels_map[index].lower(), "score": float(probabilities[index])}
@@ -0,0 +1,88 @@
+"""
+Agreement check between the fp32 PyTorch FinBERT and an alternative backend.
+
+Scores the benchmark CSV with both backends and reports how often the
+candidate backend agrees with fp32 labels, the accuracy of each against the
+dataset labels, and throughput, so the accuracy cost of quantization/ONNX
+is visible before switching FINBERT_BACKEND in production.
+
+    python backend_agreement.py --backend quantized --limit 1000
+"""
+
+import argparse
+import ast
+import os
+import time
+import pandas as pd
+from ai_engine import CryptoAI
+from batching import FinBERTScheduler
+from finbert_backends import BACKENDS
+from sentiment_cache import SentimentCache
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+INPUT_FILE = os.path.join(SCRIPT_DIR, 'data', 'cryptonews.csv')
+OUTPUT_FILE = os.path.join(SCRIPT_DIR, 'data', 'backend_agreement.csv')
+
+
+def load_dataset(limit):
+    df = pd.read_csv(INPUT_FILE)
+    if limit:
+        df = df.head(limit)
+    texts = (df['title'].astype(str) + " " + df['text'].astype(str)).tolist()
+    labels = []
+    for value in df['sentiment']:
+        try:
+            labels.append(ast.literal_eval(value).get('class', 'neutral').lower())
+        except:
+            labels.append('neutral')
+    return texts, labels
+
+
+def score(backend, texts):
+    # A disabled cache so every text really goes through this backend
+    ai = CryptoAI(backend=backend, cache=SentimentCache(max_entries=0))
+    start = time.perf_counter()
+    results = FinBERTScheduler(ai).analyze(texts)
+    elapsed = time.perf_counter() - start
+    return [r['label'] for r in results], elapsed
+
+
+def run_agreement(backend, limit):
+    if not os.path.isfile(INPUT_FILE):
+        print(f"❌ Error: CSV file not found at {INPUT_FILE}")
+        return
+
+    texts, original = load_dataset(limit)
+    print(f"📊 Comparing fp32 'torch' vs '{backend}' on {len(texts)} news items...")
+
+    reference, reference_time = score("torch", texts)
+    candidate, candidate_time = score(backend, texts)
+
+    total = len(texts)
+    agree = sum(1 for a, b in zip(reference, candidate) if a == b)
+    reference_correct = sum(1 for a, b in zip(reference, original) if a == b)
+    candidate_correct = sum(1 for a, b in zip(candidate, original) if a == b)
+
+    print("\n" + "=" * 40)
+    print("🏁 BACKEND AGREEMENT 🏁")
+    print("=" * 40)
+    print(f"Label agreement with fp32: {agree / total * 100:.2f}% ({total - agree} flips)")
+    print(f"🔹 torch accuracy:   {reference_correct / total * 100:.2f}%  ({total / reference_time:.1f} items/s)")
+    print(f"🔸 {backend} accuracy: {candidate_correct / total * 100:.2f}%  ({total / candidate_time:.1f} items/s)")
+    print("=" * 40)
+
+    pd.DataFrame({
+        "original": original,
+        "torch_pred": reference,
+        f"{backend}_pred": candidate,
+        "agree": [a == b for a, b in zip(reference, candidate)],
+    }).to_csv(OUTPUT_FILE, index_label="id")
+    print(f"✅ Per-row labels saved to: {OUTPUT_FILE}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=[b for b in BACKENDS if b != "torch"], default="quantized")
+    parser.add_argument("--limit", type=int, default=1000, help="rows of the CSV to score (0 = all)")
+    args = parser.parse_args()
+    run_agreement(args.backend, args.limit)
@@ -0,0 +1,140 @@
+"""
+Length-bucketed dynamic batching for FinBERT.
+
+Texts are tokenized once, sorted by token length and packed into batches
+whose padded size (items x longest item) stays under a token budget, so
+short headlines are never padded up to the length of a long article.
+Results are scattered back to the caller's original order.
+
+Articles are cut into windows by a truncation policy (truncation.py), and
+the window logits are combined per article. Given a pre-tokenized corpus
+(tokenized_corpus.py), texts found in it take their token ids from the
+memory map instead of the tokenizer.
+"""
+
+from collections import Counter
+
+import numpy as np
+
+from truncation import SPECIAL_TOKENS
+
+# Padded tokens (batch items x longest item) allowed per forward pass
+DEFAULT_MAX_TOKENS = 8192
+# Hard cap on items per batch, even for very short texts
+DEFAULT_MAX_BATCH_SIZE = 64
+
+
+def plan_batches(lengths, max_tokens=DEFAULT_MAX_TOKENS, max_batch_size=DEFAULT_MAX_BATCH_SIZE):
+    """Group item indices into length-sorted batches that fit the token budget"""
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    batches = []
+    current = []
+    current_max = 0
+    for i in order:
+        length = max(1, lengths[i])
+        padded_max = max(current_max, length)
+        if current and (len(current) >= max_batch_size or padded_max * (len(current) + 1) > max_tokens):
+            batches.append(current)
+            current = []
+            padded_max = length
+        current.append(i)
+        current_max = padded_max
+    if current:
+        batches.append(current)
+    return batches
+
+
+def pad_windows(windows, cls_id, sep_id, pad_id=0):
+    """
+    (input_ids, attention_mask) int64 arrays for a batch of windows (content token ids),
+    each wrapped in [CLS] ... [SEP] and padded to the longest. The windows (memory-map
+    slices for pre-tokenized texts) are copied once, straight into the batch buffer.
+    """
+    width = max(len(window) for window in windows) + SPECIAL_TOKENS
+    input_ids = np.full((len(windows), width), pad_id, dtype=np.int64)
+    attention_mask = np.zeros((len(windows), width), dtype=np.int64)
+    for row, window in enumerate(windows):
+        end = len(window) + 1
+        input_ids[row, 0] = cls_id
+        input_ids[row, 1:end] = window
+        input_ids[row, end] = sep_id
+        attention_mask[row, :end + 1] = 1
+    return input_ids, attention_mask
+
+
+class FinBERTScheduler:
+    """Runs CryptoAI FinBERT inference over token-budgeted, length-bucketed batches"""
+
+    def __init__(self, ai, max_tokens=DEFAULT_MAX_TOKENS, max_batch_size=DEFAULT_MAX_BATCH_SIZE, corpus=None,
+                 policy=None):
+        self.ai = ai
+        self.max_tokens = max_tokens
+        self.max_batch_size = max_batch_size
+        # A corpus from another tokenizer revision would feed the model the wrong ids
+        if corpus is not None and corpus.tokenizer_revision != ai.tokenizer_revision:
+            corpus = None
+        self.corpus = corpus
+        # Truncation policy (truncation.py); None uses the engine's
+        self.policy = policy
+
+    def analyze(self, texts, on_batch=None):
+        """
+        Score texts with FinBERT and return results in input order.
+        on_batch(n) is called after each forward pass with the number of items completed.
+        """
+        if not texts:
+            return []
+
+        def compute(missing):
+            # Cache hits count as already scored
+            if on_batch and len(missing) < len(texts):
+                on_batch(len(texts) - len(missing))
+            return self._analyze_uncached(missing, on_batch)
+
+        return self.ai.finbert_cached(texts, compute, self.policy)
+
+    def _token_ids(self, texts, policy):
+        """Content token ids per text: from the corpus where possible, else from the tokenizer"""
+        prepared = [policy.prepare_text(text) for text in texts]
+        sequences = [None] * len(texts)
+        if self.corpus is not None:
+            # The corpus holds whole texts; headlines are looked up as texts of their own
+            keys = prepared if policy.mode == "headline" else texts
+            for i, position in enumerate(self.corpus.find(keys)):
+                if position is not None:
+                    sequences[i] = self.corpus.sequence(position)
+        missing = [i for i, sequence in enumerate(sequences) if sequence is None]
+        if missing:
+            for i, ids in zip(missing, self.ai.tokenize_finbert([prepared[i] for i in missing])):
+                sequences[i] = ids
+        return sequences
+
+    def _analyze_uncached(self, texts, on_batch):
+        policy = self.policy or self.ai.truncation
+        cls_id, sep_id, pad_id = self.ai.finbert_special_ids()
+
+        # Every article becomes one or more windows; batches are planned over all windows
+        windows = []
+        owners = []
+        for i, ids in enumerate(self._token_ids(texts, policy)):
+            for window in policy.windows(ids):
+                windows.append(window)
+                owners.append(i)
+        remaining = Counter(owners)
+
+        logits = [None] * len(windows)
+        lengths = [len(window) + SPECIAL_TOKENS for window in windows]
+        for batch in plan_batches(lengths, self.max_tokens, self.max_batch_size):
+            input_ids, attention_mask = pad_windows([windows[j] for j in batch], cls_id, sep_id, pad_id)
+            completed = 0
+            for j, row in zip(batch, self.ai.finbert_logits(input_ids, attention_mask)):
+                logits[j] = row
+                remaining[owners[j]] -= 1
+                completed += remaining[owners[j]] == 0
+            if on_batch and completed:
+                on_batch(completed)
+
+        per_text = [[] for _ in texts]
+        for j, owner in enumerate(owners):
+            per_text[owner].append(logits[j])
+        return [self.ai.finbert_result(policy.combine(np.stack(rows))) for rows in per_text]
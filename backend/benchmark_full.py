@@ -1,8 +1,14 @@
+import argparse
 import os
+import time
 import pandas as pd
 import ast
 from tqdm import tqdm  # برای نمایش نوار پیشرفت
-from ai_engine import CryptoAI
+from engine_provider import get_engine
+from batching import FinBERTScheduler
+from inference_pool import InferencePool, INFERENCE_WORKERS
+from tokenized_corpus import load_or_build
+from truncation import AGGREGATES, POLICIES, TruncationPolicy, default_policy
 
 # Paths relative to this script's directory (backend/), so it works from any cwd
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -12,14 +18,25 @@ OUTPUT_FILE = os.path.join(SCRIPT_DIR, 'data', 'benchmark_results.csv')
 # LIMIT = 1000
 LIMIT = None
 
-def run_benchmark():
+# Padded-token budget per FinBERT forward pass (see batching.py); --max-batch-tokens
+MAX_BATCH_TOKENS = 8192
+
+# Worker processes for inference (see inference_pool.py); 0 runs both models in this process
+WORKERS = INFERENCE_WORKERS
+
+# Pre-tokenized corpus of the benchmark texts (see tokenized_corpus.py), built on the first run
+# and reused afterwards so repeat runs skip tokenization; None tokenizes every run
+CORPUS_NAME = "benchmark"
+
+def run_benchmark(limit=LIMIT, max_batch_tokens=MAX_BATCH_TOKENS, policy=None):
+    """
+    policy: FinBERT truncation.TruncationPolicy (default: the FINBERT_* env settings),
+    e.g. TruncationPolicy("sliding", max_tokens=1024, aggregate="max") to compare policies
+    """
+    policy = policy or default_policy()
     print("--- 🚀 Starting Full Benchmark ---")
-    
-    # 1. لود کردن هوش مصنوعی
-    print("⏳ Loading AI Models...")
-    ai = CryptoAI()
-    
-    # 2. خواندن فایل CSV
+
+    # 1. خواندن فایل CSV
     print(f"📂 Reading {INPUT_FILE}...")
     if not os.path.isfile(INPUT_FILE):
         print(f"❌ Error: CSV file not found at {INPUT_FILE}")
@@ -32,9 +49,20 @@ def run_benchmark():
         return
 
     # اعمال لیمیت (اگر نیاز باشد)
-    if LIMIT:
-        df = df.head(LIMIT)
-    
+    if limit:
+        df = df.head(limit)
+
+    # 2. لود کردن هوش مصنوعی
+    print("⏳ Loading AI Models...")
+    pool = InferencePool(workers=WORKERS).start() if WORKERS else None
+    try:
+        _score_and_report(pool or get_engine(), pool, df, max_batch_tokens, policy)
+    finally:
+        if pool:
+            pool.shutdown()
+
+
+def _score_and_report(ai, pool, df, max_batch_tokens, policy):
     print(f"📊 Analyzing {len(df)} news items...")
 
     results = []
@@ -44,24 +72,45 @@ def run_benchmark():
     finbert_correct = 0
     total = 0
 
-    # 3. حلقه اصلی با نوار پیشرفت
-    for index, row in tqdm(df.iterrows(), total=df.shape[0], desc="Processing"):
+    # 3. آماده‌سازی متن‌ها و لیبل‌های اصلی
+    indices = []
+    texts = []
+    original_labels = []
+    for index, row in df.iterrows():
+        # ترکیب تیتر و متن برای تحلیل دقیق‌تر
+        texts.append(str(row['title']) + " " + str(row['text']))
+        indices.append(index)
+        
+        # --- الف) استخراج لیبل اصلی (Target) ---
+        # فرمت فایل کاگل: "{'class': 'negative', ...}"
+        try:
+            sentiment_dict = ast.literal_eval(row['sentiment'])
+            original_labels.append(sentiment_dict.get('class', 'neutral'))
+        except:
+            original_labels.append('neutral')
+
+    # --- ب) تحلیل با مدل‌های ما (FinBERT به صورت دسته‌ای، مرتب شده بر اساس طول) ---
+    corpus = None
+    if CORPUS_NAME:
+        if pool:
+            pool.prepare_corpus(CORPUS_NAME, texts)
+        else:
+            corpus = load_or_build(ai, CORPUS_NAME, texts)
+    started = time.perf_counter()
+    with tqdm(total=len(texts), desc="FinBERT") as progress:
+        if pool:
+            finbert_results = pool.analyze_finbert_batch(
+                texts, on_batch=progress.update, corpus=CORPUS_NAME, policy=policy)
+        else:
+            scheduler = FinBERTScheduler(ai, max_tokens=max_batch_tokens, corpus=corpus, policy=policy)
+            finbert_results = scheduler.analyze(texts, on_batch=progress.update)
+    finbert_seconds = time.perf_counter() - started
+    vader_results = ai.analyze_vader_batch(texts)
+
+    for index, text, original_label, finbert_res, vader_res in tqdm(
+        zip(indices, texts, original_labels, finbert_results, vader_results), total=len(texts), desc="Processing"
+    ):
         try:
-            # ترکیب تیتر و متن برای تحلیل دقیق‌تر
-            text = str(row['title']) + " " + str(row['text'])
-            
-            # --- الف) استخراج لیبل اصلی (Target) ---
-            # فرمت فایل کاگل: "{'class': 'negative', ...}"
-            try:
-                sentiment_dict = ast.literal_eval(row['sentiment'])
-                original_label = sentiment_dict.get('class', 'neutral')
-            except:
-                original_label = 'neutral'
-            
-            # --- ب) تحلیل با مدل‌های ما ---
-            vader_res = ai.analyze_vader(text)
-            finbert_res = ai.analyze_finbert(text)
-            
             # --- ج) مقایسه ---
             # مدل‌ها معمولاً خروجی lowercase دارند، پس safe عمل می‌کنیم
             orig = original_label.lower()
@@ -104,6 +153,9 @@ def run_benchmark():
         print("-" * 40)
         print(f"🔹 VADER Accuracy:   {vader_accuracy:.2f}%")
         print(f"🔸 FinBERT Accuracy: {finbert_accuracy:.2f}%")
+        print("-" * 40)
+        print(f"⚡ FinBERT Throughput: {len(texts) / max(finbert_seconds, 1e-9):.1f} texts/s "
+              f"({f'{WORKERS} workers' if pool else 'in-process'}, truncation {policy.key})")
         print("="*40)
         
         
@@ -114,6 +166,29 @@ def run_benchmark():
     else:
         print("No data processed.")
 
+
+def main():
+    parser = argparse.ArgumentParser(description="Score data/cryptonews.csv with VADER and FinBERT; "
+                                                 "prints accuracy and FinBERT throughput")
+    parser.add_argument("--limit", type=int, default=LIMIT, help="Only the first N rows of the CSV")
+    parser.add_argument("--max-batch-tokens", type=int, default=MAX_BATCH_TOKENS,
+                        help=f"Padded-token budget per FinBERT forward pass (default {MAX_BATCH_TOKENS}; "
+                             "in-process runs, pool workers use their own)")
+    parser.add_argument("--truncation", choices=POLICIES, help="FinBERT truncation policy (default: FINBERT_TRUNCATION)")
+    parser.add_argument("--max-tokens", type=int, help="Token budget per article (default: FINBERT_MAX_TOKENS)")
+    parser.add_argument("--window", type=int, help="sliding: window size in tokens (default: FINBERT_WINDOW_TOKENS)")
+    parser.add_argument("--stride", type=int, help="sliding: distance between window starts (default: FINBERT_WINDOW_STRIDE)")
+    parser.add_argument("--aggregate", choices=AGGREGATES,
+                        help="sliding: how window logits combine (default: FINBERT_WINDOW_AGGREGATE)")
+    args = parser.parse_args()
+    if args.max_batch_tokens < 1:
+        parser.error("--max-batch-tokens must be positive")
+    try:
+        policy = TruncationPolicy(args.truncation, args.max_tokens, args.window, args.stride, args.aggregate)
+    except ValueError as e:
+        parser.error(str(e))
+    run_benchmark(limit=args.limit, max_batch_tokens=args.max_batch_tokens, policy=policy)
+
+
 if __name__ == "__main__":
-    
-    run_benchmark()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,224 @@
+"""
+Coin entity tagging: maps tickers, names and aliases in article text to
+canonical coin ids (the ids the market page and the coin= filters use).
+
+All aliases are compiled into one Aho-Corasick automaton, so tagging is a
+single pass over the text however many coins are listed. Tags are stored
+at insert time in article_coins, an indexed (table, coin, article) join
+table; `python coins.py backfill` tags rows stored before it existed.
+"""
+
+import argparse
+from collections import deque
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from database import SessionLocal, LiveNews, ArticleCoin
+from models import News
+
+# Canonical coin id -> (case-sensitive tickers, case-insensitive names/aliases)
+COINS = {
+    "bitcoin": (["BTC", "XBT"], ["Bitcoin"]),
+    "ethereum": (["ETH"], ["Ethereum", "Ether"]),
+    "ripple": (["XRP"], ["Ripple"]),
+    "litecoin": (["LTC"], ["Litecoin"]),
+    "dogecoin": (["DOGE"], ["Dogecoin"]),
+    "cardano": (["ADA"], ["Cardano"]),
+    "solana": (["SOL"], ["Solana"]),
+    "polkadot": (["DOT"], ["Polkadot"]),
+    "chainlink": (["LINK"], ["Chainlink"]),
+    "binancecoin": (["BNB"], ["Binance Coin"]),
+}
+
+# Text columns scanned for coins, per table
+COIN_TEXT_COLUMNS = {
+    "news": ("title", "summary"),
+    "live_news": ("title", "text"),
+}
+_TABLE_MODELS = {"news": News, "live_news": LiveNews}
+# Rows tagged per chunk by the backfill
+BACKFILL_CHUNK_SIZE = 2000
+
+
+class AhoCorasick:
+    """Multi-pattern matcher: finds every added pattern in a text in one pass"""
+
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+    def add(self, pattern, value):
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((len(pattern), value))
+
+    def build(self):
+        """Compute failure links (breadth-first); call once after the last add()"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+        return self
+
+    def iter_matches(self, text):
+        """Yield (start, end, value) for every pattern occurrence"""
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for length, value in self._output[state]:
+                yield index + 1 - length, index + 1, value
+
+
+def _build_matcher():
+    matcher = AhoCorasick()
+    for coin, (tickers, names) in COINS.items():
+        # Patterns are lower-case; tickers additionally require their exact case ("LINK", not "link")
+        for ticker in tickers:
+            matcher.add(ticker.lower(), (coin, ticker))
+        for name in names:
+            matcher.add(name.lower(), (coin, None))
+    return matcher.build()
+
+
+_MATCHER = _build_matcher()
+_ALIASES = {alias.lower(): coin for coin, (tickers, names) in COINS.items() for alias in tickers + names}
+
+
+def _is_word_char(char):
+    return char.isalnum()
+
+
+def _lower_keep_offsets(text):
+    """text.lower(), except characters whose lower case is longer ("İ") stay as they are,
+    so match offsets in the result are offsets in text"""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(char if len(char.lower()) != 1 else char.lower() for char in text)
+
+
+def tag_coins(*texts):
+    """Sorted canonical coin ids mentioned in any of the texts"""
+    found = set()
+    for text in texts:
+        if not text:
+            continue
+        lowered = _lower_keep_offsets(text)
+        for start, end, (coin, exact) in _MATCHER.iter_matches(lowered):
+            if coin in found:
+                continue
+            # Whole words only ("Ether" must not match inside "Ethereal")
+            if start > 0 and _is_word_char(lowered[start - 1]):
+                continue
+            if end < len(lowered) and _is_word_char(lowered[end]):
+                continue
+            if exact is not None and text[start:end] != exact:
+                continue
+            found.add(coin)
+    return sorted(found)
+
+
+def canonical_coin(value):
+    """Canonical id for a coin id, ticker or name ("BTC", "Bitcoin" -> "bitcoin")"""
+    if not value:
+        return None
+    value = value.strip()
+    return _ALIASES.get(value.lower(), value.lower())
+
+
+def row_coins(table, row):
+    get = row.get if isinstance(row, dict) else (lambda name: getattr(row, name, None))
+    return tag_coins(*(get(column) for column in COIN_TEXT_COLUMNS[table]))
+
+
+def record_article_coins(conn, table, rows, tags=None):
+    """
+    Store the coin tags of rows (dicts or ORM objects that carry their id) in article_coins.
+    tags: the rows' coin tags if the caller already computed them.
+    """
+    if tags is None:
+        tags = [row_coins(table, row) for row in rows]
+    values = []
+    for row, row_tags in zip(rows, tags):
+        article_id = row["id"] if isinstance(row, dict) else row.id
+        values.extend({"table_name": table, "coin": coin, "article_id": article_id} for coin in row_tags)
+    if values:
+        conn.execute(sqlite_insert(ArticleCoin.__table__).on_conflict_do_nothing(), values)
+    return len(values)
+
+
+def coin_article_ids(table, coin):
+    """Subquery of the ids of table's rows tagged with coin (served by the article_coins primary key)"""
+    return (
+        ArticleCoin.__table__.select()
+        .with_only_columns(ArticleCoin.article_id)
+        .where(ArticleCoin.table_name == table, ArticleCoin.coin == canonical_coin(coin))
+    )
+
+
+def backfill(db, tables=None):
+    """Re-tag every row of the given tables (default: all), chunk by chunk; safe to re-run"""
+    counts = {}
+    for table in tables or _TABLE_MODELS:
+        model = _TABLE_MODELS[table]
+        tagged = 0
+        last_id = 0
+        while True:
+            rows = db.query(model).filter(model.id > last_id).order_by(model.id).limit(BACKFILL_CHUNK_SIZE).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+            db.query(ArticleCoin).filter(
+                ArticleCoin.table_name == table,
+                ArticleCoin.article_id.in_([row.id for row in rows]),
+            ).delete(synchronize_session=False)
+            tagged += record_article_coins(db.connection(), table, rows)
+            db.commit()
+            db.expunge_all()
+            print(f"🏷️ {table}: tagged up to id {last_id} ({tagged} tags)")
+        counts[table] = tagged
+    return counts
+
+
+def ensure_tagged(db):
+    """Backfill once for databases that predate article_coins"""
+    if db.query(ArticleCoin.article_id).first() is not None:
+        return
+    if db.query(News.id).first() is None and db.query(LiveNews.id).first() is None:
+        return
+    print("🏷️ Tagging existing articles with coins...")
+    backfill(db)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coin tagging for stored articles")
+    parser.add_argument("command", choices=["backfill"])
+    parser.add_argument("--table", choices=list(_TABLE_MODELS), help="Only this table (default: all)")
+    args = parser.parse_args()
+    db = SessionLocal()
+    try:
+        counts = backfill(db, [args.table] if args.table else None)
+        print(f"✅ Coin tags written: {counts}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
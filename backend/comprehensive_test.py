@@ -1,9 +1,9 @@
 import pandas as pd
-from ai_engine import CryptoAI
+from engine_provider import get_engine
 
 print("--- Loading AI Engine ---")
 # مدل‌ها لود می‌شوند (حدود ۳۰ ثانیه طول می‌کشد)
-ai = CryptoAI()
+ai = get_engine()
 
 # لیست جملات تستی (شامل انواع سناریوها برای به چالش کشیدن مدل‌ها)
 test_cases = [
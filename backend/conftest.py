@@ -0,0 +1,3 @@
+# Manual scripts that load the models or hit live news sources when imported;
+# run them directly (python test_ai.py). pytest collects the unit tests only.
+collect_ignore = ["comprehensive_test.py", "test4models.py", "test_ai.py", "test_enhanced_fetcher.py"]
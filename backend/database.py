@@ -30,9 +30,10 @@ class LiveNews(Base):
     title = Column(String, index=True)
     text = Column(String)
     summary = Column(String)
-    url = Column(String)
+    url = Column(String, unique=True, index=True)  # unique: ingestion dedups with ON CONFLICT DO NOTHING
     source = Column(String)
     date = Column(String)  # Store as ISO format datetime string in UTC
+    published_ts = Column(Integer, nullable=True, index=True)  # UTC epoch seconds; date filters and ordering use this
     sentiment = Column(String)       # جیسون خام
     sentiment_label = Column(String) # لیبل نهایی (Positive/Negative)
     sentiment_score = Column(Float)  # نمره اطمینان
@@ -41,4 +42,60 @@ class LiveNews(Base):
     vader_score = Column(Float, nullable=True)
     # Separate FinBERT sentiment fields
     finbert_label = Column(String, nullable=True)
-    finbert_score = Column(Float, nullable=True)
\ No newline at end of file
+    finbert_score = Column(Float, nullable=True)
+    # Near-duplicate (syndicated copy) of this live_news id; its scores are copied, not recomputed
+    duplicate_of = Column(Integer, nullable=True, index=True)
+
+
+class FeedValidator(Base):
+    """HTTP cache validators per feed URL, sent back as conditional GET headers"""
+    __tablename__ = "feed_validators"
+
+    url = Column(String, primary_key=True)
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    updated_at = Column(String)  # ISO format datetime string in UTC
+
+
+class SentimentRollup(Base):
+    """Label count and score sum per (table, model, coin, day, label), maintained by rollups.py"""
+    __tablename__ = "sentiment_rollups"
+
+    table_name = Column(String, primary_key=True)  # "news" or "live_news"
+    model = Column(String, primary_key=True)  # original / vader / finbert
+    coin = Column(String, primary_key=True)  # canonical coin id, "*" for all articles
+    day = Column(String, primary_key=True)  # YYYY-MM-DD
+    label = Column(String, primary_key=True)  # "" when the row has no label
+    count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0.0)
+
+
+class ArticleCoin(Base):
+    """Coin tag of a news/live_news row (see coins.py); the key serves coin= filters"""
+    __tablename__ = "article_coins"
+
+    table_name = Column(String, primary_key=True)  # "news" or "live_news"
+    coin = Column(String, primary_key=True)  # canonical coin id
+    article_id = Column(Integer, primary_key=True)
+
+
+class ReanalysisCheckpoint(Base):
+    """Progress of the background reanalysis of one model over the news table (see reanalysis.py)"""
+    __tablename__ = "reanalysis_checkpoints"
+
+    table_name = Column(String, primary_key=True)  # "news"
+    model = Column(String, primary_key=True)  # vader / finbert
+    revision = Column(String)  # model revision the rows up to last_id were scored with
+    last_id = Column(Integer, nullable=False, default=0)
+    status = Column(String)  # running / done / error; "running" after a crash is resumed at startup
+    updated_at = Column(String)  # ISO format datetime string in UTC
+
+
+class SeedProgress(Base):
+    """How far a table has been seeded from its CSV (see seeding.py)"""
+    __tablename__ = "seed_progress"
+
+    table_name = Column(String, primary_key=True)  # "news"
+    rows_done = Column(Integer, nullable=False, default=0)  # CSV records committed so far
+    status = Column(String)  # running / done; "running" is resumed at the next seed
+    updated_at = Column(String)  # ISO format datetime string in UTC
@@ -8,6 +8,7 @@ import traceback
 from sqlalchemy import inspect
 from database import engine, Base, LiveNews
 from news_fetcher import fetch_and_analyze_latest_news
+from engine_provider import warmup
 from sqlalchemy.orm import Session
 from database import SessionLocal
 
@@ -109,6 +110,10 @@ def main():
         print("\n❌ Database table check failed. Cannot proceed with other tests.")
         return
     
+    # Load the shared AI engine once up front; every fetch below reuses it
+    print("\n🧠 Warming up shared AI engine...")
+    warmup(background=False)
+
     # Step 2: Test the fetch function
     fetch_result = test_fetch_function()
     
@@ -3,6 +3,7 @@ from datetime import date, timedelta
 from sqlalchemy.orm import Session
 from database import SessionLocal, LiveNews
 from models import News
+from timestamps import day_start_ts, day_end_ts
 
 def get_most_recent_news(limit=20):
     """
@@ -69,7 +70,8 @@ def get_news_from_past_days(days_ago=7, limit=20):
     Fetch news from a specific number of days ago
     """
     # Calculate the date from N days ago
-    target_date = (datetime.datetime.now() - datetime.timedelta(days=days_ago)).strftime('%Y-%m-%d')
+    target_date = (datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=days_ago)).strftime('%Y-%m-%d')
+    day_start, day_end = day_start_ts(target_date), day_end_ts(target_date)
     print(f"Fetching news from {days_ago} days ago (date: {target_date})...")
     
     # Create database session
@@ -83,7 +85,7 @@ def get_news_from_past_days(days_ago=7, limit=20):
         # First, let's try to fetch from LiveNews table (newer live news)
         print("\n=== LIVE NEWS ANALYSIS ===")
         live_news = db.query(LiveNews).filter(
-            LiveNews.date.like(f'{target_date}%')  # Match date at the beginning
+            LiveNews.published_ts.between(day_start, day_end)  # UTC day, range scan on the epoch index
         ).limit(limit).all()
         
         if live_news:
@@ -101,7 +103,7 @@ def get_news_from_past_days(days_ago=7, limit=20):
         # Also try to fetch from the original News table (seeded data)
         print("\n=== ORIGINAL NEWS ANALYSIS ===")
         original_news = db.query(News).filter(
-            News.published_date.like(f'{target_date}%')  # Match date at the beginning
+            News.published_ts.between(day_start, day_end)  # UTC day, range scan on the epoch index
         ).limit(limit).all()
         
         if original_news:
@@ -137,13 +139,14 @@ def get_news_by_relative_date(days_ago=7, limit=20):
     
     try:
         # Get the date N days ago
-        target_date = datetime.date.today() - datetime.timedelta(days=days_ago)
+        target_date = datetime.datetime.now(datetime.timezone.utc).date() - datetime.timedelta(days=days_ago)
         print(f"Target date: {target_date}")
+        day_start = day_start_ts(target_date.strftime("%Y-%m-%d"))
+        day_end = day_end_ts(target_date.strftime("%Y-%m-%d"))
         
         # Try to get news from LiveNews table
         live_news = db.query(LiveNews).filter(
-            # Extract just the date part for comparison
-            LiveNews.date.like(f'{target_date.strftime("%Y-%m-%d")}%')
+            LiveNews.published_ts.between(day_start, day_end)
         ).limit(limit).all()
         
         if live_news:
@@ -160,8 +163,7 @@ def get_news_by_relative_date(days_ago=7, limit=20):
             
         # Also try for original news
         original_news = db.query(News).filter(
-            # Extract just the date part for comparison
-            News.published_date.like(f'{target_date.strftime("%Y-%m-%d")}%')
+            News.published_ts.between(day_start, day_end)
         ).limit(limit).all()
         
         if original_news:
@@ -0,0 +1,140 @@
+"""
+Process-wide CryptoAI provider.
+
+The API, the live news fetcher and the scripts all get their engine from
+here, so the tokenizer and FinBERT weights are loaded once per process.
+Supports explicit warmup and hot-swapping to another model revision: the
+new engine is loaded next to the current one and replaces it atomically
+once ready, without a process restart.
+"""
+
+import os
+import threading
+from ai_engine import CryptoAI, FINBERT_MODEL_NAME, FINBERT_REVISION, FINBERT_BACKEND
+
+# Models a swap may load (comma-separated); by default only other revisions of the configured model
+FINBERT_SWAP_MODELS = [
+    name.strip() for name in os.getenv("FINBERT_SWAP_MODELS", FINBERT_MODEL_NAME).split(",") if name.strip()
+]
+
+_engine = None
+_lock = threading.Lock()
+_swap_lock = threading.Lock()
+_swap_status = {"state": "idle"}
+# Called with (model_name, revision, backend) after a swap, e.g. to restart the inference pool
+_swap_listeners = []
+
+
+def current_engine():
+    """The shared engine, or None if nothing has created it yet"""
+    return _engine
+
+
+def get_engine(load_finbert=True):
+    """
+    Return the shared engine, creating it on first use.
+    With load_finbert=True this blocks until FinBERT is ready (loading it if needed)
+    and raises if the load fails.
+    """
+    global _engine
+    with _lock:
+        if _engine is None:
+            _engine = CryptoAI(load_finbert=False)
+        engine = _engine
+    if load_finbert and not engine.wait_for_finbert(0):
+        if engine.finbert_state == "loading":
+            if not engine.wait_for_finbert():
+                raise RuntimeError(f"FinBERT failed to load: {engine.finbert_error}")
+        else:
+            engine.load_finbert()
+    return engine
+
+
+def warmup(background=True):
+    """Create the shared engine (VADER ready at once) and start loading FinBERT"""
+    engine = get_engine(load_finbert=False)
+    if background:
+        engine.load_finbert_in_background()
+    else:
+        engine.load_finbert()
+    return engine
+
+
+def add_swap_listener(callback):
+    """Call callback(model_name, revision, backend) on the swap thread after every successful swap"""
+    _swap_listeners.append(callback)
+
+
+def swap_model(revision=FINBERT_REVISION, model_name=FINBERT_MODEL_NAME, backend=FINBERT_BACKEND, background=True):
+    """
+    Load a new FinBERT revision and make it the shared engine once it is ready.
+    Returns False if a swap is already in progress; raises ValueError for a model
+    outside FINBERT_SWAP_MODELS or an unknown backend.
+    """
+    from finbert_backends import BACKENDS
+
+    if model_name not in FINBERT_SWAP_MODELS:
+        raise ValueError(f"model_name must be one of {', '.join(FINBERT_SWAP_MODELS)}")
+    if backend not in BACKENDS:
+        raise ValueError(f"backend must be one of {', '.join(BACKENDS)}")
+    if not _swap_lock.acquire(blocking=False):
+        return False
+    _swap_status.clear()
+    _swap_status.update({
+        "state": "loading",
+        "model_name": model_name,
+        "revision": revision,
+        "backend": backend,
+    })
+    if background:
+        threading.Thread(
+            target=_swap, args=(revision, model_name, backend), name="finbert-swap", daemon=True
+        ).start()
+    else:
+        _swap(revision, model_name, backend)
+    return True
+
+
+def _swap(revision, model_name, backend):
+    global _engine
+    try:
+        current = _engine
+        cache = current.cache if current is not None else None
+        engine = CryptoAI(model_name=model_name, revision=revision, cache=cache, backend=backend, load_finbert=False)
+        engine.load_finbert()
+        with _lock:
+            _engine = engine
+        for callback in list(_swap_listeners):
+            try:
+                callback(model_name, revision, backend)
+            except Exception as e:
+                _swap_status.setdefault("listener_errors", []).append(str(e))
+                print(f"⚠️ Post-swap hook failed: {e}")
+        _swap_status["state"] = "done"
+        _swap_status["finbert_revision"] = engine.model_revisions["finbert"]
+        print(f"🔁 Engine swapped to {engine.model_revisions['finbert']}")
+    except Exception as e:
+        _swap_status["state"] = "error"
+        _swap_status["error"] = str(e)
+        print(f"❌ Engine swap failed, keeping current engine: {e}")
+    finally:
+        _swap_lock.release()
+
+
+def swap_status():
+    return dict(_swap_status)
+
+
+def engine_info():
+    engine = _engine
+    if engine is None:
+        return {"loaded": False, "swap": swap_status()}
+    return {
+        "loaded": True,
+        "model_name": engine.model_name,
+        "backend": engine.backend_name,
+        "revisions": dict(engine.model_revisions),
+        "models": engine.model_states(),
+        "truncation": engine.truncation.to_dict(),
+        "swap": swap_status(),
+    }
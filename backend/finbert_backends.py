@@ -0,0 +1,128 @@
+"""
+Pluggable FinBERT inference backends.
+
+- torch:     the stock fp32 PyTorch model (default)
+- quantized: torch dynamic int8 quantization of the Linear layers (CPU)
+- onnx:      the model exported once to ONNX and run with onnxruntime
+
+Every backend takes the tokenizer's padded tensors and returns a logits tensor,
+so CryptoAI's post-processing is identical for all of them.
+"""
+
+import os
+import re
+import torch
+
+BACKENDS = ("torch", "quantized", "onnx")
+
+# Exported ONNX graphs live here, one file per model revision
+ONNX_DIR = os.getenv(
+    "FINBERT_ONNX_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "onnx"),
+)
+
+
+class TorchBackend:
+    name = "torch"
+
+    def __init__(self, model):
+        self.model = model
+        self.model.eval()
+
+    def logits(self, inputs):
+        with torch.inference_mode():
+            return self.model(**inputs).logits
+
+
+class QuantizedTorchBackend(TorchBackend):
+    name = "quantized"
+
+    def __init__(self, model):
+        model.eval()
+        quantized = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        super().__init__(quantized)
+
+
+class _LogitsOnly(torch.nn.Module):
+    """Fixed positional signature and a plain tensor output for the ONNX exporter"""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask, token_type_ids):
+        return self.model(
+            input_ids=input_ids,
+            attention_mask=attention_mask,
+            token_type_ids=token_type_ids,
+        ).logits
+
+
+ONNX_INPUT_NAMES = ["input_ids", "attention_mask", "token_type_ids"]
+
+
+def onnx_path_for(revision):
+    """File name for the exported graph of a given model revision string"""
+    safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", revision)
+    return os.path.join(ONNX_DIR, f"{safe}.onnx")
+
+
+def export_onnx(model, tokenizer, path):
+    """Export a sequence-classification model to ONNX with dynamic batch/sequence axes"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    dummy = tokenizer(["Bitcoin price rises"], return_tensors="pt", padding=True)
+    args = tuple(dummy[name] for name in ONNX_INPUT_NAMES)
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in ONNX_INPUT_NAMES}
+    dynamic_axes["logits"] = {0: "batch"}
+    model.eval()
+    tmp_path = path + ".tmp"
+    with torch.no_grad():
+        torch.onnx.export(
+            _LogitsOnly(model),
+            args,
+            tmp_path,
+            input_names=ONNX_INPUT_NAMES,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+        )
+    os.replace(tmp_path, path)
+
+
+class OnnxBackend:
+    name = "onnx"
+
+    def __init__(self, model, tokenizer, path):
+        try:
+            import onnxruntime
+        except ImportError as e:
+            raise ImportError(
+                "FINBERT_BACKEND=onnx requires onnxruntime (pip install onnx onnxruntime)"
+            ) from e
+
+        if not os.path.exists(path):
+            print(f"⏳ Exporting FinBERT to ONNX at {path}...")
+            export_onnx(model, tokenizer, path)
+        self.path = path
+        self.session = onnxruntime.InferenceSession(path, providers=["CPUExecutionProvider"])
+
+    def logits(self, inputs):
+        feed = {}
+        for name in ONNX_INPUT_NAMES:
+            if name in inputs:
+                feed[name] = inputs[name].numpy()
+            else:
+                # Tokenizers without segment ids: BERT treats everything as segment 0
+                feed[name] = torch.zeros_like(inputs["input_ids"]).numpy()
+        return torch.from_numpy(self.session.run(["logits"], feed)[0])
+
+
+def create_backend(name, model, tokenizer, revision):
+    name = (name or "torch").strip().lower()
+    if name == "torch":
+        return TorchBackend(model)
+    if name == "quantized":
+        return QuantizedTorchBackend(model)
+    if name == "onnx":
+        return OnnxBackend(model, tokenizer, onnx_path_for(revision))
+    raise ValueError(f"Unknown FinBERT backend '{name}', expected one of {', '.join(BACKENDS)}")
@@ -0,0 +1,322 @@
+"""
+Multi-process inference pool for bulk scoring.
+
+One process running PyTorch cannot keep a many-core node busy, and bulk
+jobs would contend with the API's event loop for the GIL. The pool starts
+N worker processes (spawned, so no torch state is forked), each loading its
+own copy of the model with a fixed torch intra-op thread count, so that
+workers x threads matches the cores instead of oversubscribing them.
+
+Texts are sorted by length and cut into chunks that are dispatched to the
+workers over the executor's task queue; each worker runs its chunk through
+the token-budgeted FinBERT scheduler (batching.py). Results are cached in
+the parent's sentiment cache and come back in input order.
+
+FinBERT calls can name a pre-tokenized corpus (tokenized_corpus.py): each
+worker memory-maps it, so every process reads the same pages and skips
+tokenizing the texts it contains.
+
+The pool exposes the same batch interface as CryptoAI (model_revisions,
+analyze_finbert_batch, analyze_vader_batch), so the benchmark, reanalysis
+and ingestion use it in place of the in-process engine when
+INFERENCE_WORKERS > 0.
+
+The shared pool follows engine swaps (engine_provider.swap_model): workers
+with the new revision are started and replace the pool once ready. A worker
+that dies (e.g. killed for memory) breaks the executor; it is rebuilt once
+and the unfinished chunks are retried.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import CancelledError, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import engine_provider
+from ai_engine import (
+    CryptoAI, FINBERT_BACKEND, FINBERT_MODEL_NAME, FINBERT_REVISION, cached_results, get_default_cache,
+)
+from truncation import cache_model, default_policy
+
+# Worker processes; 0 disables the pool (inference runs in the calling process)
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "0"))
+# torch intra-op threads per worker; 0 splits the cores evenly between the workers
+INFERENCE_THREADS_PER_WORKER = int(os.getenv("INFERENCE_THREADS_PER_WORKER", "0"))
+# Texts per task sent to a worker (small enough to balance the load, big enough to fill batches)
+INFERENCE_CHUNK_SIZE = int(os.getenv("INFERENCE_CHUNK_SIZE", "128"))
+
+# --- worker process side ---
+
+_worker_ai = None
+_worker_corpora = {}
+
+
+def _init_worker(threads, model_name, revision, backend):
+    # Before torch is imported, so its thread pools are sized from the start
+    for name in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[name] = str(threads)
+    import torch
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+
+    from sentiment_cache import SentimentCache
+    global _worker_ai
+    # Results are cached by the parent; a worker keeps no cache of its own
+    _worker_ai = CryptoAI(model_name=model_name, revision=revision, cache=SentimentCache(max_entries=0),
+                          backend=backend, load_finbert=True)
+
+
+def _worker_revisions():
+    return dict(_worker_ai.model_revisions)
+
+
+def _worker_corpus(name):
+    # Checked per chunk: a corpus built (or rebuilt) after the worker started is picked up
+    from tokenized_corpus import current_build, load_corpus
+    build = current_build(_worker_ai.tokenizer_revision, name)
+    if build is None:
+        return None
+    corpus = _worker_corpora.get(name)
+    if corpus is None or corpus.meta["build"] != build:
+        corpus = load_corpus(_worker_ai.tokenizer_revision, name)
+        if corpus is None:
+            return None  # not cached, so a later build is still found
+        _worker_corpora[name] = corpus
+    return corpus
+
+
+def _build_corpus(name, texts):
+    from tokenized_corpus import load_or_build
+    return len(load_or_build(_worker_ai, name, texts))
+
+
+def _score_chunk(model, texts, corpus_name=None, policy=None):
+    if model == "vader":
+        return _worker_ai.analyze_vader_batch(texts)
+    from batching import FinBERTScheduler
+    corpus = _worker_corpus(corpus_name) if corpus_name else None
+    return FinBERTScheduler(_worker_ai, corpus=corpus, policy=policy).analyze(texts)
+
+
+# --- parent side ---
+
+class InferencePool:
+    """N model worker processes behind a task queue, with CryptoAI's batch interface"""
+
+    def __init__(self, workers=INFERENCE_WORKERS, threads_per_worker=INFERENCE_THREADS_PER_WORKER,
+                 chunk_size=INFERENCE_CHUNK_SIZE, model_name=FINBERT_MODEL_NAME, revision=FINBERT_REVISION,
+                 backend=FINBERT_BACKEND, cache=None):
+        self.workers = max(1, workers)
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // self.workers)
+        self.chunk_size = max(1, chunk_size)
+        self.model_name = model_name
+        self.revision = revision
+        self.backend_name = backend
+        self.cache = cache if cache is not None else get_default_cache()
+        self.model_revisions = {}
+        self._executor = None
+        self._closed = False
+        self._start_lock = threading.Lock()
+        self.tasks_run = 0
+        self.items_processed = 0
+
+    def start(self):
+        """Spawn the workers and wait until every one has loaded its model"""
+        with self._start_lock:
+            if self._closed:
+                raise RuntimeError("Inference pool was shut down (replaced after an engine swap, or stopping)")
+            if self._executor is not None:
+                return self
+            started = time.perf_counter()
+            print(f"⏳ Starting {self.workers} inference workers ({self.threads_per_worker} torch threads each)...")
+            self._executor, self.model_revisions = self._spawn()
+        for model, revision in self.model_revisions.items():
+            self.cache.set_revision(model, revision)
+        print(f"✅ Inference pool ready in {time.perf_counter() - started:.1f}s ({self.model_revisions['finbert']})")
+        return self
+
+    def _spawn(self):
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.threads_per_worker, self.model_name, self.revision, self.backend_name),
+        )
+        try:
+            # One task per worker forces every process (and its model) to start now
+            futures = [executor.submit(_worker_revisions) for _ in range(self.workers)]
+            revisions = [future.result() for future in futures]
+        except Exception:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        return executor, revisions[0]
+
+    def _replace_broken(self, broken):
+        """Rebuild the executor after a worker died; other callers that saw the same breakage reuse the rebuild"""
+        with self._start_lock:
+            if self._closed:
+                raise RuntimeError("Inference pool was shut down")
+            if self._executor is not broken:
+                return
+            print("⚠️ An inference worker died; restarting the worker processes")
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._executor, self.model_revisions = self._spawn()
+
+    def shutdown(self, wait=True):
+        """Stop the workers; wait=False lets chunks already running finish in the background"""
+        with self._start_lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def prepare_corpus(self, name, texts):
+        """Have a worker build (or reuse) the pre-tokenized corpus name covering texts"""
+        self.start()
+        return self._executor.submit(_build_corpus, name, texts).result()
+
+    def analyze_finbert_batch(self, texts, batch_size=None, on_batch=None, corpus=None, policy=None):
+        """
+        FinBERT results in input order; on_batch(n) is called as chunks complete (cache hits count at once).
+        corpus: name of a pre-tokenized corpus the workers take token ids from.
+        policy: truncation.TruncationPolicy for this call (default: the workers' configured one)
+        """
+        return self.analyze_batch("finbert", texts, on_batch, corpus, policy)
+
+    def analyze_vader_batch(self, texts):
+        return self.analyze_batch("vader", texts)
+
+    def analyze_batch(self, model, texts, on_batch=None, corpus=None, policy=None):
+        if not texts:
+            return []
+        self.start()
+
+        def compute(missing):
+            if on_batch and len(missing) < len(texts):
+                on_batch(len(texts) - len(missing))
+            return self._dispatch(model, missing, on_batch, corpus, policy)
+
+        # Workers use the default policy from the same environment as this process
+        cache_key = cache_model(policy, default_policy()) if model == "finbert" else model
+        return cached_results(self.cache, cache_key, self.model_revisions[model], texts, compute)
+
+    def _dispatch(self, model, texts, on_batch, corpus=None, policy=None):
+        results = [None] * len(texts)
+        todo = list(range(len(texts)))
+        for attempt in range(2):
+            executor = self._executor
+            if executor is None:
+                raise RuntimeError("Inference pool was shut down")
+            try:
+                self._run_chunks(executor, model, texts, todo, results, on_batch, corpus, policy)
+                return results
+            except CancelledError:
+                # shutdown() cancelled the queued chunks (an engine swap replaced this pool)
+                raise RuntimeError("Inference pool was shut down while scoring")
+            except BrokenProcessPool:
+                if attempt:
+                    raise
+                self._replace_broken(executor)
+                # Chunks that completed before the crash keep their results
+                todo = [i for i in todo if results[i] is None]
+        return results
+
+    def _run_chunks(self, executor, model, texts, todo, results, on_batch, corpus, policy):
+        # Similar lengths in a chunk keep the workers' padded batches tight
+        order = sorted(todo, key=lambda i: len(texts[i]))
+        futures = {}
+        for start in range(0, len(order), self.chunk_size):
+            chunk = order[start:start + self.chunk_size]
+            futures[executor.submit(_score_chunk, model, [texts[i] for i in chunk], corpus, policy)] = chunk
+        for future in as_completed(futures):
+            chunk = futures[future]
+            for i, result in zip(chunk, future.result()):
+                results[i] = result
+            self.tasks_run += 1
+            self.items_processed += len(chunk)
+            if on_batch:
+                on_batch(len(chunk))
+
+    def stats(self):
+        return {
+            "running": self._executor is not None,
+            "workers": self.workers,
+            "threads_per_worker": self.threads_per_worker,
+            "chunk_size": self.chunk_size,
+            "revisions": dict(self.model_revisions),
+            "tasks_run": self.tasks_run,
+            "items_processed": self.items_processed,
+        }
+
+
+_pool = None
+_lock = threading.Lock()
+# Model settings of the shared pool; updated by engine swaps
+_pool_settings = {}
+
+
+def get_pool():
+    """The process-wide pool (started on first use), or None when INFERENCE_WORKERS is 0"""
+    global _pool
+    if INFERENCE_WORKERS <= 0:
+        return None
+    with _lock:
+        if _pool is None:
+            _pool = InferencePool(**_pool_settings).start()
+        return _pool
+
+
+def follow_swap(model_name, revision, backend):
+    """
+    Engine swap hook: a running shared pool is replaced by workers loading the swapped-in
+    model once they are ready. Jobs holding the old pool fail instead of scoring with old weights.
+    """
+    global _pool
+    _pool_settings.update(model_name=model_name, revision=revision, backend=backend)
+    old = _pool
+    if old is None or INFERENCE_WORKERS <= 0:
+        return
+    # Started outside the lock: callers keep using the old pool until the new one is ready
+    new = InferencePool(**_pool_settings).start()
+    with _lock:
+        if _pool is not old:
+            new.shutdown()
+            return
+        _pool = new
+    old.shutdown(wait=False)
+    print(f"🔁 Inference pool now serves {new.model_revisions['finbert']}")
+
+
+engine_provider.add_swap_listener(follow_swap)
+
+
+def current_pool():
+    return _pool
+
+
+def warmup(background=True):
+    """Start the shared pool's workers (no-op when the pool is disabled)"""
+    if INFERENCE_WORKERS <= 0:
+        return
+    if background:
+        threading.Thread(target=_warmup_quietly, name="inference-pool-warmup", daemon=True).start()
+    else:
+        get_pool()
+
+
+def _warmup_quietly():
+    try:
+        get_pool()
+    except Exception as e:
+        print(f"❌ Inference pool failed to start: {e}")
+
+
+def shutdown_pool():
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
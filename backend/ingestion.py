@@ -0,0 +1,219 @@
+"""
+Background live news ingestion.
+
+An asyncio service polls the source registry on a schedule (each source at
+its own poll interval/backoff) and pushes fetched articles into a bounded
+queue. A separate inference stage drains the queue in batches, dedups,
+scores and stores them. When the queue is full, fetching waits (backpressure)
+instead of piling articles up in memory.
+
+Work is tracked as jobs: a scheduled poll or a manual "trigger now" request
+creates a job whose id can be used to query its progress.
+"""
+
+import asyncio
+import os
+from collections import OrderedDict
+
+from jobs import JobRegistry, now_iso
+from news_fetcher import fetch_all_sources, ingest_articles, save_feed_validators
+from news_sources import due_sources
+from live_stream import notifier
+
+# Seconds between scheduler ticks; each tick fetches the sources that are due
+INGESTION_TICK_SECONDS = float(os.getenv("INGESTION_TICK_SECONDS", "30"))
+# Articles waiting for inference before fetching blocks
+INGESTION_QUEUE_SIZE = int(os.getenv("INGESTION_QUEUE_SIZE", "500"))
+# Articles per inference batch, and how long to wait for a batch to fill
+INGESTION_BATCH_SIZE = int(os.getenv("INGESTION_BATCH_SIZE", "32"))
+INGESTION_BATCH_WAIT_SECONDS = float(os.getenv("INGESTION_BATCH_WAIT_SECONDS", "1"))
+# Articles requested per source on scheduled polls
+INGESTION_FETCH_LIMIT = int(os.getenv("INGESTION_FETCH_LIMIT", "10"))
+
+
+class IngestionService:
+    """Scheduled fetch -> bounded queue -> batched inference/write pipeline"""
+
+    def __init__(self, tick_seconds=INGESTION_TICK_SECONDS, queue_size=INGESTION_QUEUE_SIZE,
+                 batch_size=INGESTION_BATCH_SIZE, batch_wait=INGESTION_BATCH_WAIT_SECONDS,
+                 fetch_limit=INGESTION_FETCH_LIMIT):
+        self.tick_seconds = tick_seconds
+        self.queue_size = queue_size
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = batch_wait
+        self.fetch_limit = fetch_limit
+        self._queue = None
+        self._tasks = []
+        self._fetch_lock = None
+        self._jobs = JobRegistry()
+        self._active_manual_job = None
+
+    @property
+    def running(self):
+        return bool(self._tasks) and all(not task.done() for task in self._tasks)
+
+    async def start(self, schedule=True):
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._fetch_lock = asyncio.Lock()
+        self._tasks.append(asyncio.create_task(self._inference_loop()))
+        if schedule:
+            self._tasks.append(asyncio.create_task(self._schedule_loop()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    # --- jobs ---
+
+    def _new_job(self, trigger, limit):
+        return self._jobs.new(
+            trigger=trigger,
+            limit=limit,
+            fetched=0,
+            pending=0,
+            added=0,
+            scored=0,
+            near_duplicates=0,
+            sources={},
+            _fetch_done=False,
+            _validators={},
+        )
+
+    def get_job(self, job_id):
+        return self._jobs.snapshot(job_id)
+
+    def list_jobs(self, limit=20):
+        return self._jobs.recent(limit)
+
+    def trigger(self, limit=5):
+        """Start a manual fetch of every enabled source; returns the job (an already running manual job is reused)"""
+        if not self._tasks:
+            raise RuntimeError("Ingestion service is not running")
+        active = self._jobs.get(self._active_manual_job)
+        if active is not None and active["status"] in ("queued", "fetching"):
+            return self.get_job(active["id"])
+        job = self._new_job("manual", limit)
+        self._active_manual_job = job["id"]
+        asyncio.get_running_loop().create_task(self._run_fetch(job, only_due=False))
+        return self.get_job(job["id"])
+
+    def stats(self):
+        return {
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_size": self.queue_size,
+            "batch_size": self.batch_size,
+            "tick_seconds": self.tick_seconds,
+            "jobs": self.list_jobs(5),
+        }
+
+    # --- pipeline stages ---
+
+    async def _schedule_loop(self):
+        while True:
+            job = None
+            try:
+                if due_sources():
+                    job = self._new_job("schedule", self.fetch_limit)
+                    await self._run_fetch(job, only_due=True)
+            except Exception as e:
+                # One bad tick must not stop scheduling
+                print(f"⚠️ Scheduled ingestion tick failed: {e}")
+                if job is not None:
+                    self._fail(job, e)
+            await asyncio.sleep(self.tick_seconds)
+
+    async def _run_fetch(self, job, only_due):
+        async with self._fetch_lock:
+            job["status"] = "fetching"
+            try:
+                articles, per_source, validators = await asyncio.to_thread(
+                    fetch_all_sources, job["limit"], None, only_due
+                )
+            except Exception as e:
+                self._fail(job, e)
+                return
+            job["sources"] = per_source
+            job["_validators"] = validators
+            job["fetched"] = len(articles)
+            job["pending"] = len(articles)
+            if articles:
+                job["status"] = "processing"
+            for article in articles:
+                # Blocks while the inference stage is behind (backpressure)
+                await self._queue.put((job["id"], article))
+            job["_fetch_done"] = True
+            await self._maybe_finish(job)
+
+    async def _next_batch(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _inference_loop(self):
+        while True:
+            batch = await self._next_batch()
+            by_job = OrderedDict()
+            for job_id, article in batch:
+                by_job.setdefault(job_id, []).append(article)
+            for job_id, articles in by_job.items():
+                job = self._jobs.get(job_id)
+                try:
+                    await self._process_batch(job, articles)
+                except Exception as e:
+                    # The loop keeps draining the queue, or fetching would block on it forever
+                    print(f"⚠️ Ingestion batch failed ({len(articles)} articles): {e}")
+                    if job is not None:
+                        self._fail(job, e)
+
+    async def _process_batch(self, job, articles):
+        try:
+            result = await asyncio.to_thread(ingest_articles, articles)
+        finally:
+            if job is not None:
+                job["pending"] -= len(articles)
+        if job is not None and result:
+            for key in ("added", "scored", "near_duplicates"):
+                job[key] += result.get(key, 0)
+        if result and result.get("added"):
+            # Push the committed rows to open live news streams
+            await notifier.notify()
+        if job is not None:
+            await self._maybe_finish(job)
+
+    async def _maybe_finish(self, job):
+        if not job["_fetch_done"] or job["pending"] > 0 or job["finished_at"]:
+            return
+        if job["error"] is None:
+            try:
+                # Validators are only persisted once this job's articles are stored
+                await asyncio.to_thread(save_feed_validators, job["_validators"])
+            except Exception as e:
+                print(f"⚠️ Could not save feed validators: {e}")
+                job["error"] = str(e)
+        job["status"] = "done" if job["error"] is None else "error"
+        job["finished_at"] = now_iso()
+
+    @staticmethod
+    def _fail(job, error):
+        job["error"] = job["error"] or str(error)
+        if not job["finished_at"]:
+            job["status"] = "error"
+            job["finished_at"] = now_iso()
@@ -0,0 +1,64 @@
+"""
+In-memory job tracking shared by the background services (ingestion.py,
+reanalysis.py).
+
+A job is a plain dict the owning service updates in place as work
+progresses; keys starting with "_" are internal and left out of the
+copies returned to API callers. Only the most recent jobs are kept.
+"""
+
+import datetime
+import itertools
+import os
+import threading
+from collections import OrderedDict
+
+# Finished jobs kept per service for status queries
+MAX_TRACKED_JOBS = int(os.getenv("MAX_TRACKED_JOBS", "200"))
+
+
+def now_iso():
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+class JobRegistry:
+    """Recent jobs by id, oldest dropped past max_jobs"""
+
+    def __init__(self, max_jobs=MAX_TRACKED_JOBS):
+        self.max_jobs = max(1, max_jobs)
+        self._jobs = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def new(self, **fields):
+        """Create and track a queued job with the service's own fields; returns the live dict"""
+        with self._lock:
+            job = {
+                "id": str(next(self._ids)),
+                "status": "queued",
+                "created_at": now_iso(),
+                "finished_at": None,
+                "error": None,
+                **fields,
+            }
+            self._jobs[job["id"]] = job
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+        return job
+
+    def get(self, job_id):
+        """The live job dict, or None if unknown or no longer tracked"""
+        return self._jobs.get(job_id) if job_id is not None else None
+
+    def snapshot(self, job_id):
+        """A copy of the job without its internal keys"""
+        job = self.get(job_id)
+        if job is None:
+            return None
+        return {key: value for key, value in job.items() if not key.startswith("_")}
+
+    def recent(self, limit=20):
+        """Snapshots of the latest jobs, newest first"""
+        with self._lock:
+            job_ids = list(self._jobs)[-limit:] if limit > 0 else []
+        return [job for job in map(self.snapshot, reversed(job_ids)) if job is not None]
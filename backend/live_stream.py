@@ -0,0 +1,103 @@
+"""
+Server-sent events stream of newly stored live news.
+
+Ingestion calls notify() after it commits; every open stream then reads the
+rows with id > its last delivered id and pushes them as SSE events (the event
+id is the row id). A reconnecting client sends that id back (Last-Event-ID
+header or last_id parameter) and only receives the rows it missed. Streams
+also re-check the table every HEARTBEAT_SECONDS, so rows written by another
+process (e.g. the sync fetch script) still arrive.
+"""
+
+import asyncio
+import json
+
+from sqlalchemy import func
+from database import SessionLocal, LiveNews
+
+HEARTBEAT_SECONDS = 15
+# Rows per DB read while catching a client up
+STREAM_BATCH_SIZE = 100
+
+
+class LiveNewsNotifier:
+    """Wakes waiting streams when new live news rows are committed"""
+
+    def __init__(self):
+        self._version = 0
+        self._condition = None
+
+    def _get_condition(self):
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    @property
+    def version(self):
+        return self._version
+
+    async def notify(self):
+        condition = self._get_condition()
+        async with condition:
+            self._version += 1
+            condition.notify_all()
+
+    async def wait(self, version, timeout):
+        """Wait until the version moves past `version`; False if timeout elapsed first"""
+        condition = self._get_condition()
+        async with condition:
+            try:
+                await asyncio.wait_for(condition.wait_for(lambda: self._version != version), timeout)
+                return True
+            except asyncio.TimeoutError:
+                return False
+
+
+notifier = LiveNewsNotifier()
+
+
+def live_news_row(news):
+    return {column.name: getattr(news, column.name) for column in LiveNews.__table__.columns}
+
+
+def latest_live_news_id():
+    db = SessionLocal()
+    try:
+        return db.query(func.max(LiveNews.id)).scalar() or 0
+    finally:
+        db.close()
+
+
+def live_news_after(last_id, limit=STREAM_BATCH_SIZE, include_duplicates=True):
+    """Rows with id > last_id, oldest first"""
+    db = SessionLocal()
+    try:
+        query = db.query(LiveNews).filter(LiveNews.id > last_id)
+        if not include_duplicates:
+            query = query.filter(LiveNews.duplicate_of.is_(None))
+        return [live_news_row(news) for news in query.order_by(LiveNews.id).limit(limit).all()]
+    finally:
+        db.close()
+
+
+def _sse_event(row):
+    return f"id: {row['id']}\nevent: live_news\ndata: {json.dumps(row)}\n\n"
+
+
+async def stream_live_news(request, last_id=None, include_duplicates=True):
+    """SSE generator; last_id=None starts with rows stored after the client connected"""
+    if last_id is None:
+        last_id = await asyncio.to_thread(latest_live_news_id)
+    yield "retry: 3000\n\n"
+    while not await request.is_disconnected():
+        version = notifier.version
+        while True:
+            rows = await asyncio.to_thread(live_news_after, last_id, STREAM_BATCH_SIZE, include_duplicates)
+            for row in rows:
+                last_id = row["id"]
+                yield _sse_event(row)
+            if len(rows) < STREAM_BATCH_SIZE:
+                break
+        if not await notifier.wait(version, HEARTBEAT_SECONDS):
+            # Comment line keeps proxies from closing an idle connection
+            yield ": keepalive\n\n"
@@ -1,14 +1,27 @@
-import pandas as pd
-import ast
 import os
-from fastapi import FastAPI, Depends, HTTPException
+import asyncio
+from fastapi import FastAPI, Depends, HTTPException, Header, Request
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
+from typing import Optional
 from sqlalchemy.orm import Session
 from database import engine, SessionLocal, Base, LiveNews
 from models import News
-from ai_engine import CryptoAI
-from sqlalchemy import text
+import engine_provider
+import inference_pool
+import rollups
+import coins
+import search
+from timestamps import day_start_ts, day_end_ts
+from seeding import seed_database
+from pagination import keyset_page
+from microbatch import MicroBatcher
+from ingestion import IngestionService
+from reanalysis import ReanalysisService
+from live_stream import stream_live_news
+from truncation import MODEL_MAX_TOKENS, TruncationPolicy
+from sqlalchemy import text, func, case
 
 # ساخت جداول دیتابیس اگر وجود ندارند
 # Update existing tables with new columns if needed
@@ -34,6 +47,15 @@ try:
             conn.execute(text("ALTER TABLE news ADD COLUMN finbert_score REAL DEFAULT 0.0"))
         except:
             pass  # Column already exists
+        # Model revision behind each stored score; reanalysis skips rows scored by the current one
+        try:
+            conn.execute(text("ALTER TABLE news ADD COLUMN vader_revision TEXT"))
+        except:
+            pass  # Column already exists
+        try:
+            conn.execute(text("ALTER TABLE news ADD COLUMN finbert_revision TEXT"))
+        except:
+            pass  # Column already exists
             
         # Check if VADER and FinBERT columns exist in live_news table, if not create them
         try:
@@ -52,6 +74,33 @@ try:
             conn.execute(text("ALTER TABLE live_news ADD COLUMN finbert_score REAL DEFAULT 0.0"))
         except:
             pass  # Column already exists
+        try:
+            conn.execute(text("ALTER TABLE live_news ADD COLUMN duplicate_of INTEGER"))
+        except:
+            pass  # Column already exists
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_live_news_duplicate_of ON live_news (duplicate_of)"))
+
+        # Unique index on live_news.url: dedup is an index lookup and inserts can use ON CONFLICT DO NOTHING
+        try:
+            conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS ix_live_news_url ON live_news (url)"))
+        except Exception as e:
+            print(f"⚠️ live_news already holds duplicate URLs, creating a non-unique index instead: {e}")
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_live_news_url ON live_news (url)"))
+
+        # Integer UTC epoch next to the date strings, indexed for range filters; filled from the strings once
+        for table_name, date_column in (("news", "published_date"), ("live_news", "date")):
+            try:
+                conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN published_ts INTEGER"))
+            except:
+                pass  # Column already exists
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table_name}_published_ts ON {table_name} (published_ts)"))
+            conn.execute(text(
+                f"UPDATE {table_name} SET published_ts = CAST(strftime('%s', {date_column}) AS INTEGER) "
+                f"WHERE published_ts IS NULL AND {date_column} IS NOT NULL"
+            ))
+
+        # FTS5 keyword index over title/summary of news and live_news, synced by triggers
+        search.ensure_fts_tables(conn)
             
         conn.commit()
 except Exception as e:
@@ -60,8 +109,36 @@ except Exception as e:
 
 app = FastAPI(title="CryptoSentiment Core")
 
-# AI engine instance (initialized at startup)
-ai_engine: CryptoAI = None
+# The AI engine lives in engine_provider (shared with the live fetcher); it is created
+# at startup and FinBERT warms up on a background thread
+
+# How long FinBERT requests wait for a model that is still loading before answering 503
+FINBERT_READY_TIMEOUT = float(os.getenv("FINBERT_READY_TIMEOUT", "0"))
+
+# Coalesces concurrent /api/analyze_text FinBERT calls into one forward pass
+FINBERT_MICROBATCH_MAX_SIZE = int(os.getenv("FINBERT_MICROBATCH_MAX_SIZE", "16"))
+FINBERT_MICROBATCH_MAX_WAIT_MS = float(os.getenv("FINBERT_MICROBATCH_MAX_WAIT_MS", "5"))
+
+# Largest per-article token budget an /api/analyze_text caller may ask for (bounds the work per request)
+ANALYZE_TEXT_MAX_TOKENS = int(os.getenv("ANALYZE_TEXT_MAX_TOKENS", "2048"))
+
+
+def _finbert_batch(texts):
+    return engine_provider.get_engine().analyze_finbert_batch(texts, batch_size=len(texts))
+
+
+finbert_batcher = MicroBatcher(
+    _finbert_batch,
+    max_batch_size=FINBERT_MICROBATCH_MAX_SIZE,
+    max_wait_ms=FINBERT_MICROBATCH_MAX_WAIT_MS,
+)
+
+# Background live news ingestion; set INGESTION_SCHEDULE=0 to only fetch on manual triggers
+INGESTION_SCHEDULE = os.getenv("INGESTION_SCHEDULE", "1") != "0"
+ingestion_service = IngestionService()
+
+# Background bulk reanalysis of the news table (checkpointed, resumed at startup)
+reanalysis_service = ReanalysisService()
 
 # تنظیمات دسترسی (CORS) برای فلاتر و Next.js
 app.add_middleware(
@@ -80,65 +157,67 @@ def get_db():
     finally:
         db.close()
 
-# --- تابع کلیدی: انتقال دیتا از CSV به دیتابیس ---
-def seed_database(db: Session):
-    # چک می‌کنیم اگر دیتابیس خالی است، پرش کنیم
-    try:
-        if db.query(News).count() > 0:
-            print("Database already has data. Skipping seed.")
-            return
-    except Exception as e:
-        print(f"Error checking database: {e}")
-        # If there's an error (like missing columns), we'll continue with seeding
-        # The create_all will handle schema updates
-        pass
-
-    print("Seeding database from CSV...")
-    csv_path = os.path.join("data", "cryptonews.csv")
-    
-    if not os.path.exists(csv_path):
-        print(f"Error: CSV file not found at {csv_path}")
-        return
-
-    # خواندن فایل
-    df = pd.read_csv(csv_path)
-    # Loading all rows from the CSV file
-
-    news_to_add = []
-    for _, row in df.iterrows():
-        # استخراج لیبل احساسات از فرمت خاص رشته‌ای
-        try:
-            # تبدیل "{'class': 'negative', ...}" به دیکشنری
-            sent_dict = ast.literal_eval(row['sentiment'])
-            label = sent_dict.get('class', 'neutral')
-            score = float(sent_dict.get('polarity', 0.0))
-        except:
-            label = 'neutral'
-            score = 0.0
-
-        news_item = News(
-            title=str(row['title']),
-            summary=str(row['text']),  # ستون text در csv میره توی summary
-            source=str(row['source']),
-            url=str(row['url']),
-            published_date=str(row['date']),
-            sentiment_label=label,
-            sentiment_score=score
-        )
-        news_to_add.append(news_item)
-    
-    db.add_all(news_to_add)
-    db.commit()
-    print(f"Successfully added {len(news_to_add)} news items to database.")
-
 # اجرای تابع سیدینگ در لحظه بالا آمدن برنامه
 @app.on_event("startup")
 def startup_event():
-    global ai_engine
     db = SessionLocal()
     seed_database(db)
+    rollups.ensure_built(db)
+    coins.ensure_tagged(db)
     db.close()
-    ai_engine = CryptoAI()
+    engine_provider.warmup(background=True)
+    # Worker processes for bulk inference (only when INFERENCE_WORKERS > 0)
+    inference_pool.warmup(background=True)
+
+
+def get_ai_engine():
+    engine = engine_provider.current_engine()
+    if engine is None:
+        raise HTTPException(status_code=503, detail="AI engine not initialized")
+    return engine
+
+
+def require_finbert():
+    """Return the engine, or raise 503 unless FinBERT is ready within FINBERT_READY_TIMEOUT seconds"""
+    ai_engine = get_ai_engine()
+    if not ai_engine.wait_for_finbert(FINBERT_READY_TIMEOUT):
+        raise HTTPException(
+            status_code=503,
+            detail=f"FinBERT model is {ai_engine.finbert_state.replace('_', ' ')}",
+            headers={"Retry-After": "5"},
+        )
+    return ai_engine
+
+
+@app.on_event("startup")
+async def start_finbert_batcher():
+    await finbert_batcher.start()
+
+
+@app.on_event("shutdown")
+async def stop_finbert_batcher():
+    await finbert_batcher.stop()
+
+
+@app.on_event("startup")
+async def start_ingestion_service():
+    await ingestion_service.start(schedule=INGESTION_SCHEDULE)
+
+
+@app.on_event("shutdown")
+async def stop_ingestion_service():
+    await ingestion_service.stop()
+
+
+@app.on_event("startup")
+def resume_reanalysis():
+    reanalysis_service.resume_interrupted()
+
+
+@app.on_event("shutdown")
+def stop_reanalysis():
+    reanalysis_service.stop()
+    inference_pool.shutdown_pool()
 
 # --- API Endpoints ---
 
@@ -146,236 +225,308 @@ def startup_event():
 def read_root():
     return {"status": "Online", "project": "CryptoSentiment-Core"}
 
+# Readiness: per-model load state (DB endpoints are served regardless)
+@app.get("/api/ready")
+def get_readiness():
+    ai_engine = engine_provider.current_engine()
+    if ai_engine is None:
+        return {"ready": False, "models": {"vader": "not_loaded", "finbert": "not_loaded"}}
+    models = ai_engine.model_states()
+    response = {"ready": all(state == "ready" for state in models.values()), "models": models}
+    if ai_engine.finbert_error:
+        response["finbert_error"] = ai_engine.finbert_error
+    return response
+
 # 1. گرفتن لیست اخبار (با قابلیت صفحه‌بندی)
+def _cursor_page(query, model, cursor, limit):
+    try:
+        return keyset_page(query, model.published_ts, model.id, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Passing cursor (empty for the first page) switches to keyset pagination, newest first:
+# the response becomes {"items": [...], "next_cursor": ...}. skip/limit still returns a plain list.
 @app.get("/api/news")
-def get_news(skip: int = 0, limit: int = 50, q: str = None, start_date: str = None, end_date: str = None, db: Session = Depends(get_db)):
-    query = db.query(News)
-    
-    if q:
-        # Filter by coin name in title or summary
-        query = query.filter(
-            News.title.contains(q) | 
-            News.summary.contains(q)
-        )
-        
-    # Filter by date range if provided
-    if start_date:
-        # Convert to datetime format for proper comparison
-        query = query.filter(News.published_date >= f"{start_date} 00:00:00")
-    if end_date:
-        # Convert to datetime format for proper comparison
-        query = query.filter(News.published_date <= f"{end_date} 23:59:59")
-        
+def get_news(skip: int = 0, limit: int = 50, q: str = None, coin: str = None, start_date: str = None, end_date: str = None, cursor: Optional[str] = None, db: Session = Depends(get_db)):
+    if cursor is not None:
+        query = _filter_news(db.query(News), q, start_date, end_date, coin=coin)
+        return _cursor_page(query, News, cursor, limit)
+    query = _filter_news(db.query(News), q, start_date, end_date, rank=True, coin=coin)
     news = query.offset(skip).limit(limit).all()
     return news
 
-# 2. گرفتن آمار برای نمودارها
-@app.get("/api/stats")
-def get_stats(q: str = None, db: Session = Depends(get_db)):
-    query = db.query(News)
-    
+NEWS_LABEL_COLUMNS = {
+    "original": News.sentiment_label,
+    "vader": News.vader_label,
+    "finbert": News.finbert_label,
+}
+
+
+def _filter_keywords(query, model, q, rank=False):
+    """Keep rows whose title/summary contain every word of q, via the FTS index (bm25-ranked if rank)"""
+    matches = search.fts_matches(model.__tablename__, q)
+    if matches is None:
+        # No FTS5 in this SQLite build (or no words in q): substring scan
+        return query.filter(model.title.contains(q) | model.summary.contains(q))
+    query = query.join(matches, model.id == matches.c.id)
+    return query.order_by(matches.c.rank) if rank else query
+
+
+def _filter_days(query, ts_column, start_date=None, end_date=None):
+    """Inclusive YYYY-MM-DD range as a range scan on the indexed epoch column"""
+    try:
+        if start_date:
+            query = query.filter(ts_column >= day_start_ts(start_date))
+        if end_date:
+            query = query.filter(ts_column <= day_end_ts(end_date))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be YYYY-MM-DD")
+    return query
+
+
+def _rollup_distributions(db, table, models, coin=None, start_date=None, end_date=None):
+    """rollups.rollup_distributions, rejecting malformed dates like _filter_days"""
+    try:
+        return rollups.rollup_distributions(db, table, models, coin, start_date, end_date)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be YYYY-MM-DD")
+
+
+def _filter_news(query, q=None, start_date=None, end_date=None, rank=False, coin=None):
     if q:
         # Filter by coin name in title or summary
-        query = query.filter(
-            News.title.contains(q) | 
-            News.summary.contains(q)
-        )
-    
-    total = query.count()
-    positive = query.filter(News.sentiment_label == 'positive').count()
-    negative = query.filter(News.sentiment_label == 'negative').count()
-    neutral = query.filter(News.sentiment_label == 'neutral').count()
-    
-    return {
-        "total": total,
-        "positive": positive,
-        "negative": negative,
-        "neutral": neutral
-    }
+        query = _filter_keywords(query, News, q, rank)
+    if coin:
+        # Articles tagged with the coin at ingest (ticker, name or alias)
+        query = query.filter(News.id.in_(coins.coin_article_ids("news", coin)))
+    # Filter by date range (UTC days) if provided
+    return _filter_days(query, News.published_ts, start_date, end_date)
+
+
+def sentiment_distributions(query, label_columns):
+    """
+    {name: {total, positive, negative, neutral}} for each label column of the filtered
+    query, computed with conditional sums in a single scan instead of a COUNT per label.
+    """
+    entities = [func.count()]
+    for column in label_columns.values():
+        entities += [func.sum(case((column == label, 1), else_=0)) for label in rollups.SENTIMENT_LABELS]
+    row = query.with_entities(*entities).one()
+    total = row[0]
+    distributions = {}
+    for i, name in enumerate(label_columns):
+        counts = row[1 + i * len(rollups.SENTIMENT_LABELS):1 + (i + 1) * len(rollups.SENTIMENT_LABELS)]
+        distributions[name] = {"total": total, **{label: count or 0 for label, count in zip(rollups.SENTIMENT_LABELS, counts)}}
+    return distributions
+
+
+def news_distributions(db, models, q=None, coin=None, start_date=None, end_date=None):
+    """Coin and date-range stats come from the rollups (O(days)); free-text q still scans the raw rows"""
+    if not q:
+        return _rollup_distributions(db, "news", models, coin, start_date, end_date)
+    query = _filter_news(db.query(News), q, start_date, end_date, coin=coin)
+    return sentiment_distributions(query, {model: NEWS_LABEL_COLUMNS[model] for model in models})
+
+# 2. گرفتن آمار برای نمودارها
+@app.get("/api/stats")
+def get_stats(q: str = None, coin: str = None, db: Session = Depends(get_db)):
+    return news_distributions(db, ["original"], q, coin)["original"]
 
 # 2a. گرفتن آمار VADER
 @app.get("/api/vader_stats")
-def get_vader_stats(q: str = None, start_date: str = None, end_date: str = None, db: Session = Depends(get_db)):
-    query = db.query(News)
-    
-    if q:
-        # Filter by coin name in title or summary
-        query = query.filter(
-            News.title.contains(q) | 
-            News.summary.contains(q)
-        )
-        
-    # Filter by date range if provided
-    if start_date:
-        # Convert to datetime format for proper comparison
-        query = query.filter(News.published_date >= f"{start_date} 00:00:00")
-    if end_date:
-        # Convert to datetime format for proper comparison
-        query = query.filter(News.published_date <= f"{end_date} 23:59:59")
-        
-    total = query.count()
-    positive = query.filter(News.vader_label == 'positive').count()
-    negative = query.filter(News.vader_label == 'negative').count()
-    neutral = query.filter(News.vader_label == 'neutral').count()
-    
-    return {
-        "total": total,
-        "positive": positive,
-        "negative": negative,
-        "neutral": neutral
-    }
+def get_vader_stats(q: str = None, coin: str = None, start_date: str = None, end_date: str = None, db: Session = Depends(get_db)):
+    return news_distributions(db, ["vader"], q, coin, start_date, end_date)["vader"]
 
 # 2b. گرفتن آمار FinBERT
 @app.get("/api/finbert_stats")
-def get_finbert_stats(q: str = None, start_date: str = None, end_date: str = None, db: Session = Depends(get_db)):
-    query = db.query(News)
-    
-    if q:
-        # Filter by coin name in title or summary
-        query = query.filter(
-            News.title.contains(q) | 
-            News.summary.contains(q)
-        )
-        
-    # Filter by date range if provided
-    if start_date:
-        # Convert to datetime format for proper comparison
-        query = query.filter(News.published_date >= f"{start_date} 00:00:00")
-    if end_date:
-        # Convert to datetime format for proper comparison
-        query = query.filter(News.published_date <= f"{end_date} 23:59:59")
-        
-    total = query.count()
-    positive = query.filter(News.finbert_label == 'positive').count()
-    negative = query.filter(News.finbert_label == 'negative').count()
-    neutral = query.filter(News.finbert_label == 'neutral').count()
-    
-    return {
-        "total": total,
-        "positive": positive,
-        "negative": negative,
-        "neutral": neutral
-    }
+def get_finbert_stats(q: str = None, coin: str = None, start_date: str = None, end_date: str = None, db: Session = Depends(get_db)):
+    return news_distributions(db, ["finbert"], q, coin, start_date, end_date)["finbert"]
 
+# 2c. Original, VADER and FinBERT distributions in one round trip
+@app.get("/api/distributions")
+def get_distributions(q: str = None, coin: str = None, start_date: str = None, end_date: str = None, db: Session = Depends(get_db)):
+    return news_distributions(db, rollups.MODELS, q, coin, start_date, end_date)
 
 # --- Request models for AI endpoints ---
 class AnalyzeTextRequest(BaseModel):
     text: str
     model: str  # "vader" or "finbert"
+    # FinBERT truncation policy for this call; unset fields use the FINBERT_* defaults
+    truncation: Optional[str] = None  # "headline", "first_n" or "sliding"
+    max_tokens: Optional[int] = None  # token budget per article
+    window: Optional[int] = None  # sliding: tokens per window
+    stride: Optional[int] = None  # sliding: tokens between window starts
+    aggregate: Optional[str] = None  # sliding: "mean" or "max" of the window logits
 
 
 class ReanalyzeDbRequest(BaseModel):
     model: str  # "vader" or "finbert"
-    limit: int = 100
+    limit: Optional[int] = None  # rows to score in this job; None scores the whole table
+    restart: bool = False  # ignore the checkpoint and rescore rows already scored by this revision
 
 
 # 3. Live AI Playground: analyze text with VADER or FinBERT
 @app.post("/api/analyze_text")
-def analyze_text(body: AnalyzeTextRequest):
-    if ai_engine is None:
-        raise HTTPException(status_code=503, detail="AI engine not initialized")
+async def analyze_text(body: AnalyzeTextRequest):
+    ai_engine = get_ai_engine()
     model = body.model.strip().lower()
     if model not in ("vader", "finbert"):
         raise HTTPException(status_code=400, detail="model must be 'vader' or 'finbert'")
     if model == "vader":
-        result = ai_engine.analyze_vader(body.text)
+        return ai_engine.analyze_vader(body.text)
+    if body.max_tokens is not None and body.max_tokens > ANALYZE_TEXT_MAX_TOKENS:
+        raise HTTPException(status_code=400, detail=f"max_tokens must be at most {ANALYZE_TEXT_MAX_TOKENS}")
+    if body.window is not None and body.window > MODEL_MAX_TOKENS:
+        raise HTTPException(status_code=400, detail=f"window must be at most {MODEL_MAX_TOKENS}")
+    try:
+        policy = TruncationPolicy(body.truncation, body.max_tokens, body.window, body.stride, body.aggregate)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await asyncio.to_thread(require_finbert)
+    if policy.key == ai_engine.truncation.key:
+        result = await finbert_batcher.submit(body.text)
     else:
-        result = ai_engine.analyze_finbert(body.text)
-    return result
+        # The micro-batcher serves the engine's default policy only
+        result = await asyncio.to_thread(ai_engine.analyze_finbert, body.text, policy)
+    return {**result, "truncation": policy.key}
 
 
-# 4. Re-analyze news in DB with selected model
-@app.post("/api/reanalyze_db")
-def reanalyze_db(body: ReanalyzeDbRequest, db: Session = Depends(get_db)):
-    if ai_engine is None:
-        raise HTTPException(status_code=503, detail="AI engine not initialized")
+# 3a. Micro-batching queue metrics for tuning max wait / max batch size
+@app.get("/api/analyze_text/stats")
+def get_analyze_text_stats():
+    return finbert_batcher.stats()
+
+
+# 3b. Sentiment result cache hit/miss counters
+@app.get("/api/cache_stats")
+def get_cache_stats():
+    ai_engine = get_ai_engine()
+    return ai_engine.cache.stats()
+
+
+# 3c. Shared engine: status, explicit warmup and hot-swap to another model revision
+class SwapEngineRequest(BaseModel):
+    revision: Optional[str] = None
+    model_name: str = engine_provider.FINBERT_MODEL_NAME
+    backend: str = engine_provider.FINBERT_BACKEND
+
+
+@app.get("/api/engine")
+def get_engine_info():
+    pool = inference_pool.current_pool()
+    return {**engine_provider.engine_info(), "inference_pool": pool.stats() if pool is not None else None}
+
+
+@app.post("/api/engine/warmup")
+def warmup_engine():
+    engine_provider.warmup(background=True)
+    return engine_provider.engine_info()
+
+
+@app.post("/api/engine/swap")
+def swap_engine(body: SwapEngineRequest):
+    try:
+        started = engine_provider.swap_model(revision=body.revision, model_name=body.model_name, backend=body.backend)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not started:
+        raise HTTPException(status_code=409, detail="An engine swap is already in progress")
+    return engine_provider.engine_info()
+
+
+# 4. Re-analyze the news table with the selected model, as a background job. Scores go to the
+# model's vader_*/finbert_* columns; progress is checkpointed, so a job resumes after a restart.
+@app.post("/api/reanalyze_db", status_code=202)
+def reanalyze_db(body: ReanalyzeDbRequest):
     model = body.model.strip().lower()
     if model not in ("vader", "finbert"):
         raise HTTPException(status_code=400, detail="model must be 'vader' or 'finbert'")
-    limit = max(1, min(body.limit, 1000))  # clamp 1..1000 for speed/safety
-
-    rows = db.query(News).order_by(News.id).limit(limit).all()
-    for row in rows:
-        text = f"{row.title or ''} {row.summary or ''}".strip()
-        if not text:
-            continue
-        if model == "vader":
-            result = ai_engine.analyze_vader(text)
-        else:
-            result = ai_engine.analyze_finbert(text)
-        row.sentiment_label = result.get("label", "neutral")
-        row.sentiment_score = float(result.get("score", 0.0))
-    db.commit()
-    return {"status": "success", "updated_count": len(rows)}
+    limit = max(1, body.limit) if body.limit is not None else None
+    job = reanalysis_service.start(model, limit=limit, restart=body.restart)
+    return {"job_id": job["id"], "status": job["status"]}
+
+# Progress of a reanalysis job: processed/total rows, rows per second and ETA
+@app.get("/api/reanalyze_db/{job_id}")
+def get_reanalyze_job(job_id: str):
+    job = reanalysis_service.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/api/reanalyze_db")
+def list_reanalyze_jobs(limit: int = 20):
+    return reanalysis_service.list_jobs(limit)
 
 # اندپوینت جدید برای گرفتن لیست اخبار زنده
 @app.get("/api/live_news")
-def get_live_news_list(start_date: str = None, end_date: str = None, limit: int = 20, db: Session = Depends(get_db)):
+def get_live_news_list(start_date: str = None, end_date: str = None, limit: int = 20, include_duplicates: bool = True, q: str = None, coin: str = None, cursor: Optional[str] = None, db: Session = Depends(get_db)):
     query = db.query(LiveNews)
+    if q:
+        # Best keyword matches first, then newest (cursor pages are newest first only)
+        query = _filter_keywords(query, LiveNews, q, rank=cursor is None)
+    if coin:
+        query = query.filter(LiveNews.id.in_(coins.coin_article_ids("live_news", coin)))
+    if not include_duplicates:
+        query = query.filter(LiveNews.duplicate_of.is_(None))
     
-    # Filter by date range if provided
-    if start_date:
-        # Convert to datetime format for proper comparison
-        query = query.filter(LiveNews.date >= f"{start_date} 00:00:00")
-    if end_date:
-        # Convert to datetime format for proper comparison
-        query = query.filter(LiveNews.date <= f"{end_date} 23:59:59")
+    # Filter by date range (UTC days) if provided
+    query = _filter_days(query, LiveNews.published_ts, start_date, end_date)
+    if cursor is not None:
+        return _cursor_page(query, LiveNews, cursor, limit)
     
     # جدیدترین‌ها اول بیان (desc)
     news = query.order_by(LiveNews.id.desc()).limit(limit).all()
     return news
 
+# Server-sent events: each newly stored live news row (with VADER and FinBERT results) as it is committed.
+# Clients resume after last_id; on reconnect the Last-Event-ID header EventSource sends takes precedence.
+@app.get("/api/live_news/stream")
+async def stream_live_news_events(request: Request, last_id: Optional[int] = None, include_duplicates: bool = True,
+                                  last_event_id: Optional[str] = Header(None)):
+    if last_event_id and last_event_id.isdigit():
+        last_id = int(last_event_id)
+    return StreamingResponse(
+        stream_live_news(request, last_id=last_id, include_duplicates=include_duplicates),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 # API endpoints for VADER and FinBERT stats for live news
+# Live news stats come from the rollups; syndicated copies are counted once (via their representative)
 @app.get("/api/live_vader_stats")
-def get_live_vader_stats(start_date: str = None, end_date: str = None, db: Session = Depends(get_db)):
-    query = db.query(LiveNews)
-    
-    # Filter by date range if provided
-    if start_date:
-        # Convert to datetime format for proper comparison
-        query = query.filter(LiveNews.date >= f"{start_date} 00:00:00")
-    if end_date:
-        # Convert to datetime format for proper comparison
-        query = query.filter(LiveNews.date <= f"{end_date} 23:59:59")
-        
-    total = query.count()
-    positive = query.filter(LiveNews.vader_label == 'positive').count()
-    negative = query.filter(LiveNews.vader_label == 'negative').count()
-    neutral = query.filter(LiveNews.vader_label == 'neutral').count()
-    
-    return {
-        "total": total,
-        "positive": positive,
-        "negative": negative,
-        "neutral": neutral
-    }
+def get_live_vader_stats(start_date: str = None, end_date: str = None, coin: str = None, db: Session = Depends(get_db)):
+    return _rollup_distributions(db, "live_news", ["vader"], coin, start_date, end_date)["vader"]
 
 @app.get("/api/live_finbert_stats")
-def get_live_finbert_stats(start_date: str = None, end_date: str = None, db: Session = Depends(get_db)):
-    query = db.query(LiveNews)
-    
-    # Filter by date range if provided
-    if start_date:
-        # Convert to datetime format for proper comparison
-        query = query.filter(LiveNews.date >= f"{start_date} 00:00:00")
-    if end_date:
-        # Convert to datetime format for proper comparison
-        query = query.filter(LiveNews.date <= f"{end_date} 23:59:59")
-        
-    total = query.count()
-    positive = query.filter(LiveNews.finbert_label == 'positive').count()
-    negative = query.filter(LiveNews.finbert_label == 'negative').count()
-    neutral = query.filter(LiveNews.finbert_label == 'neutral').count()
-    
-    return {
-        "total": total,
-        "positive": positive,
-        "negative": negative,
-        "neutral": neutral
-    }
-
-@app.post("/api/fetch_live_news")
-def trigger_live_news_fetch(limit: int = 5):
-    from news_fetcher import fetch_and_analyze_latest_news
-    result = fetch_and_analyze_latest_news(limit=limit)
-    return result
+def get_live_finbert_stats(start_date: str = None, end_date: str = None, coin: str = None, db: Session = Depends(get_db)):
+    return _rollup_distributions(db, "live_news", ["finbert"], coin, start_date, end_date)["finbert"]
+
+@app.get("/api/live_distributions")
+def get_live_distributions(start_date: str = None, end_date: str = None, coin: str = None, db: Session = Depends(get_db)):
+    return _rollup_distributions(db, "live_news", rollups.MODELS, coin, start_date, end_date)
+
+# Per-source fetch latency/count metrics from the live news fetcher
+@app.get("/api/sources/metrics")
+def get_sources_metrics():
+    from news_fetcher import get_source_metrics
+    return get_source_metrics()
+
+# Non-blocking: queues a fetch of every source and returns its job id at once
+@app.post("/api/fetch_live_news", status_code=202)
+async def trigger_live_news_fetch(limit: int = 5):
+    try:
+        job = ingestion_service.trigger(limit=limit)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"job_id": job["id"], "status": job["status"]}
+
+@app.get("/api/fetch_live_news/{job_id}")
+def get_live_news_fetch_job(job_id: str):
+    job = ingestion_service.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.get("/api/ingestion/stats")
+def get_ingestion_stats():
+    return ingestion_service.stats()
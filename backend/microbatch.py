@@ -0,0 +1,104 @@
+"""
+Asyncio request coalescer for single-text model calls.
+
+Concurrent callers submit one text each; a background task collects them
+for up to max_wait_ms (or until max_batch_size is reached), runs a single
+batched call off the event loop and resolves every caller's future.
+"""
+
+import asyncio
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+
+class MicroBatcher:
+    """Gathers concurrent submit() calls into batched calls of batch_fn(texts)"""
+
+    def __init__(self, batch_fn, max_batch_size=16, max_wait_ms=5.0):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_ms = max(0.0, float(max_wait_ms))
+        self._queue = None
+        self._worker = None
+        # One thread so batches never run concurrently on the same model
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="microbatch")
+        self.batch_size_histogram = Counter()
+        self.queue_depth_histogram = Counter()
+        self.batches_run = 0
+        self.items_processed = 0
+        self.errors = 0
+
+    async def start(self):
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        self._executor.shutdown(wait=False)
+
+    async def submit(self, text):
+        """Queue one text and wait for its result from the next batch"""
+        if self._worker is None:
+            raise RuntimeError("MicroBatcher is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        # Depth seen by the batch that is about to be formed (including its first item)
+        self.queue_depth_histogram[self._queue.qsize() + 1] += 1
+        deadline = loop.time() + self.max_wait_ms / 1000.0
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            texts = [text for text, _ in batch]
+            self.batch_size_histogram[len(batch)] += 1
+            self.batches_run += 1
+            try:
+                results = await loop.run_in_executor(self._executor, self.batch_fn, texts)
+            except Exception as e:
+                self.errors += 1
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.items_processed += len(batch)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def stats(self):
+        return {
+            "running": self._worker is not None,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "batches_run": self.batches_run,
+            "items_processed": self.items_processed,
+            "errors": self.errors,
+            "batch_size_histogram": {str(k): v for k, v in sorted(self.batch_size_histogram.items())},
+            "queue_depth_histogram": {str(k): v for k, v in sorted(self.queue_depth_histogram.items())},
+        }
@@ -13,13 +13,16 @@ class News(Base):
     source = Column(String)
     url = Column(String)
     published_date = Column(String)  # Store as ISO format datetime string in UTC
+    published_ts = Column(Integer, nullable=True, index=True)  # UTC epoch seconds; date filters and ordering use this
     # Original sentiment fields (keeping for compatibility)
     sentiment_label = Column(String)
     sentiment_score = Column(Float)
     # Separate VADER sentiment fields
     vader_label = Column(String, nullable=True)
     vader_score = Column(Float, nullable=True)
+    vader_revision = Column(String, nullable=True)  # model revision that produced vader_*; see reanalysis.py
     # Separate FinBERT sentiment fields
     finbert_label = Column(String, nullable=True)
     finbert_score = Column(Float, nullable=True)
+    finbert_revision = Column(String, nullable=True)  # model revision that produced finbert_*
 
@@ -0,0 +1,114 @@
+"""
+Near-duplicate detection for syndicated news (MinHash + LSH).
+
+The same story shows up across CryptoCompare, CoinDesk, CoinTelegraph, ...
+under different URLs and slightly edited titles. Each article is reduced to
+word shingles of its normalized title and body, summarized as a MinHash
+signature, and bucketed with locality-sensitive hashing (banded signatures),
+so finding likely copies is a few dictionary lookups instead of a scan.
+"""
+
+import re
+import threading
+import zlib
+from collections import deque
+import numpy as np
+
+NUM_PERM = 64
+BANDS = 16  # BANDS * ROWS == NUM_PERM; candidate threshold ~ (1/BANDS) ** (1/ROWS) ~ 0.5
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+# Words of the body used for shingles; syndicated copies share their lead, not their tails
+MAX_BODY_WORDS = 80
+# Estimated Jaccard similarity at which two articles count as the same story
+SIMILARITY_THRESHOLD = 0.5
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, np.iinfo(np.int64).max, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+_PERM_B = _rng.randint(0, np.iinfo(np.int64).max, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_NON_WORD_RE = re.compile(r"[^a-z0-9$]+")
+
+
+def normalize_words(text):
+    text = _TAG_RE.sub(" ", text or "").lower()
+    return _NON_WORD_RE.sub(" ", text).split()
+
+
+def shingles(title, body):
+    words = normalize_words(title) + normalize_words(body)[:MAX_BODY_WORDS]
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash(title, body):
+    """MinHash signature (NUM_PERM uint64 values) of an article's shingles, or None if it has no words"""
+    grams = shingles(title, body)
+    if not grams:
+        return None
+    hashes = np.array([zlib.crc32(g.encode("utf-8")) for g in grams], dtype=np.uint64)
+    # Universal hashing (a*x + b) mod p per permutation; uint64 overflow is part of the hash
+    with np.errstate(over="ignore"):
+        permuted = (np.outer(hashes, _PERM_A) + _PERM_B) % _MERSENNE_PRIME & _MAX_HASH
+    return permuted.min(axis=0)
+
+
+def similarity(sig_a, sig_b):
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.count_nonzero(sig_a == sig_b)) / NUM_PERM
+
+
+def _band_keys(signature):
+    return [(band, signature[band * ROWS:(band + 1) * ROWS].tobytes()) for band in range(BANDS)]
+
+
+class NearDuplicateIndex:
+    """LSH index of representative articles; oldest entries are evicted past max_entries"""
+
+    def __init__(self, max_entries=5000):
+        self.max_entries = max_entries
+        self._buckets = {}
+        self._entries = {}
+        self._order = deque()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, key, signature, payload=None):
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = (signature, payload)
+            self._order.append(key)
+            for band_key in _band_keys(signature):
+                self._buckets.setdefault(band_key, set()).add(key)
+            while len(self._order) > self.max_entries:
+                self._evict(self._order.popleft())
+
+    def _evict(self, key):
+        signature, _ = self._entries.pop(key)
+        for band_key in _band_keys(signature):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def query(self, signature, threshold=SIMILARITY_THRESHOLD):
+        """Best matching (key, payload, similarity) at or above threshold, else None"""
+        with self._lock:
+            candidates = set()
+            for band_key in _band_keys(signature):
+                candidates.update(self._buckets.get(band_key, ()))
+            best = None
+            for key in candidates:
+                other, payload = self._entries[key]
+                score = similarity(signature, other)
+                if score >= threshold and (best is None or score > best[2]):
+                    best = (key, payload, score)
+            return best
@@ -2,339 +2,616 @@ import requests
 import datetime
 import feedparser
 import re
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from requests.adapters import HTTPAdapter
 from urllib.parse import urlparse
 from bs4 import BeautifulSoup
+from collections import OrderedDict
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 # نکته مهم: LiveNews را ایمپورت کن
-from database import SessionLocal, LiveNews
-from ai_engine import CryptoAI
+from database import SessionLocal, LiveNews, FeedValidator, Base, engine
+from news_sources import get_source, enabled_sources, due_sources, schedule_for, schedule_report, rss_fields
+from engine_provider import get_engine
+import inference_pool
+from near_duplicates import NearDuplicateIndex, minhash
+from timestamps import format_ts, now_ts, parse_ts, struct_time_ts
+import rollups
+import coins
 
-CRYPTOCOMPARE_API_URL = "https://min-api.cryptocompare.com/data/v2/news/?lang=EN"
-NEWS_API_URL = "https://newsapi.org/v2/everything"
-COINDESK_API_URL = "https://www.coindesk.com/feed"
-CRIPTONOMIST_RSS_URL = "https://cointelegraph.com/rss"  # We'll need to handle RSS
+# Source URLs, poll intervals and RSS field mappings live in news_sources.SOURCES
 
 # You'll need to get a free API key from https://newsapi.org/
 NEWS_API_KEY = "YOUR_NEWS_API_KEY_HERE"  # Replace with actual API key or make it configurable
 
-def fetch_cryptocompare_news(limit=5):
-    """Fetch news from CryptoCompare API"""
+# --- Fetch stage tuning ---
+# Sources fetched in parallel (also the size of the shared HTTP connection pool)
+MAX_CONCURRENT_FETCHES = 4
+# Per-request timeout in seconds: (connect, read); a source entry may set its own "timeout"
+DEFAULT_SOURCE_TIMEOUT = (5, 10)
+# Wall-clock cap for the whole fetch stage; sources still running are dropped from this sync
+FETCH_STAGE_TIMEOUT = 30
+
+_session = None
+_session_lock = threading.Lock()
+
+# Per-source fetch metrics: latency, article counts, failures
+_source_metrics = {}
+_metrics_lock = threading.Lock()
+
+# --- Ingestion dedup ---
+# Recently seen/stored URLs, checked before the database
+KNOWN_URL_CACHE_SIZE = 50000
+# URLs per IN (...) lookup, below SQLite's bound-parameter limit
+URL_LOOKUP_CHUNK = 500
+_known_urls = OrderedDict()
+_known_urls_lock = threading.Lock()
+
+# --- Near-duplicate stage ---
+# Representative stories kept in the in-process LSH index (warmed from the latest rows)
+NEAR_DUPLICATE_INDEX_SIZE = 5000
+_near_duplicate_index = None
+_near_duplicate_lock = threading.Lock()
+
+# ETag / Last-Modified per feed URL, loaded from the feed_validators table
+_feed_validators = {}
+_validators_lock = threading.Lock()
+# Per fetch-thread state: whether the feed answered 304 and any new validators to persist
+_fetch_state = threading.local()
+
+
+def get_session():
+    """Shared HTTP session so repeated syncs reuse pooled keep-alive connections"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=MAX_CONCURRENT_FETCHES * 2, pool_maxsize=MAX_CONCURRENT_FETCHES * 2)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers["User-Agent"] = "CryptoSentiment-Core/1.0"
+            _session = session
+        return _session
+
+
+def source_timeout(source):
+    return source.get("timeout", DEFAULT_SOURCE_TIMEOUT)
+
+
+def load_feed_validators():
+    """Refresh the in-memory validators from the database"""
+    Base.metadata.create_all(bind=engine, tables=[FeedValidator.__table__])
+    db = SessionLocal()
     try:
-        response = requests.get(CRYPTOCOMPARE_API_URL)
-        data = response.json()
-        articles = []
-        for item in data.get('Data', [])[:limit]:
-            articles.append({
-                'title': item.get('title', ''),
-                'body': item.get('body', ''),
-                'url': item.get('url', ''),
-                'source': item.get('source_info', {}).get('name', 'CryptoCompare'),
-                'published_on': item.get('published_on', 0),
-                'image_url': item.get('imageurl', '')
-            })
-        return articles
-    except Exception as e:
-        print(f"Error fetching from CryptoCompare: {e}")
-        return []
+        rows = db.query(FeedValidator).all()
+        with _validators_lock:
+            _feed_validators.clear()
+            for row in rows:
+                _feed_validators[row.url] = {"etag": row.etag, "last_modified": row.last_modified}
+    finally:
+        db.close()
 
-def fetch_newsapi_articles(limit=5):
+
+def save_feed_validators(validators):
+    """Persist validators once the articles they cover have been stored"""
+    if not validators:
+        return
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    db = SessionLocal()
+    try:
+        for url, values in validators.items():
+            db.merge(FeedValidator(url=url, etag=values["etag"], last_modified=values["last_modified"], updated_at=now))
+        db.commit()
+    finally:
+        db.close()
+    with _validators_lock:
+        _feed_validators.update(validators)
+
+
+def parse_feed(source):
+    """
+    Conditionally download a source's feed through the pooled session and parse it.
+    Returns None when the server answers 304 Not Modified.
+    """
+    url = source["url"]
+    with _validators_lock:
+        known = _feed_validators.get(url, {})
+    headers = {}
+    if known.get("etag"):
+        headers["If-None-Match"] = known["etag"]
+    if known.get("last_modified"):
+        headers["If-Modified-Since"] = known["last_modified"]
+
+    response = get_session().get(url, headers=headers, timeout=source_timeout(source))
+    if response.status_code == 304:
+        _fetch_state.not_modified = True
+        return None
+    response.raise_for_status()
+
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    # Only stage fetches (_timed_fetch) collect new validators; direct fetches have none to save
+    validators = getattr(_fetch_state, "validators", None)
+    if validators is not None and (etag or last_modified):
+        validators[url] = {"etag": etag, "last_modified": last_modified}
+    return feedparser.parse(response.content)
+
+def fetch_cryptocompare_source(source, limit):
+    """Fetch news from the CryptoCompare API"""
+    response = get_session().get(source["url"], timeout=source_timeout(source))
+    response.raise_for_status()
+    data = response.json()
+    articles = []
+    for item in data.get('Data', [])[:limit]:
+        articles.append({
+            'title': item.get('title', ''),
+            'body': item.get('body', ''),
+            'url': item.get('url', ''),
+            'source': item.get('source_info', {}).get('name', source["name"]),
+            'published_on': item.get('published_on', 0),
+            'image_url': item.get('imageurl', '')
+        })
+    return articles
+
+def fetch_newsapi_source(source, limit):
     """Fetch crypto-related news from NewsAPI"""
     if NEWS_API_KEY == "YOUR_NEWS_API_KEY_HERE":
         print("⚠️ NewsAPI key not configured, skipping NewsAPI fetch")
         return []
     
+    params = {
+        'q': 'cryptocurrency OR bitcoin OR ethereum',
+        'sortBy': 'publishedAt',
+        'pageSize': limit,
+        'apiKey': NEWS_API_KEY
+    }
+    response = get_session().get(source["url"], params=params, timeout=source_timeout(source))
+    response.raise_for_status()
+    data = response.json()
+    articles = []
+    for item in data.get('articles', [])[:limit]:
+        published_at = item.get('publishedAt', '')
+        # Convert ISO format to a UTC epoch
+        timestamp = parse_ts(published_at) or now_ts()
+        
+        articles.append({
+            'title': item.get('title', ''),
+            'body': item.get('description', '') or item.get('content', ''),
+            'url': item.get('url', ''),
+            'source': item.get('source', {}).get('name', source["name"]),
+            'published_on': timestamp,
+            'image_url': item.get('urlToImage', '')
+        })
+    return articles
+
+def _entry_value(entry, candidates):
+    """First non-empty value among an RSS entry's candidate attributes"""
+    for attr in candidates:
+        if attr == 'content':
+            blocks = entry.get('content') or []
+            value = blocks[0].get('value', '') if blocks else ''
+        else:
+            value = entry.get(attr, '')
+        if value:
+            return value
+    return ''
+
+def _entry_timestamp(entry):
+    # Parse publication date (feedparser normalizes it to a UTC struct_time)
+    if entry.get('published_parsed'):
+        return struct_time_ts(entry.published_parsed)
+    return now_ts()
+
+def fetch_rss_source(source, limit):
+    """Generic RSS fetch: download (conditionally), then normalize entries via the source's field mapping"""
+    feed = parse_feed(source)
+    if feed is None:
+        return []  # 304: nothing new, skip parsing and inference
+    fields = rss_fields(source)
+    articles = []
+    for entry in feed.entries[:limit]:
+        articles.append({
+            'title': _entry_value(entry, fields['title']),
+            'body': _entry_value(entry, fields['body']),
+            'url': _entry_value(entry, fields['url']),
+            'source': source['name'],
+            'published_on': _entry_timestamp(entry),
+            'image_url': _entry_value(entry, fields['image_url']),
+        })
+    return articles
+
+# Fetch engine per source "type" in the registry
+FETCHERS_BY_TYPE = {
+    'rss': fetch_rss_source,
+    'cryptocompare': fetch_cryptocompare_source,
+    'newsapi': fetch_newsapi_source,
+}
+
+def fetch_source(name, limit=5):
+    """Fetch one registered source by name; errors are logged and yield no articles"""
+    source = get_source(name)
     try:
-        params = {
-            'q': 'cryptocurrency OR bitcoin OR ethereum',
-            'sortBy': 'publishedAt',
-            'pageSize': limit,
-            'apiKey': NEWS_API_KEY
-        }
-        response = requests.get(NEWS_API_URL, params=params)
-        data = response.json()
-        articles = []
-        for item in data.get('articles', [])[:limit]:
-            published_at = item.get('publishedAt', '')
-            # Convert ISO format to timestamp
-            if published_at:
-                dt = datetime.datetime.fromisoformat(published_at.replace('Z', '+00:00'))
-                timestamp = int(dt.timestamp())
-            else:
-                timestamp = int(datetime.datetime.now().timestamp())
-            
-            articles.append({
-                'title': item.get('title', ''),
-                'body': item.get('description', '') or item.get('content', ''),
-                'url': item.get('url', ''),
-                'source': item.get('source', {}).get('name', 'NewsAPI'),
-                'published_on': timestamp,
-                'image_url': item.get('urlToImage', '')
-            })
-        return articles
+        return FETCHERS_BY_TYPE[source['type']](source, limit)
     except Exception as e:
-        print(f"Error fetching from NewsAPI: {e}")
+        print(f"Error fetching from {name}: {e}")
         return []
 
+# Per-source helpers kept for existing callers and scripts
+def fetch_cryptocompare_news(limit=5):
+    """Fetch news from CryptoCompare API"""
+    return fetch_source('CryptoCompare', limit)
+
+def fetch_newsapi_articles(limit=5):
+    """Fetch crypto-related news from NewsAPI"""
+    return fetch_source('NewsAPI', limit)
+
 def fetch_coindesk_news(limit=5):
     """Fetch news from CoinDesk RSS feed"""
-    try:
-        rss_url = "https://www.coindesk.com/feed/"
-        feed = feedparser.parse(rss_url)
-        articles = []
-        for entry in feed.entries[:limit]:
-            # Parse publication date
-            if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                published_dt = datetime.datetime(*entry.published_parsed[:6])
-                timestamp = int(published_dt.timestamp())
-            else:
-                timestamp = int(datetime.datetime.now().timestamp())
-            
-            # Get content from description or content
-            content = getattr(entry, 'summary', '')
-            if not content and hasattr(entry, 'content'):
-                content = entry.content[0].value if entry.content else ''
-            
-            articles.append({
-                'title': entry.get('title', ''),
-                'body': content,
-                'url': entry.get('link', ''),
-                'source': 'CoinDesk',
-                'published_on': timestamp,
-                'image_url': ''  # Extract from content if available
-            })
-        return articles
-    except Exception as e:
-        print(f"Error fetching from CoinDesk: {e}")
-        return []
+    return fetch_source('CoinDesk', limit)
 
 def fetch_cointelegraph_news(limit=5):
     """Fetch news from CoinTelegraph RSS feed"""
-    try:
-        rss_url = "https://cointelegraph.com/rss"
-        feed = feedparser.parse(rss_url)
-        articles = []
-        for entry in feed.entries[:limit]:
-            # Parse publication date
-            if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                published_dt = datetime.datetime(*entry.published_parsed[:6])
-                timestamp = int(published_dt.timestamp())
-            else:
-                timestamp = int(datetime.datetime.now().timestamp())
-            
-            # Get content from description
-            content = getattr(entry, 'summary', '')
-            
-            articles.append({
-                'title': entry.get('title', ''),
-                'body': content,
-                'url': entry.get('link', ''),
-                'source': 'CoinTelegraph',
-                'published_on': timestamp,
-                'image_url': ''  # Extract from content if available
-            })
-        return articles
-    except Exception as e:
-        print(f"Error fetching from CoinTelegraph: {e}")
-        return []
+    return fetch_source('CoinTelegraph', limit)
 
 def fetch_crypto_news_org(limit=5):
     """Fetch news from CryptoNews.org RSS feed"""
-    try:
-        rss_url = "https://cryptonews.com/news/bitcoin.rss"
-        feed = feedparser.parse(rss_url)
-        articles = []
-        for entry in feed.entries[:limit]:
-            # Parse publication date
-            if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                published_dt = datetime.datetime(*entry.published_parsed[:6])
-                timestamp = int(published_dt.timestamp())
-            else:
-                timestamp = int(datetime.datetime.now().timestamp())
-            
-            # Get content from description
-            content = getattr(entry, 'summary', '')
-            
-            articles.append({
-                'title': entry.get('title', ''),
-                'body': content,
-                'url': entry.get('link', ''),
-                'source': 'CryptoNews',
-                'published_on': timestamp,
-                'image_url': ''
-            })
-        return articles
-    except Exception as e:
-        print(f"Error fetching from CryptoNews: {e}")
-        return []
+    return fetch_source('CryptoNews', limit)
 
 def fetch_bitcoin_magazine_news(limit=5):
     """Fetch news from Bitcoin Magazine RSS feed"""
-    try:
-        rss_url = "https://bitcoinmagazine.com/feed"
-        feed = feedparser.parse(rss_url)
-        articles = []
-        for entry in feed.entries[:limit]:
-            # Parse publication date
-            if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                published_dt = datetime.datetime(*entry.published_parsed[:6])
-                timestamp = int(published_dt.timestamp())
-            else:
-                timestamp = int(datetime.datetime.now().timestamp())
-            
-            # Get content from description
-            content = getattr(entry, 'summary', '')
-            
-            articles.append({
-                'title': entry.get('title', ''),
-                'body': content,
-                'url': entry.get('link', ''),
-                'source': 'Bitcoin Magazine',
-                'published_on': timestamp,
-                'image_url': ''
-            })
-        return articles
-    except Exception as e:
-        print(f"Error fetching from Bitcoin Magazine: {e}")
-        return []
+    return fetch_source('Bitcoin Magazine', limit)
 
 def fetch_crypto_slate_news(limit=5):
     """Fetch news from CryptoSlate RSS feed"""
+    return fetch_source('CryptoSlate', limit)
+
+
+def _record_source_metrics(source, latency, count, error=None, not_modified=False):
+    with _metrics_lock:
+        metrics = _source_metrics.setdefault(source, {
+            "fetches": 0,
+            "failures": 0,
+            "timeouts": 0,
+            "not_modified": 0,
+            "articles": 0,
+            "total_latency_ms": 0.0,
+        })
+        metrics["fetches"] += 1
+        metrics["articles"] += count
+        metrics["last_count"] = count
+        metrics["last_error"] = error
+        if error == "timeout":
+            metrics["timeouts"] += 1
+        elif error:
+            metrics["failures"] += 1
+        if not_modified:
+            metrics["not_modified"] += 1
+        if latency is not None:
+            metrics["total_latency_ms"] += latency * 1000
+            metrics["last_latency_ms"] = round(latency * 1000, 1)
+        metrics["last_fetch_at"] = datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+def get_source_metrics():
+    """Per-source fetch latency, counts and poll schedule"""
+    with _metrics_lock:
+        report = {}
+        for source, metrics in _source_metrics.items():
+            entry = dict(metrics)
+            timed = metrics["fetches"] - metrics["timeouts"]
+            entry["avg_latency_ms"] = round(metrics["total_latency_ms"] / timed, 1) if timed else None
+            del entry["total_latency_ms"]
+            report[source] = entry
+    for source, schedule in schedule_report().items():
+        report.setdefault(source, {})["schedule"] = schedule
+    return report
+
+
+def _timed_fetch(source, limit):
+    _fetch_state.not_modified = False
+    _fetch_state.validators = {}
+    start = time.perf_counter()
     try:
-        rss_url = "https://cryptoslate.com/feed/"
-        feed = feedparser.parse(rss_url)
+        articles = FETCHERS_BY_TYPE[source['type']](source, limit)
+        error = None
+    except Exception as e:
         articles = []
-        for entry in feed.entries[:limit]:
-            # Parse publication date
-            if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                published_dt = datetime.datetime(*entry.published_parsed[:6])
-                timestamp = int(published_dt.timestamp())
-            else:
-                timestamp = int(datetime.datetime.now().timestamp())
-            
-            # Get content from description
-            content = getattr(entry, 'summary', '')
-            
-            articles.append({
-                'title': entry.get('title', ''),
-                'body': content,
-                'url': entry.get('link', ''),
-                'source': 'CryptoSlate',
-                'published_on': timestamp,
-                'image_url': ''
-            })
-        return articles
+        error = str(e)
+        print(f"Error fetching from {source['name']}: {e}")
+    latency = time.perf_counter() - start
+    return articles, latency, error, _fetch_state.not_modified, _fetch_state.validators
+
+
+def fetch_all_sources(limit=10, sources=None, only_due=False):
+    """
+    Fetch sources concurrently (bounded by MAX_CONCURRENT_FETCHES).
+    sources defaults to every enabled registry entry; only_due keeps those whose
+    poll interval/backoff has elapsed. Returns (articles, per_source, validators) with
+    articles merged in registry order; validators should be passed to
+    save_feed_validators() after the articles are stored.
+    """
+    if sources is None:
+        sources = due_sources() if only_due else enabled_sources()
+    try:
+        load_feed_validators()
     except Exception as e:
-        print(f"Error fetching from CryptoSlate: {e}")
+        print(f"⚠️ Could not load feed validators, fetching unconditionally: {e}")
+    executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_FETCHES, thread_name_prefix="news-fetch")
+    futures = {executor.submit(_timed_fetch, source, limit): source for source in sources}
+    wait(futures, timeout=FETCH_STAGE_TIMEOUT)
+    # Never block the sync on a straggler: unfinished sources are skipped this round
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    all_articles = []
+    per_source = {}
+    validators = {}
+    for future, source in futures.items():
+        name = source['name']
+        schedule = schedule_for(source)
+        if not future.done():
+            schedule.record_failure()
+            _record_source_metrics(name, None, 0, "timeout")
+            per_source[name] = {"count": 0, "latency_ms": None, "timed_out": True}
+            print(f"⏱️ {name} did not respond within {FETCH_STAGE_TIMEOUT}s, skipping")
+            continue
+        articles, latency, error, not_modified, source_validators = future.result()
+        if error:
+            schedule.record_failure()
+        else:
+            schedule.record_success()
+        _record_source_metrics(name, latency, len(articles), error, not_modified)
+        per_source[name] = {"count": len(articles), "latency_ms": round(latency * 1000, 1)}
+        validators.update(source_validators)
+        if not_modified:
+            per_source[name]["not_modified"] = True
+            print(f"💤 {name} not modified since last sync (304)")
+            continue
+        if articles:
+            all_articles.extend(articles)
+            print(f"📥 Fetched {len(articles)} articles from {name} in {latency:.2f}s")
+    return all_articles, per_source, validators
+
+
+def _article_ts(published_on):
+    # Publication epoch (UTC); articles without one are stamped with the fetch time
+    return parse_ts(published_on) or now_ts()
+
+
+def _remember_urls(urls):
+    with _known_urls_lock:
+        for url in urls:
+            _known_urls[url] = True
+            _known_urls.move_to_end(url)
+        while len(_known_urls) > KNOWN_URL_CACHE_SIZE:
+            _known_urls.popitem(last=False)
+
+
+def filter_new_articles(db, articles):
+    """
+    Drop articles whose URL is already stored (or repeated within this batch).
+    Uses an in-process set of recently seen URLs, then one IN query per chunk
+    against the unique url index, before any inference is spent on them.
+    """
+    candidates = {}
+    with _known_urls_lock:
+        for article in articles:
+            url = article.get('url', '')
+            if url and url not in candidates and url not in _known_urls:
+                candidates[url] = article
+    if not candidates:
         return []
 
+    urls = list(candidates)
+    stored = set()
+    for start in range(0, len(urls), URL_LOOKUP_CHUNK):
+        chunk = urls[start:start + URL_LOOKUP_CHUNK]
+        stored.update(url for (url,) in db.query(LiveNews.url).filter(LiveNews.url.in_(chunk)))
+    _remember_urls(stored)
+    return [article for url, article in candidates.items() if url not in stored]
+
+
+def _live_news_row(article, full_text, finbert_res, vader_res, duplicate_of=None):
+    published_ts = _article_ts(article.get('published_on', 0))
+    return {
+        'title': article.get('title', ''),
+        'text': article.get('body', ''),
+        'summary': full_text[:200],
+        'url': article.get('url', ''),
+        'source': article.get('source', 'Unknown'),
+        'date': format_ts(published_ts),  # UTC
+        'published_ts': published_ts,
+        'sentiment': str({"class": finbert_res['label'], "score": finbert_res['score']}),
+        'sentiment_label': finbert_res['label'],
+        'sentiment_score': finbert_res['score'],
+        'vader_label': vader_res['label'],
+        'vader_score': vader_res['score'],
+        'finbert_label': finbert_res['label'],
+        'finbert_score': finbert_res['score'],
+        'duplicate_of': duplicate_of,
+    }
+
+
+def score_articles(ai, articles):
+    """Build live_news rows for new articles with batched FinBERT and VADER (ai: CryptoAI or InferencePool)"""
+    texts = [f"{a.get('title', '')}. {a.get('body', '')}" for a in articles]
+    # تحلیل با FinBERT به صورت دسته‌ای (یک forward pass برای هر batch)
+    finbert_results = ai.analyze_finbert_batch(texts)
+    # تحلیل با VADER
+    vader_results = ai.analyze_vader_batch(texts)
+    return [
+        _live_news_row(article, full_text, finbert_res, vader_res)
+        for article, full_text, finbert_res, vader_res in zip(articles, texts, finbert_results, vader_results)
+    ]
+
+
+def insert_live_news(db, rows):
+    """
+    Bulk insert; rows whose URL raced in meanwhile are skipped by ON CONFLICT DO NOTHING.
+    Returns the URLs actually inserted, to be remembered once the transaction commits.
+    """
+    if not rows:
+        return []
+    table = LiveNews.__table__
+    # Core executemany on the session's connection (same transaction), not an ORM bulk insert;
+    # RETURNING reports only the rows actually inserted, so the rollups count each row once
+    conn = db.connection()
+    inserted = conn.execute(sqlite_insert(table).on_conflict_do_nothing().returning(table.c.id, table.c.url), rows).all()
+    ids = {url: row_id for row_id, url in inserted}
+    inserted_rows = [dict(row, id=ids[row['url']]) for row in rows if row['url'] in ids]
+    tags = [coins.row_coins("live_news", row) for row in inserted_rows]
+    rollups.record_inserted(conn, "live_news", inserted_rows, tags)
+    coins.record_article_coins(conn, "live_news", inserted_rows, tags)
+    return list(ids)
+
+
+def _scores_payload(row_id, row):
+    return {
+        'id': row_id,
+        'vader_label': row['vader_label'],
+        'vader_score': row['vader_score'],
+        'finbert_label': row['finbert_label'],
+        'finbert_score': row['finbert_score'],
+    }
+
+
+def get_near_duplicate_index(db):
+    """Process-wide LSH index of representative live_news rows, warmed from the most recent ones"""
+    global _near_duplicate_index
+    with _near_duplicate_lock:
+        if _near_duplicate_index is None:
+            index = NearDuplicateIndex(max_entries=NEAR_DUPLICATE_INDEX_SIZE)
+            recent = (
+                db.query(LiveNews)
+                .filter(LiveNews.duplicate_of.is_(None))
+                .order_by(LiveNews.id.desc())
+                .limit(NEAR_DUPLICATE_INDEX_SIZE)
+                .all()
+            )
+            for row in reversed(recent):
+                signature = minhash(row.title, row.text)
+                if signature is not None:
+                    scores = {key: getattr(row, key) for key in ('vader_label', 'vader_score', 'finbert_label', 'finbert_score')}
+                    index.add(row.id, signature, _scores_payload(row.id, scores))
+            _near_duplicate_index = index
+        return _near_duplicate_index
+
+
+def cluster_articles(index, articles):
+    """
+    Split new articles into representatives (to be scored) and near-duplicates.
+    Returns (representatives, duplicates): representatives are (article, signature);
+    duplicates are (article, target) with target ("stored", payload) for a copy of an
+    existing live_news row, or ("batch", article) for a copy of a representative in this batch.
+    """
+    batch_index = NearDuplicateIndex(max_entries=max(1, len(articles)))
+    representatives = []
+    duplicates = []
+    for article in articles:
+        signature = minhash(article.get('title', ''), article.get('body', ''))
+        if signature is None:
+            representatives.append((article, None))
+            continue
+        match = index.query(signature)
+        if match is not None:
+            duplicates.append((article, ("stored", match[1])))
+            continue
+        match = batch_index.query(signature)
+        if match is not None:
+            duplicates.append((article, ("batch", representatives[match[0]][0])))
+            continue
+        batch_index.add(len(representatives), signature)
+        representatives.append((article, signature))
+    return representatives, duplicates
+
+
+def _ids_by_url(db, urls):
+    ids = {}
+    urls = list(urls)
+    for start in range(0, len(urls), URL_LOOKUP_CHUNK):
+        chunk = urls[start:start + URL_LOOKUP_CHUNK]
+        ids.update(db.query(LiveNews.url, LiveNews.id).filter(LiveNews.url.in_(chunk)).all())
+    return ids
+
+
+def _duplicate_rows(duplicates, rows_by_url, ids):
+    rows = []
+    for article, (kind, target) in duplicates:
+        if kind == "stored":
+            payload = target
+        else:
+            url = target.get('url', '')
+            if url not in ids:
+                continue
+            payload = _scores_payload(ids[url], rows_by_url[url])
+        full_text = f"{article.get('title', '')}. {article.get('body', '')}"
+        rows.append(_live_news_row(
+            article,
+            full_text,
+            {'label': payload['finbert_label'], 'score': payload['finbert_score']},
+            {'label': payload['vader_label'], 'score': payload['vader_score']},
+            duplicate_of=payload['id'],
+        ))
+    return rows
+
+
+def ingest_articles(articles, ai=None):
+    """
+    Dedup, score and store fetched articles. Known URLs are dropped, syndicated copies
+    are linked to one representative per story, and only representatives reach the models.
+    """
+    db: Session = SessionLocal()
+    try:
+        new_articles = filter_new_articles(db, articles)
+        print(f"🔎 {len(new_articles)} new of {len(articles)} fetched articles")
+        if not new_articles:
+            return {"added": 0, "scored": 0, "near_duplicates": 0}
+
+        index = get_near_duplicate_index(db)
+        representatives, duplicates = cluster_articles(index, new_articles)
+        if duplicates:
+            print(f"🧬 {len(duplicates)} near-duplicate copies will reuse their representative's scores")
+
+        rows = []
+        if representatives:
+            print("🧠 Loading AI Engine...")
+            # The worker pool when INFERENCE_WORKERS is set, else the in-process engine
+            ai = ai or inference_pool.get_pool() or get_engine()
+            rows = score_articles(ai, [article for article, _ in representatives])
+        inserted_urls = insert_live_news(db, rows)
+
+        rows_by_url = {row['url']: row for row in rows}
+        ids = _ids_by_url(db, rows_by_url)
+        duplicate_rows = _duplicate_rows(duplicates, rows_by_url, ids)
+        inserted_urls += insert_live_news(db, duplicate_rows)
+        db.commit()
+        # Only after the commit: rolled-back articles must stay fetchable on the next sync
+        _remember_urls(inserted_urls)
+        added = len(inserted_urls)
+
+        for (article, signature), row in zip(representatives, rows):
+            if signature is not None and row['url'] in ids:
+                index.add(ids[row['url']], signature, _scores_payload(ids[row['url']], row))
+        for row in rows:
+            print(f"✅ Live News Saved: {row['title'][:30]}... [{row['finbert_label']}] from {row['source']}")
+        return {"added": added, "scored": len(rows), "near_duplicates": len(duplicate_rows)}
+    finally:
+        db.close()
+
+
 def fetch_and_analyze_latest_news(limit=10):
     print(f"🌍 Connecting to Multiple Crypto News Sources (Limit: {limit})...")
     
-    # Fetch from multiple sources
-    all_articles = []
-    
-    # Fetch from CryptoCompare
-    cc_articles = fetch_cryptocompare_news(limit)
-    all_articles.extend(cc_articles)
-    print(f"📥 Fetched {len(cc_articles)} articles from CryptoCompare")
-    
-    # Fetch from NewsAPI
-    na_articles = fetch_newsapi_articles(limit)
-    if na_articles:
-        all_articles.extend(na_articles)
-        print(f"📥 Fetched {len(na_articles)} articles from NewsAPI")
-    
-    # Fetch from CoinDesk
-    cd_articles = fetch_coindesk_news(limit)
-    if cd_articles:
-        all_articles.extend(cd_articles)
-        print(f"📥 Fetched {len(cd_articles)} articles from CoinDesk")
-    
-    # Fetch from CoinTelegraph
-    ct_articles = fetch_cointelegraph_news(limit)
-    if ct_articles:
-        all_articles.extend(ct_articles)
-        print(f"📥 Fetched {len(ct_articles)} articles from CoinTelegraph")
-    
-    # Fetch from CryptoNews
-    cn_articles = fetch_crypto_news_org(limit)
-    if cn_articles:
-        all_articles.extend(cn_articles)
-        print(f"📥 Fetched {len(cn_articles)} articles from CryptoNews")
-    
-    # Fetch from Bitcoin Magazine
-    bm_articles = fetch_bitcoin_magazine_news(limit)
-    if bm_articles:
-        all_articles.extend(bm_articles)
-        print(f"📥 Fetched {len(bm_articles)} articles from Bitcoin Magazine")
-    
-    # Fetch from CryptoSlate
-    cs_articles = fetch_crypto_slate_news(limit)
-    if cs_articles:
-        all_articles.extend(cs_articles)
-        print(f"📥 Fetched {len(cs_articles)} articles from CryptoSlate")
+    # Fetch from all sources in parallel
+    all_articles, per_source, validators = fetch_all_sources(limit)
     
     if not all_articles:
+        if any(stats.get("not_modified") for stats in per_source.values()):
+            return {"status": "success", "added": 0, "sources": per_source}
         return {"status": "error", "message": "No articles fetched from any source"}
 
-    print("🧠 Loading AI Engine...")
-    ai = CryptoAI()
-    
-    db: Session = SessionLocal()
-    new_count = 0
-    
     print("🔄 Processing Live News...")
-    for article in all_articles:
-        try:
-            title = article.get('title', '')
-            body = article.get('body', '')
-            url = article.get('url', '')
-            source = article.get('source', 'Unknown')
-            published_on = article.get('published_on', 0)
-            
-            # Handle timestamp conversion
-            if isinstance(published_on, int) and published_on > 0:
-                date_str = datetime.datetime.fromtimestamp(published_on).strftime('%Y-%m-%d %H:%M:%S')
-            else:
-                date_str = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-
-            # چک تکراری بودن در جدول LiveNews
-            exists = db.query(LiveNews).filter(LiveNews.url == url).first()
-            if exists:
-                continue
-
-            full_text = f"{title}. {body}"
-            
-            # تحلیل با FinBERT
-            finbert_res = ai.analyze_finbert(full_text)
-            # تحلیل با VADER
-            vader_res = ai.analyze_vader(full_text)
-            
-            # ذخیره در جدول جدید LiveNews
-            new_item = LiveNews(
-                title=title,
-                text=body,
-                summary=full_text[:200],
-                url=url,
-                source=source,
-                date=date_str,
-                sentiment=str({"class": finbert_res['label'], "score": finbert_res['score']}),
-                sentiment_label=finbert_res['label'],
-                sentiment_score=finbert_res['score'],
-                vader_label=vader_res['label'],
-                vader_score=vader_res['score'],
-                finbert_label=finbert_res['label'],
-                finbert_score=finbert_res['score']
-            )
-            
-            db.add(new_item)
-            new_count += 1
-            print(f"✅ Live News Saved: {title[:30]}... [{finbert_res['label']}] from {source}")
-            
-        except Exception as e:
-            print(f"⚠️ Error processing article: {e}")
-            continue
-
-    db.commit()
-    db.close()
-    return {"status": "success", "added": new_count}
\ No newline at end of file
+    ingested = ingest_articles(all_articles)
+    save_feed_validators(validators)
+    return {"status": "success", **ingested, "sources": per_source}
@@ -0,0 +1,135 @@
+"""
+Declarative registry of live news sources.
+
+Each source is one config entry: name, fetch type, URL, poll interval and
+(for RSS) which entry fields map to title/body/url/image. One generic engine
+in news_fetcher.py fetches and normalizes every RSS entry, so adding a feed
+is a new entry here rather than another copy of a fetch function.
+
+Every source also gets its own schedule: it is polled every poll_interval
+seconds, and after failures it backs off exponentially up to MAX_BACKOFF.
+"""
+
+import threading
+import time
+
+DEFAULT_POLL_INTERVAL = 300  # seconds
+MAX_BACKOFF = 3600  # seconds
+
+# Candidate entry attributes per article field; the first non-empty one wins.
+# "content" is feedparser's list of content blocks (its first value is used).
+DEFAULT_RSS_FIELDS = {
+    "title": ["title"],
+    "body": ["summary"],
+    "url": ["link"],
+    "image_url": [],
+}
+
+SOURCES = [
+    {
+        "name": "CryptoCompare",
+        "type": "cryptocompare",
+        "url": "https://min-api.cryptocompare.com/data/v2/news/?lang=EN",
+        "poll_interval": 120,
+    },
+    {
+        "name": "NewsAPI",
+        "type": "newsapi",
+        "url": "https://newsapi.org/v2/everything",
+        "poll_interval": 900,
+    },
+    {
+        "name": "CoinDesk",
+        "type": "rss",
+        "url": "https://www.coindesk.com/feed/",
+        "fields": {"body": ["summary", "content"]},
+    },
+    {
+        "name": "CoinTelegraph",
+        "type": "rss",
+        "url": "https://cointelegraph.com/rss",
+    },
+    {
+        "name": "CryptoNews",
+        "type": "rss",
+        "url": "https://cryptonews.com/news/bitcoin.rss",
+    },
+    {
+        "name": "Bitcoin Magazine",
+        "type": "rss",
+        "url": "https://bitcoinmagazine.com/feed",
+    },
+    {
+        "name": "CryptoSlate",
+        "type": "rss",
+        "url": "https://cryptoslate.com/feed/",
+    },
+]
+
+
+def get_source(name):
+    for source in SOURCES:
+        if source["name"] == name:
+            return source
+    raise KeyError(f"Unknown news source '{name}'")
+
+
+def enabled_sources():
+    return [source for source in SOURCES if source.get("enabled", True)]
+
+
+def rss_fields(source):
+    """The source's field mapping merged over DEFAULT_RSS_FIELDS"""
+    fields = dict(DEFAULT_RSS_FIELDS)
+    fields.update(source.get("fields", {}))
+    return fields
+
+
+class SourceSchedule:
+    """Poll timing and failure backoff for one source"""
+
+    def __init__(self, poll_interval):
+        self.poll_interval = poll_interval
+        self.next_poll_at = 0.0
+        self.consecutive_failures = 0
+
+    def is_due(self, now=None):
+        return (now or time.time()) >= self.next_poll_at
+
+    def record_success(self, now=None):
+        self.consecutive_failures = 0
+        self.next_poll_at = (now or time.time()) + self.poll_interval
+
+    def record_failure(self, now=None):
+        self.consecutive_failures += 1
+        backoff = min(self.poll_interval * (2 ** self.consecutive_failures), MAX_BACKOFF)
+        self.next_poll_at = (now or time.time()) + backoff
+
+    def report(self):
+        return {
+            "poll_interval": self.poll_interval,
+            "next_poll_in": max(0.0, round(self.next_poll_at - time.time(), 1)),
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+
+_schedules = {}
+_schedules_lock = threading.Lock()
+
+
+def schedule_for(source):
+    with _schedules_lock:
+        schedule = _schedules.get(source["name"])
+        if schedule is None:
+            schedule = SourceSchedule(source.get("poll_interval", DEFAULT_POLL_INTERVAL))
+            _schedules[source["name"]] = schedule
+        return schedule
+
+
+def due_sources(now=None):
+    """Enabled sources whose poll interval (or backoff) has elapsed"""
+    return [source for source in enabled_sources() if schedule_for(source).is_due(now)]
+
+
+def schedule_report():
+    return {source["name"]: schedule_for(source).report() for source in enabled_sources()}
@@ -0,0 +1,59 @@
+"""
+Keyset (cursor) pagination, newest first.
+
+Pages are ordered by (published_ts DESC, id DESC). The cursor is an opaque
+token for the last row of a page; the next page seeks past it on the
+published_ts index instead of skipping OFFSET rows, so deep pages cost the
+same as the first and rows inserted meanwhile do not shift them. Rows
+without a timestamp come last, by id.
+"""
+
+import base64
+import json
+
+from sqlalchemy import and_, or_
+
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(ts, row_id):
+    raw = json.dumps([ts, row_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token):
+    """(published_ts, id) from a cursor token; None for an empty token (first page). Raises ValueError"""
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        ts, row_id = json.loads(raw)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if (ts is not None and not isinstance(ts, int)) or not isinstance(row_id, int):
+        raise ValueError("Invalid cursor")
+    return ts, row_id
+
+
+def keyset_page(query, ts_column, id_column, cursor, limit):
+    """{"items": [...], "next_cursor": token or None} for the page after cursor"""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    after = decode_cursor(cursor)
+    if after is not None:
+        ts, row_id = after
+        if ts is None:
+            query = query.filter(ts_column.is_(None), id_column < row_id)
+        else:
+            query = query.filter(or_(
+                ts_column < ts,
+                and_(ts_column == ts, id_column < row_id),
+                ts_column.is_(None),
+            ))
+    # SQLite sorts NULLs lowest, so timestamp-less rows come after every dated row
+    rows = query.order_by(ts_column.desc(), id_column.desc()).limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, ts_column.key), getattr(last, id_column.key))
+    return {"items": rows, "next_cursor": next_cursor}
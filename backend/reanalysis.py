@@ -0,0 +1,297 @@
+"""
+Background bulk reanalysis of the news table.
+
+A job scores every news row with VADER or FinBERT into the model's own
+vader_*/finbert_* columns, one id-ordered batch at a time: batched
+inference, then one executemany UPDATE per batch committed together with
+its rollup deltas and the checkpoint (last id done). The model revision is
+stored per row (vader_revision/finbert_revision), so rows already scored
+by the current revision are skipped. A job interrupted by a crash or a
+restart is resumed from its checkpoint at startup.
+
+Run directly to reanalyze without starting the API:
+    python reanalysis.py finbert
+"""
+
+import argparse
+import os
+import threading
+import time
+
+from sqlalchemy import bindparam, or_, select, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+import coins
+import engine_provider
+import inference_pool
+import rollups
+import tokenized_corpus
+from batching import FinBERTScheduler
+from database import Base, SessionLocal, engine, ReanalysisCheckpoint
+from jobs import JobRegistry, now_iso
+from models import News
+
+REANALYSIS_MODELS = ("vader", "finbert")
+# Rows scored and written per transaction
+REANALYSIS_BATCH_SIZE = int(os.getenv("REANALYSIS_BATCH_SIZE", "256"))
+
+_TABLE = "news"
+# Pre-tokenized corpus FinBERT jobs read token ids from, if built (python tokenized_corpus.py build news)
+CORPUS_NAME = "news"
+
+
+def _columns(model):
+    table = News.__table__
+    return table.c[f"{model}_label"], table.c[f"{model}_score"], table.c[f"{model}_revision"]
+
+
+def _text(row):
+    return f"{row['title'] or ''} {row['summary'] or ''}".strip()
+
+
+def _score(ai, model, texts, corpus=None):
+    """ai: the in-process CryptoAI or an InferencePool; corpus: pre-tokenized texts for in-process FinBERT"""
+    results = [None] * len(texts)
+    # Empty articles are neutral without running a model
+    todo = [i for i, text in enumerate(texts) if text]
+    for i, text in enumerate(texts):
+        if not text:
+            results[i] = {"label": "neutral", "score": 0.0}
+    todo_texts = [texts[i] for i in todo]
+    if model == "vader":
+        scored = ai.analyze_vader_batch(todo_texts)
+    elif isinstance(ai, inference_pool.InferencePool):
+        scored = ai.analyze_finbert_batch(todo_texts, corpus=CORPUS_NAME)
+    else:
+        scored = FinBERTScheduler(ai, corpus=corpus).analyze(todo_texts)
+    for i, result in zip(todo, scored):
+        results[i] = result
+    return results
+
+
+def pending_query(model, revision, after_id=0):
+    """Select of the rows after after_id not yet scored by revision (every row if revision is None), in id order"""
+    _, _, revision_column = _columns(model)
+    table = News.__table__
+    # The columns the rollups need, to compute this batch's deltas without reloading the rows
+    query = select(table.c.id, *(table.c[name] for name in rollups.snapshot(_TABLE, {}) if name in table.c))
+    query = query.where(table.c.id > after_id)
+    if revision is not None:
+        query = query.where(or_(revision_column.is_(None), revision_column != revision))
+    return query.order_by(table.c.id)
+
+
+def count_pending(conn, model, revision, after_id=0):
+    return conn.execute(select(func.count()).select_from(pending_query(model, revision, after_id).subquery())).scalar()
+
+
+def load_checkpoint(db, model):
+    return db.get(ReanalysisCheckpoint, (_TABLE, model))
+
+
+def save_checkpoint(conn, model, revision, last_id, status):
+    table = ReanalysisCheckpoint.__table__
+    values = {"table_name": _TABLE, "model": model, "revision": revision, "last_id": last_id,
+              "status": status, "updated_at": now_iso()}
+    stmt = sqlite_insert(table).values(**values)
+    conn.execute(stmt.on_conflict_do_update(
+        index_elements=["table_name", "model"],
+        set_={key: value for key, value in values.items() if key not in ("table_name", "model")},
+    ))
+
+
+def reanalyze_batch(conn, ai, model, revision, rows, corpus=None):
+    """Score rows (dicts from pending_query) and write labels, scores, revision and rollup deltas on conn"""
+    label_column, score_column, revision_column = _columns(model)
+    results = _score(ai, model, [_text(row) for row in rows], corpus)
+    after = []
+    for row, result in zip(rows, results):
+        updated = dict(row)
+        updated[label_column.key] = result.get("label", "neutral")
+        updated[score_column.key] = float(result.get("score", 0.0))
+        after.append(updated)
+    table = News.__table__
+    conn.execute(
+        table.update().where(table.c.id == bindparam("row_id")).values({
+            label_column: bindparam("new_label"),
+            score_column: bindparam("new_score"),
+            revision_column: revision,
+        }),
+        [{"row_id": row["id"], "new_label": row[label_column.key], "new_score": row[score_column.key]} for row in after],
+    )
+    # Only labels/scores change, so each row's coin tags serve both sides of the delta
+    tags = [coins.row_coins(_TABLE, row) for row in rows]
+    rollups.record_updated(conn, _TABLE, rows, after, tags)
+
+
+class ReanalysisService:
+    """Runs reanalysis jobs on background threads, one per model at a time"""
+
+    def __init__(self, batch_size=REANALYSIS_BATCH_SIZE):
+        self.batch_size = max(1, batch_size)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._jobs = JobRegistry()
+        self._active = {}
+        self._threads = []
+
+    def start(self, model, limit=None, restart=False):
+        """
+        Start reanalyzing the news table with model; returns the job.
+        A job already running for the model is returned instead. restart=True ignores
+        the checkpoint and the stored revisions, rescoring every row.
+        """
+        if model not in REANALYSIS_MODELS:
+            raise ValueError(f"model must be one of {', '.join(REANALYSIS_MODELS)}")
+        with self._lock:
+            active = self._jobs.get(self._active.get(model))
+            if active is not None and active["status"] in ("queued", "loading", "running"):
+                return self.get_job(active["id"])
+            job = self._new_job(model, limit, restart)
+            self._active[model] = job["id"]
+        self._stop.clear()
+        thread = threading.Thread(target=self._run, args=(job,), name=f"reanalysis-{model}", daemon=True)
+        self._threads = [t for t in self._threads if t.is_alive()] + [thread]
+        thread.start()
+        return self.get_job(job["id"])
+
+    def resume_interrupted(self):
+        """Restart the jobs whose checkpoint says they were still running when the process stopped"""
+        db = SessionLocal()
+        try:
+            models = [row.model for row in db.query(ReanalysisCheckpoint).filter(
+                ReanalysisCheckpoint.table_name == _TABLE, ReanalysisCheckpoint.status == "running")]
+        finally:
+            db.close()
+        for model in models:
+            print(f"🔁 Resuming interrupted {model} reanalysis from its checkpoint")
+            self.start(model)
+
+    def stop(self, timeout=10):
+        """Ask running jobs to stop after their current batch; their checkpoints stay resumable"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    # --- jobs ---
+
+    def _new_job(self, model, limit, restart):
+        return self._jobs.new(
+            model=model,
+            limit=limit,
+            restart=restart,
+            revision=None,
+            resumed_from_id=0,
+            last_id=0,
+            total=None,
+            processed=0,
+            rows_per_second=None,
+            eta_seconds=None,
+            _started=None,
+        )
+
+    def get_job(self, job_id):
+        return self._jobs.snapshot(job_id)
+
+    def list_jobs(self, limit=20):
+        return self._jobs.recent(limit)
+
+    # --- worker ---
+
+    def _run(self, job):
+        model = job["model"]
+        db = SessionLocal()
+        try:
+            job["status"] = "loading"
+            # Bulk scoring goes to the worker pool when INFERENCE_WORKERS is set
+            ai = inference_pool.get_pool() or engine_provider.get_engine(load_finbert=model == "finbert")
+            revision = ai.model_revisions[model]
+            corpus = None
+            if model == "finbert" and not isinstance(ai, inference_pool.InferencePool):
+                corpus = tokenized_corpus.load_corpus(ai.tokenizer_revision, CORPUS_NAME)
+            job["revision"] = revision
+
+            checkpoint = load_checkpoint(db, model)
+            after_id = 0
+            if checkpoint is not None and checkpoint.revision == revision and not job["restart"]:
+                after_id = checkpoint.last_id
+            job["resumed_from_id"] = job["last_id"] = after_id
+            # restart rescores rows already carrying this revision too
+            match_revision = None if job["restart"] else revision
+            conn = db.connection()
+            total = count_pending(conn, model, match_revision, after_id)
+            job["total"] = min(total, job["limit"]) if job["limit"] else total
+            save_checkpoint(conn, model, revision, after_id, "running")
+            db.commit()
+
+            job["status"] = "running"
+            job["_started"] = time.perf_counter()
+            while job["processed"] < job["total"]:
+                if self._stop.is_set():
+                    job["status"] = "stopped"
+                    return
+                size = min(self.batch_size, job["total"] - job["processed"])
+                conn = db.connection()
+                rows = [dict(row) for row in conn.execute(
+                    pending_query(model, match_revision, job["last_id"]).limit(size)).mappings()]
+                if not rows:
+                    break
+                reanalyze_batch(conn, ai, model, revision, rows, corpus)
+                save_checkpoint(conn, model, revision, rows[-1]["id"], "running")
+                db.commit()
+                job["last_id"] = rows[-1]["id"]
+                job["processed"] += len(rows)
+                self._update_rate(job)
+
+            save_checkpoint(db.connection(), model, revision, job["last_id"], "done")
+            db.commit()
+            job["status"] = "done"
+            print(f"✅ {model} reanalysis done: {job['processed']} rows ({revision})")
+        except Exception as e:
+            db.rollback()
+            job["status"] = "error"
+            job["error"] = str(e)
+            print(f"❌ {model} reanalysis failed at id {job['last_id']}: {e}")
+        finally:
+            job["finished_at"] = now_iso()
+            db.close()
+
+    @staticmethod
+    def _update_rate(job):
+        elapsed = time.perf_counter() - job["_started"]
+        if elapsed <= 0:
+            return
+        rate = job["processed"] / elapsed
+        job["rows_per_second"] = round(rate, 1)
+        job["eta_seconds"] = round((job["total"] - job["processed"]) / rate, 1) if rate else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reanalyze the news table with a sentiment model")
+    parser.add_argument("model", choices=REANALYSIS_MODELS)
+    parser.add_argument("--limit", type=int, help="Stop after this many rows (the checkpoint keeps the rest resumable)")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and rescore every row")
+    args = parser.parse_args()
+    Base.metadata.create_all(bind=engine)
+
+    service = ReanalysisService()
+    job = service.start(args.model, limit=args.limit, restart=args.restart)
+    try:
+        while True:
+            job = service.get_job(job["id"])
+            if job["status"] not in ("queued", "loading", "running"):
+                break
+            if job["total"]:
+                print(f"🔄 {job['processed']}/{job['total']} rows, {job['rows_per_second'] or 0} rows/s, "
+                      f"ETA {job['eta_seconds'] or 0:.0f}s")
+            time.sleep(2)
+    except KeyboardInterrupt:
+        service.stop()
+        print(f"⏸️ Stopped at id {service.get_job(job['id'])['last_id']}; run again to resume")
+        return
+    print(f"Reanalysis {job['status']}: {job['processed']} rows" + (f" ({job['error']})" if job["error"] else ""))
+
+
+if __name__ == "__main__":
+    main()
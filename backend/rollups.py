@@ -0,0 +1,237 @@
+"""
+Materialized sentiment rollups.
+
+sentiment_rollups holds label counts and score sums per
+(table, model, coin, day, label). Seeding, ingestion and reanalysis apply
+deltas for the rows they write, so the stats endpoints sum a few rows per
+day instead of scanning the raw tables. coin "*" counts every article once;
+other coin rows count the articles tagged with that coin.
+
+Maintenance:
+    python rollups.py rebuild   # recompute every rollup from the raw tables
+    python rollups.py check     # compare the rollups with the raw tables
+"""
+
+import argparse
+from collections import defaultdict
+
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from database import SessionLocal, LiveNews, SentimentRollup
+from models import News
+from coins import COIN_TEXT_COLUMNS, canonical_coin, row_coins
+from timestamps import day_start_ts, format_ts
+
+ALL_COINS = "*"
+MODELS = ("original", "vader", "finbert")
+SENTIMENT_LABELS = ("positive", "negative", "neutral")
+# Rows read per chunk while rebuilding or checking
+SCAN_CHUNK_SIZE = 5000
+
+# Per raw table: ORM model, date column, model -> (label, score) columns
+ROLLUP_TABLES = {
+    "news": {
+        "model": News,
+        "date": "published_date",
+        "columns": {
+            "original": ("sentiment_label", "sentiment_score"),
+            "vader": ("vader_label", "vader_score"),
+            "finbert": ("finbert_label", "finbert_score"),
+        },
+    },
+    "live_news": {
+        "model": LiveNews,
+        "date": "date",
+        "columns": {
+            "original": ("sentiment_label", "sentiment_score"),
+            "vader": ("vader_label", "vader_score"),
+            "finbert": ("finbert_label", "finbert_score"),
+        },
+    },
+}
+
+_KEY_COLUMNS = ("table_name", "model", "coin", "day", "label")
+
+
+def _value(row, name):
+    return row.get(name) if isinstance(row, dict) else getattr(row, name, None)
+
+
+def _counted(table, row):
+    # Syndicated live news copies are excluded from the stats (their representative counts)
+    return not (table == "live_news" and _value(row, "duplicate_of") is not None)
+
+
+def snapshot(table, row):
+    """The columns a rollup depends on, copied before the row is modified"""
+    spec = ROLLUP_TABLES[table]
+    names = {spec["date"], *COIN_TEXT_COLUMNS[table], "duplicate_of"}
+    for label_column, score_column in spec["columns"].values():
+        names.update((label_column, score_column))
+    return {name: _value(row, name) for name in names}
+
+
+def rollup_deltas(table, rows, sign=1, deltas=None, tags=None):
+    """
+    Accumulate {(table, model, coin, day, label): [count, score_sum]} for rows (dicts or ORM objects).
+    tags: the rows' coin tags if the caller already computed them.
+    """
+    spec = ROLLUP_TABLES[table]
+    deltas = deltas if deltas is not None else defaultdict(lambda: [0, 0.0])
+    for i, row in enumerate(rows):
+        if not _counted(table, row):
+            continue
+        day = str(_value(row, spec["date"]) or "")[:10]
+        coins = [ALL_COINS] + (tags[i] if tags is not None else row_coins(table, row))
+        for model, (label_column, score_column) in spec["columns"].items():
+            label = _value(row, label_column) or ""
+            score = float(_value(row, score_column) or 0.0)
+            for coin in coins:
+                entry = deltas[(table, model, coin, day, label)]
+                entry[0] += sign
+                entry[1] += sign * score
+    return deltas
+
+
+def apply_deltas(conn, deltas):
+    """Add deltas to the rollup rows (upsert) on conn, inside the caller's transaction"""
+    values = [
+        dict(zip(_KEY_COLUMNS, key), count=count, score_sum=score_sum)
+        for key, (count, score_sum) in deltas.items()
+        if count or score_sum
+    ]
+    if not values:
+        return
+    table = SentimentRollup.__table__
+    stmt = sqlite_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(_KEY_COLUMNS),
+        set_={
+            "count": table.c.count + stmt.excluded.count,
+            "score_sum": table.c.score_sum + stmt.excluded.score_sum,
+        },
+    )
+    conn.execute(stmt, values)
+
+
+def record_inserted(conn, table, rows, tags=None):
+    apply_deltas(conn, rollup_deltas(table, rows, tags=tags))
+
+
+def record_updated(conn, table, before, after, tags=None):
+    """
+    before: snapshot() of each row taken prior to the update; after: the updated rows.
+    tags: the rows' coin tags, if the update left their text unchanged and the caller has them.
+    """
+    deltas = rollup_deltas(table, before, sign=-1, tags=tags)
+    apply_deltas(conn, rollup_deltas(table, after, deltas=deltas, tags=tags))
+
+
+def compute_rollups(db, table):
+    """Rollups of a raw table computed from scratch (chunked scan)"""
+    model = ROLLUP_TABLES[table]["model"]
+    deltas = defaultdict(lambda: [0, 0.0])
+    last_id = 0
+    while True:
+        rows = db.query(model).filter(model.id > last_id).order_by(model.id).limit(SCAN_CHUNK_SIZE).all()
+        if not rows:
+            return deltas
+        rollup_deltas(table, rows, deltas=deltas)
+        last_id = rows[-1].id
+        db.expunge_all()
+
+
+def rebuild(db, tables=None):
+    """Recompute the rollups of the given tables (default: all) from the raw rows"""
+    counts = {}
+    for table in tables or ROLLUP_TABLES:
+        db.query(SentimentRollup).filter(SentimentRollup.table_name == table).delete()
+        deltas = compute_rollups(db, table)
+        apply_deltas(db.connection(), deltas)
+        counts[table] = len(deltas)
+    db.commit()
+    return counts
+
+
+def ensure_built(db):
+    """Build the rollups once for databases that predate them"""
+    if db.query(SentimentRollup.table_name).first() is not None:
+        return
+    if db.query(News.id).first() is None and db.query(LiveNews.id).first() is None:
+        return
+    print("📊 Building sentiment rollups from existing rows...")
+    print(f"📊 Rollup rows built: {rebuild(db)}")
+
+
+def check_consistency(db, tables=None):
+    """List of (key, expected, actual) where the rollups disagree with the raw tables"""
+    mismatches = []
+    for table in tables or ROLLUP_TABLES:
+        expected = {key: value for key, value in compute_rollups(db, table).items() if value[0] or value[1]}
+        actual = {
+            (row.table_name, row.model, row.coin, row.day, row.label): [row.count, row.score_sum]
+            for row in db.query(SentimentRollup).filter(SentimentRollup.table_name == table)
+            if row.count or row.score_sum
+        }
+        for key in sorted(set(expected) | set(actual)):
+            exp = expected.get(key, [0, 0.0])
+            act = actual.get(key, [0, 0.0])
+            if exp[0] != act[0] or abs(exp[1] - act[1]) > 1e-6 * max(1.0, abs(exp[1])):
+                mismatches.append((key, exp, act))
+    return mismatches
+
+
+def _day_key(day):
+    # Parsed the same way as the raw-table filters, then compared as a zero-padded day string
+    return format_ts(day_start_ts(day))[:10]
+
+
+def rollup_distributions(db, table, models=MODELS, coin=None, start_date=None, end_date=None):
+    """
+    {model: {total, positive, negative, neutral}} from the rollups, filtered by
+    coin and by day (start_date/end_date as YYYY-MM-DD, inclusive; ValueError if malformed)
+    """
+    query = db.query(SentimentRollup.model, SentimentRollup.label, func.sum(SentimentRollup.count)).filter(
+        SentimentRollup.table_name == table,
+        SentimentRollup.model.in_(models),
+        SentimentRollup.coin == (canonical_coin(coin) if coin else ALL_COINS),
+    )
+    if start_date:
+        query = query.filter(SentimentRollup.day >= _day_key(start_date))
+    if end_date:
+        query = query.filter(SentimentRollup.day <= _day_key(end_date))
+    distributions = {model: {"total": 0, **{label: 0 for label in SENTIMENT_LABELS}} for model in models}
+    for model, label, count in query.group_by(SentimentRollup.model, SentimentRollup.label):
+        distributions[model]["total"] += count or 0
+        if label in SENTIMENT_LABELS:
+            distributions[model][label] += count or 0
+    return distributions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the sentiment rollup tables")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--table", choices=list(ROLLUP_TABLES), help="Only this raw table (default: all)")
+    args = parser.parse_args()
+    tables = [args.table] if args.table else None
+
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            print(f"✅ Rebuilt rollups: {rebuild(db, tables)}")
+            return
+        mismatches = check_consistency(db, tables)
+        for key, expected, actual in mismatches[:50]:
+            print(f"❌ {key}: expected count={expected[0]} sum={expected[1]:.4f}, "
+                  f"rollup count={actual[0]} sum={actual[1]:.4f}")
+        if mismatches:
+            print(f"❌ {len(mismatches)} rollup rows disagree with the raw tables; run 'python rollups.py rebuild'")
+            raise SystemExit(1)
+        print("✅ Rollups match the raw tables")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Full-text keyword search over news and live_news (SQLite FTS5).
+
+Each table gets an external-content FTS5 index over title and summary,
+kept in sync by insert/update/delete triggers, so a keyword filter is an
+index lookup instead of a leading-wildcard LIKE scan, and matches whole
+words ("ETH" does not match "Ethics"). Results rank with bm25, with title
+hits weighted above summary hits. If this SQLite build lacks FTS5, callers
+fall back to LIKE.
+"""
+
+import re
+
+from sqlalchemy import Float, Integer, text
+
+FTS_TABLES = ("news", "live_news")
+FTS_COLUMNS = ("title", "summary")
+# bm25 column weights (title, summary)
+TITLE_WEIGHT = 10.0
+SUMMARY_WEIGHT = 1.0
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_fts_ready = False
+
+
+def fts_available():
+    return _fts_ready
+
+
+def _create_statements(table):
+    fts = f"{table}_fts"
+    columns = ", ".join(FTS_COLUMNS)
+    new_values = ", ".join(f"new.{column}" for column in FTS_COLUMNS)
+    old_values = ", ".join(f"old.{column}" for column in FTS_COLUMNS)
+    delete_old = f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values});"
+    insert_new = f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({columns}, content='{table}', content_rowid='id')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {columns} ON {table} BEGIN {delete_old} {insert_new} END",
+    ]
+
+
+def ensure_fts_tables(conn):
+    """Create the FTS indexes and sync triggers; newly created indexes are filled from the existing rows"""
+    global _fts_ready
+    try:
+        for table in FTS_TABLES:
+            fts = f"{table}_fts"
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": fts}
+            ).first()
+            for statement in _create_statements(table):
+                conn.execute(text(statement))
+            if not exists:
+                print(f"🔎 Building full-text index {fts}...")
+                conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+        _fts_ready = True
+    except Exception as e:
+        print(f"⚠️ FTS5 unavailable, keyword filters fall back to LIKE: {e}")
+        _fts_ready = False
+    return _fts_ready
+
+
+def match_expression(q):
+    """FTS5 query matching every word of q (each quoted, so user input is never FTS syntax), or None"""
+    tokens = _TOKEN_RE.findall(q or "")
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"' for token in tokens)
+
+
+def fts_matches(table, q):
+    """Subquery of (id, rank) for rows of table matching q, lower rank = better; None if FTS can't serve q"""
+    expression = match_expression(q)
+    if not _fts_ready or expression is None:
+        return None
+    fts = f"{table}_fts"
+    return (
+        text(
+            f"SELECT rowid AS id, bm25({fts}, {TITLE_WEIGHT}, {SUMMARY_WEIGHT}) AS rank "
+            f"FROM {fts} WHERE {fts} MATCH :fts_query"
+        )
+        .bindparams(fts_query=expression)
+        .columns(id=Integer, rank=Float)
+        .subquery()
+    )
@@ -0,0 +1,158 @@
+"""
+Streaming CSV seeding of the news table.
+
+data/cryptonews.csv is read in chunks (bounded memory), the sentiment
+column ("{'class': 'negative', 'polarity': -0.1, ...}") is parsed with
+vectorized regexes instead of ast.literal_eval per cell, and each chunk is
+written with one Core executemany in its own transaction, together with its
+rollup deltas and coin tags. Progress and throughput are printed per chunk.
+
+The number of CSV records committed is stored with every chunk
+(seed_progress), so an interrupted seed resumes after the last committed
+chunk on the next start; only a finished seed counts as "already seeded".
+
+Run directly to seed an empty database without starting the API:
+    python seeding.py
+"""
+
+import datetime
+import os
+import time
+
+import pandas as pd
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+import coins
+import rollups
+from database import Base, SessionLocal, engine, SeedProgress
+from models import News
+from timestamps import format_ts, parse_ts
+
+CSV_PATH = os.path.join("data", "cryptonews.csv")
+SEED_CHUNK_SIZE = int(os.getenv("SEED_CHUNK_SIZE", "5000"))
+CSV_COLUMNS = ["date", "sentiment", "source", "title", "text", "url"]
+_TABLE = "news"
+
+_LABEL_RE = r"""['"]class['"]\s*:\s*['"](\w+)['"]"""
+_POLARITY_RE = r"""['"]polarity['"]\s*:\s*(-?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?)"""
+
+
+def parse_sentiment_column(sentiments):
+    """(labels, scores) Series from the raw sentiment strings; unparseable cells become neutral / 0.0"""
+    sentiments = sentiments.fillna("").astype(str)
+    labels = sentiments.str.extract(_LABEL_RE, expand=False).fillna("neutral")
+    scores = pd.to_numeric(sentiments.str.extract(_POLARITY_RE, expand=False), errors="coerce").fillna(0.0)
+    return labels, scores
+
+
+def chunk_rows(chunk):
+    """news table rows for one CSV chunk"""
+    labels, scores = parse_sentiment_column(chunk["sentiment"])
+    rows = []
+    for title, text, source, url, date, label, score in zip(
+        chunk["title"], chunk["text"], chunk["source"], chunk["url"], chunk["date"], labels, scores
+    ):
+        published_ts = parse_ts(date)
+        rows.append({
+            "title": str(title),
+            "summary": str(text),  # ستون text در csv میره توی summary
+            "source": str(source),
+            "url": str(url),
+            "published_date": format_ts(published_ts) if published_ts else str(date),
+            "published_ts": published_ts,
+            "sentiment_label": label,
+            "sentiment_score": float(score),
+        })
+    return rows
+
+
+def _save_progress(conn, rows_done, status):
+    table = SeedProgress.__table__
+    values = {"table_name": _TABLE, "rows_done": rows_done, "status": status,
+              "updated_at": datetime.datetime.now(datetime.timezone.utc).isoformat()}
+    conn.execute(sqlite_insert(table).values(**values).on_conflict_do_update(
+        index_elements=["table_name"],
+        set_={key: value for key, value in values.items() if key != "table_name"},
+    ))
+
+
+def insert_chunk(db, rows, rows_done=None):
+    """
+    Insert rows (one executemany) plus their rollups and coin tags, then commit.
+    rows_done: CSV records seeded including this chunk, committed with it as the seed progress
+    """
+    table = News.__table__
+    conn = db.connection()
+    ids = conn.execute(table.insert().returning(table.c.id, sort_by_parameter_order=True), rows).scalars().all()
+    for row, row_id in zip(rows, ids):
+        row["id"] = row_id
+    tags = [coins.row_coins("news", row) for row in rows]
+    rollups.record_inserted(conn, "news", rows, tags)
+    coins.record_article_coins(conn, "news", rows, tags)
+    if rows_done is not None:
+        _save_progress(conn, rows_done, "running")
+    db.commit()
+
+
+def seed_database(db, csv_path=CSV_PATH, chunk_size=SEED_CHUNK_SIZE):
+    # چک می‌کنیم اگر دیتابیس خالی است، پرش کنیم
+    progress = None
+    try:
+        progress = db.get(SeedProgress, _TABLE)
+        if progress is not None and progress.status == "done":
+            print("Database already seeded. Skipping seed.")
+            return 0
+        if progress is None and db.query(News.id).first() is not None:
+            # Seeded before progress was recorded, in one all-or-nothing transaction
+            _save_progress(db.connection(), db.query(func.count(News.id)).scalar(), "done")
+            db.commit()
+            print("Database already has data. Skipping seed.")
+            return 0
+    except Exception as e:
+        print(f"Error checking database: {e}")
+        # If there's an error (like missing columns), we'll continue with seeding
+        # The create_all will handle schema updates
+        pass
+
+    print("Seeding database from CSV...")
+    if not os.path.exists(csv_path):
+        print(f"Error: CSV file not found at {csv_path}")
+        return 0
+
+    resume_from = progress.rows_done if progress is not None else 0
+    if resume_from:
+        print(f"🔁 Resuming interrupted seed after {resume_from} rows")
+
+    started = time.perf_counter()
+    total = 0
+    # Records, not file lines, are skipped: quoted fields may span lines
+    skip = resume_from
+    reader = pd.read_csv(csv_path, usecols=CSV_COLUMNS, dtype=str, keep_default_na=False, chunksize=chunk_size)
+    for chunk in reader:
+        if skip:
+            if skip >= len(chunk):
+                skip -= len(chunk)
+                continue
+            chunk = chunk.iloc[skip:]
+            skip = 0
+        rows = chunk_rows(chunk)
+        insert_chunk(db, rows, rows_done=resume_from + total + len(rows))
+        total += len(rows)
+        elapsed = time.perf_counter() - started
+        print(f"🌱 Seeded {resume_from + total} rows ({total / max(elapsed, 1e-9):.0f} rows/s)")
+
+    _save_progress(db.connection(), resume_from + total, "done")
+    db.commit()
+    elapsed = time.perf_counter() - started
+    print(f"Successfully added {total} news items to database in {elapsed:.1f}s.")
+    return total
+
+
+if __name__ == "__main__":
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        seed_database(session)
+    finally:
+        session.close()
@@ -0,0 +1,154 @@
+"""
+Sentiment result cache keyed by (model name, model revision, text hash).
+
+A bounded in-memory LRU tier sits in front of an optional persistent
+SQLite tier. Changing a model's revision drops that model's stale entries
+from both tiers.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+
+
+def normalize_text(text):
+    """Unicode-normalize and collapse whitespace (case is kept: VADER is case sensitive)"""
+    text = unicodedata.normalize("NFC", "" if text is None else str(text))
+    return " ".join(text.split())
+
+
+def text_hash(text):
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class SentimentCache:
+    """Two-tier (LRU memory + optional SQLite) cache of {"label", "score"} results"""
+
+    def __init__(self, max_entries=10000, db_path=None):
+        self.max_entries = max(0, int(max_entries))
+        self.db_path = db_path
+        self._memory = OrderedDict()
+        self._revisions = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self._conn = None
+        if db_path:
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sentiment_cache ("
+                " model TEXT NOT NULL,"
+                " revision TEXT NOT NULL,"
+                " text_hash TEXT NOT NULL,"
+                " label TEXT NOT NULL,"
+                " score REAL NOT NULL,"
+                " PRIMARY KEY (model, revision, text_hash))"
+            )
+            self._conn.commit()
+
+    def set_revision(self, model, revision):
+        """Record the current revision of a model, invalidating entries from older ones"""
+        with self._lock:
+            previous = self._revisions.get(model)
+            self._revisions[model] = revision
+            if previous == revision:
+                return
+            for key in [k for k in self._memory if k[0] == model and k[1] != revision]:
+                del self._memory[key]
+            if self._conn is not None:
+                self._conn.execute(
+                    "DELETE FROM sentiment_cache WHERE model = ? AND revision != ?",
+                    (model, revision),
+                )
+                self._conn.commit()
+
+    def revision(self, model):
+        return self._revisions.get(model, "")
+
+    def get_many(self, model, revision, texts):
+        """Return a list of cached results (or None on miss) for texts, in order"""
+        keys = [(model, revision, text_hash(text)) for text in texts]
+        results = [None] * len(keys)
+        with self._lock:
+            disk_lookup = []
+            for i, key in enumerate(keys):
+                result = self._memory.get(key)
+                if result is not None:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    results[i] = dict(result)
+                else:
+                    disk_lookup.append(i)
+
+            if disk_lookup and self._conn is not None:
+                for i in disk_lookup:
+                    row = self._conn.execute(
+                        "SELECT label, score FROM sentiment_cache"
+                        " WHERE model = ? AND revision = ? AND text_hash = ?",
+                        keys[i],
+                    ).fetchone()
+                    if row is not None:
+                        result = {"label": row[0], "score": row[1]}
+                        self._remember(keys[i], result)
+                        self.disk_hits += 1
+                        results[i] = dict(result)
+
+            found = sum(1 for r in results if r is not None)
+            self.hits += found
+            self.misses += len(results) - found
+        return results
+
+    def put_many(self, model, revision, texts, results):
+        rows = []
+        with self._lock:
+            # An engine that has been superseded must not write under a stale revision
+            if self._revisions.get(model, revision) != revision:
+                return
+            for text, result in zip(texts, results):
+                # Failed analyses are never cached
+                if not result or "error" in result:
+                    continue
+                entry = {"label": result["label"], "score": float(result["score"])}
+                key = (model, revision, text_hash(text))
+                self._remember(key, entry)
+                rows.append(key + (entry["label"], entry["score"]))
+            if rows and self._conn is not None:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO sentiment_cache (model, revision, text_hash, label, score)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.commit()
+
+    def _remember(self, key, result):
+        if self.max_entries == 0:
+            return
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM sentiment_cache")
+                self._conn.commit()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "memory_entries": len(self._memory),
+            "max_entries": self.max_entries,
+            "persistent": self._conn is not None,
+            "revisions": dict(self._revisions),
+        }
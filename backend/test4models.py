@@ -1,12 +1,12 @@
 from textblob import TextBlob
 from transformers import pipeline
-from ai_engine import CryptoAI
+from engine_provider import get_engine
 
 print("--- 🚀 Loading All 4 Models for Comparison ---")
 
 # 1. لود کردن مدل‌های خودمان (VADER + FinBERT)
 print("1️⃣ Loading Our Engine (VADER & FinBERT)...")
-my_ai = CryptoAI()
+my_ai = get_engine()
 
 # 2. لود کردن مدل عمومی (General BERT)
 print("2️⃣ Loading Generic BERT (DistilBERT)...")
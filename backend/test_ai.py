@@ -1,7 +1,7 @@
-from ai_engine import CryptoAI
+from engine_provider import get_engine
 
 print("--- Loading AI Models ---")
-ai = CryptoAI()
+ai = get_engine()
 print("MODELS LOADED SUCCESSFULLY!\n")
 
 # سه تا جمله تست انتخاب کردم:
@@ -0,0 +1,90 @@
+"""
+Unit tests for the length-bucketed FinBERT batch planner (batching.py).
+
+    cd backend && python -m pytest test_batching.py
+"""
+
+import random
+
+import numpy as np
+
+from batching import FinBERTScheduler, pad_windows, plan_batches
+from truncation import TruncationPolicy
+
+
+def _check_plan(lengths, max_tokens, max_batch_size):
+    batches = plan_batches(lengths, max_tokens, max_batch_size)
+    # Every item exactly once
+    assert sorted(i for batch in batches for i in batch) == list(range(len(lengths)))
+    previous_max = 0
+    for batch in batches:
+        assert 1 <= len(batch) <= max_batch_size
+        batch_lengths = [max(1, lengths[i]) for i in batch]
+        # Padded size within budget, unless a single item is longer than the budget on its own
+        assert len(batch) == 1 or max(batch_lengths) * len(batch) <= max_tokens
+        # Batches come in ascending length order, sorted within as well
+        assert batch_lengths == sorted(batch_lengths)
+        assert min(batch_lengths) >= previous_max
+        previous_max = max(batch_lengths)
+    return batches
+
+
+def test_plan_respects_budget_and_order():
+    rng = random.Random(7)
+    for _ in range(50):
+        lengths = [rng.randint(0, 600) for _ in range(rng.randint(0, 300))]
+        _check_plan(lengths, rng.choice([512, 2048, 8192]), rng.choice([1, 8, 64]))
+
+
+def test_plan_empty_and_oversized():
+    assert plan_batches([]) == []
+    # Items longer than the budget still get a batch of their own
+    assert plan_batches([10000, 20000], max_tokens=512) == [[0], [1]]
+
+
+def test_plan_packs_short_items_together():
+    batches = _check_plan([10] * 100, max_tokens=200, max_batch_size=64)
+    assert [len(batch) for batch in batches] == [20] * 5
+
+
+def test_pad_windows():
+    input_ids, attention_mask = pad_windows([np.array([5, 6, 7]), [8]], cls_id=101, sep_id=102, pad_id=0)
+    assert input_ids.tolist() == [[101, 5, 6, 7, 102], [101, 8, 102, 0, 0]]
+    assert attention_mask.tolist() == [[1, 1, 1, 1, 1], [1, 1, 1, 0, 0]]
+    assert input_ids.dtype == np.int64 and attention_mask.dtype == np.int64
+
+
+class FakeAI:
+    """Tokenizes words to ids; logits say how many tokens each window had"""
+
+    tokenizer_revision = "fake"
+
+    def __init__(self):
+        self.truncation = TruncationPolicy("first_n", max_tokens=512)
+        self.batches = []
+
+    def finbert_cached(self, texts, compute, policy=None):
+        return compute(texts)
+
+    def tokenize_finbert(self, texts):
+        return [[100 + len(word) for word in text.split()] for text in texts]
+
+    def finbert_special_ids(self):
+        return 1, 2, 0
+
+    def finbert_logits(self, input_ids, attention_mask):
+        self.batches.append(input_ids.shape)
+        return np.stack([attention_mask.sum(axis=1), np.zeros(len(input_ids)), np.zeros(len(input_ids))], axis=1)
+
+    def finbert_result(self, logits):
+        return {"label": "positive", "score": float(logits[0])}
+
+
+def test_scheduler_keeps_input_order():
+    texts = ["w " * n for n in (50, 3, 400, 0, 120, 3)]
+    ai = FakeAI()
+    completed = []
+    results = FinBERTScheduler(ai, max_tokens=1024, max_batch_size=4).analyze(texts, on_batch=completed.append)
+    assert [r["score"] for r in results] == [52, 5, 402, 2, 122, 5]
+    assert sum(completed) == len(texts)
+    assert all(rows * width <= 1024 or rows == 1 for rows, width in ai.batches)
@@ -0,0 +1,34 @@
+"""
+Unit tests for coin tagging (coins.py).
+
+    cd backend && python -m pytest test_coins.py
+"""
+
+from coins import canonical_coin, tag_coins
+
+
+def test_tickers_and_names():
+    assert tag_coins("BTC rallies while Ether slips") == ["bitcoin", "ethereum"]
+    assert tag_coins("Solana", "and Binance Coin") == ["binancecoin", "solana"]
+    assert tag_coins(None, "") == []
+
+
+def test_tickers_need_exact_case_and_whole_words():
+    assert tag_coins("a link to the dot") == []
+    assert tag_coins("Chainlink LINK") == ["chainlink"]
+    assert tag_coins("Ethereal prose") == []
+    assert tag_coins("BTCUSD") == []
+
+
+def test_case_folding_that_changes_length_keeps_offsets():
+    # "İ".lower() is two characters; offsets must still line up with the original text
+    assert tag_coins("İİİİ BTC rallies") == ["bitcoin"]
+    assert tag_coins("İSTANBUL: ETH and Bitcoin") == ["bitcoin", "ethereum"]
+    assert tag_coins("İ btc") == []
+
+
+def test_canonical_coin():
+    assert canonical_coin("BTC") == "bitcoin"
+    assert canonical_coin(" Ether ") == "ethereum"
+    assert canonical_coin("unknowncoin") == "unknowncoin"
+    assert canonical_coin("") is None
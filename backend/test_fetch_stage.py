@@ -0,0 +1,105 @@
+"""
+Tests the concurrent fetch stage (news_fetcher.fetch_all_sources) against a
+local stub HTTP server: a healthy feed, a failing one, one slower than its
+per-source read timeout and one slower than the whole stage.
+
+    cd backend && python -m pytest test_fetch_stage.py
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import news_fetcher
+
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Stub</title>
+<item><title>Bitcoin rallies</title><link>http://stub/1</link><description>Up</description></item>
+<item><title>Ether slips</title><link>http://stub/2</link><description>Down</description></item>
+</channel></rss>"""
+
+STAGE_TIMEOUT = 2.0
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith("/slow"):
+            time.sleep(1.0)
+        elif self.path.startswith("/hang"):
+            time.sleep(STAGE_TIMEOUT + 2)
+        if self.path.startswith("/fail"):
+            self.send_response(500)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/rss+xml")
+        if self.path.startswith("/etag"):
+            self.send_header("ETag", '"v1"')
+            self.send_header("Last-Modified", "Tue, 01 Oct 2024 00:00:00 GMT")
+        self.end_headers()
+        try:
+            self.wfile.write(RSS)
+        except OSError:
+            pass  # the client gave up
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(news_fetcher, "FETCH_STAGE_TIMEOUT", STAGE_TIMEOUT)
+    # Conditional GET validators live in the database; these feeds start without any
+    monkeypatch.setattr(news_fetcher, "load_feed_validators", lambda: None)
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _source(name, url, **extra):
+    return {"name": name, "type": "rss", "url": url, **extra}
+
+
+def test_fetch_stage_timeouts_and_failures(stub_server):
+    sources = [
+        _source("stub-ok", f"{stub_server}/ok"),
+        _source("stub-fail", f"{stub_server}/fail"),
+        _source("stub-slow", f"{stub_server}/slow", timeout=(1, 0.2)),
+        _source("stub-hang", f"{stub_server}/hang", timeout=(1, 30)),
+    ]
+    started = time.perf_counter()
+    articles, per_source, _ = news_fetcher.fetch_all_sources(limit=10, sources=sources)
+    elapsed = time.perf_counter() - started
+
+    # The hung source is dropped when the stage times out; nothing waits for it
+    assert elapsed < STAGE_TIMEOUT + 0.5
+    assert [a["title"] for a in articles] == ["Bitcoin rallies", "Ether slips"]
+    assert per_source["stub-ok"]["count"] == 2
+    assert per_source["stub-hang"]["timed_out"] is True
+    # The slow source hit its own read timeout well before the stage timeout
+    assert per_source["stub-slow"]["count"] == 0
+    assert per_source["stub-slow"]["latency_ms"] < 1000
+
+    metrics = news_fetcher.get_source_metrics()
+    assert metrics["stub-ok"]["failures"] == 0 and metrics["stub-ok"]["articles"] == 2
+    assert metrics["stub-fail"]["failures"] == 1 and "500" in metrics["stub-fail"]["last_error"]
+    assert metrics["stub-slow"]["failures"] == 1 and metrics["stub-slow"]["timeouts"] == 0
+    assert metrics["stub-hang"]["timeouts"] == 1 and metrics["stub-hang"]["failures"] == 0
+
+
+def test_direct_fetch_of_feed_with_validators(stub_server, monkeypatch):
+    # The per-source helpers run outside the fetch stage, with no validator state to fill in
+    source = _source("CoinDesk", f"{stub_server}/etag")
+    monkeypatch.setattr(news_fetcher, "get_source", lambda name: source)
+    articles = news_fetcher.fetch_coindesk_news(limit=10)
+    assert [a["title"] for a in articles] == ["Bitcoin rallies", "Ether slips"]
+
+    # The stage still collects them for saving
+    _, per_source, validators = news_fetcher.fetch_all_sources(limit=10, sources=[source])
+    assert per_source["CoinDesk"]["count"] == 2
+    assert validators[source["url"]]["etag"] == '"v1"'
@@ -0,0 +1,103 @@
+"""
+Tests CryptoAI's FinBERT load states: threads waiting on a background load
+wake up when it finishes, whether it succeeded or failed.
+
+    cd backend && python -m pytest test_finbert_loading.py
+"""
+
+import threading
+import time
+
+import pytest
+
+import ai_engine
+import engine_provider
+
+
+class StubCache:
+    def set_revision(self, model, revision):
+        pass
+
+
+class StubBackend:
+    name = "stub"
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    # No VADER lexicon is needed for these tests
+    monkeypatch.setattr(ai_engine, "SentimentIntensityAnalyzer", lambda: None)
+    return ai_engine.CryptoAI(cache=StubCache(), load_finbert=False)
+
+
+def _slow_loader(release, result=None):
+    def load(self):
+        release.wait(5)
+        if result is None:
+            raise OSError("weights download failed")
+        return result
+    return load
+
+
+def _wait_in_thread(target):
+    outcome = {}
+
+    def run():
+        try:
+            outcome["value"] = target()
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread, outcome
+
+
+def test_failed_background_load_wakes_waiters(engine, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(ai_engine.CryptoAI, "_load_finbert_components", _slow_loader(release))
+    engine.load_finbert_in_background()
+    assert engine.finbert_state == "loading"
+
+    waiter, waited = _wait_in_thread(engine.wait_for_finbert)
+    requirer, required = _wait_in_thread(engine._require_finbert)
+    time.sleep(0.1)
+    assert waiter.is_alive() and requirer.is_alive()
+
+    release.set()
+    waiter.join(2)
+    requirer.join(2)
+    assert not waiter.is_alive() and not requirer.is_alive()
+    assert waited["value"] is False
+    assert "weights download failed" in str(required["error"])
+    assert engine.finbert_state == "error"
+    assert engine.wait_for_finbert() is False
+
+
+def test_get_engine_raises_when_the_load_it_waits_for_fails(engine, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(ai_engine.CryptoAI, "_load_finbert_components", _slow_loader(release))
+    monkeypatch.setattr(engine_provider, "_engine", engine)
+    engine.load_finbert_in_background()
+
+    getter, got = _wait_in_thread(engine_provider.get_engine)
+    release.set()
+    getter.join(2)
+    assert not getter.is_alive()
+    assert isinstance(got["error"], RuntimeError)
+
+
+def test_successful_background_load_wakes_waiters(engine, monkeypatch):
+    release = threading.Event()
+    components = (object(), object(), "stub@main", StubBackend())
+    monkeypatch.setattr(ai_engine.CryptoAI, "_load_finbert_components", _slow_loader(release, components))
+    assert engine.wait_for_finbert(0) is False
+    engine.load_finbert_in_background()
+    assert engine.wait_for_finbert(0.05) is False
+
+    waiter, waited = _wait_in_thread(engine.wait_for_finbert)
+    release.set()
+    waiter.join(2)
+    assert waited["value"] is True
+    assert engine.finbert_state == "ready"
+    assert engine.model_revisions["finbert"].startswith("stub@main+stub+")
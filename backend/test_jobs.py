@@ -0,0 +1,58 @@
+"""
+Unit tests for the shared job registry (jobs.py) and how the ingestion
+service marks a job whose batch fails.
+
+    cd backend && python -m pytest test_jobs.py
+"""
+
+import asyncio
+
+import ingestion
+from jobs import JobRegistry
+
+
+def test_registry_tracks_recent_jobs():
+    registry = JobRegistry(max_jobs=3)
+    jobs = [registry.new(model="vader", processed=0, _started=None) for _ in range(5)]
+    assert [job["id"] for job in jobs] == ["1", "2", "3", "4", "5"]
+    assert jobs[0]["status"] == "queued" and jobs[0]["finished_at"] is None and jobs[0]["created_at"]
+
+    # Oldest jobs are dropped; the newest come first
+    assert registry.get("1") is None and registry.snapshot("2") is None
+    assert [job["id"] for job in registry.recent()] == ["5", "4", "3"]
+    assert [job["id"] for job in registry.recent(1)] == ["5"]
+    assert registry.recent(0) == []
+
+    # Callers update the live dict; snapshots are copies without internal keys
+    registry.get("5")["processed"] = 7
+    snapshot = registry.snapshot("5")
+    assert snapshot["processed"] == 7 and "_started" not in snapshot
+    snapshot["processed"] = 0
+    assert registry.get("5")["processed"] == 7
+    assert registry.get(None) is None
+
+
+def test_failed_ingestion_batch_marks_the_job(monkeypatch, capsys):
+    def broken_ingest(articles, ai=None):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(ingestion, "ingest_articles", broken_ingest)
+
+    async def run():
+        service = ingestion.IngestionService(batch_wait=0.01)
+        await service.start(schedule=False)
+        job = service._new_job("manual", 5)
+        job.update(status="processing", fetched=2, pending=2, _fetch_done=True)
+        for title in ("a", "b"):
+            await service._queue.put((job["id"], {"title": title}))
+        for _ in range(100):
+            if job["finished_at"]:
+                break
+            await asyncio.sleep(0.01)
+        await service.stop()
+        return service.get_job(job["id"])
+
+    job = asyncio.run(run())
+    assert job["status"] == "error" and job["error"] == "database is locked"
+    assert job["pending"] == 0 and job["finished_at"]
+    assert capsys.readouterr().out.count("Ingestion batch failed") == 1
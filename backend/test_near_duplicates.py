@@ -0,0 +1,50 @@
+"""
+Unit tests for MinHash/LSH near-duplicate detection (near_duplicates.py).
+
+    cd backend && python -m pytest test_near_duplicates.py
+"""
+
+from near_duplicates import NUM_PERM, NearDuplicateIndex, minhash, normalize_words, shingles, similarity
+
+BODY = ("Bitcoin climbed above $70,000 on Tuesday as spot ETF inflows accelerated and "
+        "traders priced in a softer Federal Reserve, extending a week-long rally across major tokens.")
+
+
+def test_normalize_and_shingles():
+    assert normalize_words("<p>Bitcoin, ETH &amp; $SOL!</p>") == ["bitcoin", "eth", "amp", "$sol"]
+    assert shingles("", "") == set()
+    assert shingles("Two words", "") == {"two words"}
+    assert shingles("a b c d", "") == {"a b c", "b c d"}
+
+
+def test_minhash_is_deterministic():
+    first = minhash("BTC tops $70k", BODY)
+    assert first is not None and len(first) == NUM_PERM
+    assert (first == minhash("BTC tops $70k", BODY)).all()
+    assert minhash("", "") is None
+
+
+def test_similarity_separates_copies_from_other_stories():
+    original = minhash("Bitcoin tops $70,000 as ETF inflows surge", BODY)
+    # Syndicated copy: edited title, same lead, markup added
+    copy = minhash("Bitcoin Tops $70K as ETF Inflows Surge", "<p>" + BODY + "</p>")
+    other = minhash("Ethereum developers schedule next upgrade",
+                    "Core developers agreed on a date for the next network upgrade during a call on Thursday.")
+    assert similarity(original, original) == 1.0
+    assert similarity(original, copy) >= 0.5
+    assert similarity(original, other) < 0.2
+
+
+def test_index_query_and_eviction():
+    index = NearDuplicateIndex(max_entries=2)
+    original = minhash("Bitcoin tops $70,000 as ETF inflows surge", BODY)
+    index.add(1, original, {"id": 1})
+    match = index.query(minhash("Bitcoin tops $70K as ETF inflows surge", BODY))
+    assert match is not None and match[0] == 1 and match[1] == {"id": 1}
+    assert index.query(minhash("Solana outage", "Validators restarted the network after a halt.")) is None
+
+    # Oldest entries are evicted past max_entries, along with their buckets
+    index.add(2, minhash("Story two", "Completely different words about mining difficulty."), None)
+    index.add(3, minhash("Story three", "Another unrelated article about stablecoin regulation."), None)
+    assert len(index) == 2
+    assert index.query(original) is None
@@ -0,0 +1,38 @@
+"""
+Unit tests for the UTC timestamp helpers (timestamps.py).
+
+    cd backend && python -m pytest test_timestamps.py
+"""
+
+import datetime
+import time
+
+from timestamps import day_end_ts, day_start_ts, format_ts, parse_ts, struct_time_ts
+
+
+def test_day_bounds_are_utc_epochs():
+    assert day_start_ts("1970-01-01") == 0
+    assert day_end_ts("1970-01-01") == 86399
+    assert day_start_ts("2024-02-29") == 1709164800
+    assert day_end_ts("2024-02-29") + 1 == day_start_ts("2024-03-01")
+    assert format_ts(day_start_ts("2023-10-18")) == "2023-10-18 00:00:00"
+    assert format_ts(day_end_ts("2023-10-18")) == "2023-10-18 23:59:59"
+
+
+def test_parse_ts_inputs():
+    assert parse_ts(1700000000) == 1700000000
+    assert parse_ts(1700000000.9) == 1700000000
+    assert parse_ts("2023-11-14T22:13:20Z") == 1700000000
+    assert parse_ts("2023-11-14T23:13:20+01:00") == 1700000000
+    # Naive values are taken to be UTC
+    assert parse_ts("2023-11-14 22:13:20") == 1700000000
+    assert parse_ts(datetime.datetime(2023, 11, 14, 22, 13, 20)) == 1700000000
+
+
+def test_parse_ts_rejects_missing_values():
+    for value in (None, "", "  ", "not a date", 0, -5, True):
+        assert parse_ts(value) is None
+
+
+def test_struct_time_is_utc():
+    assert struct_time_ts(time.gmtime(1700000000)) == 1700000000
@@ -0,0 +1,82 @@
+"""
+Unit tests for FinBERT truncation policies (truncation.py).
+
+    cd backend && python -m pytest test_truncation.py
+"""
+
+import numpy as np
+import pytest
+
+from truncation import MODEL_MAX_TOKENS, SPECIAL_TOKENS, TruncationPolicy, cache_model
+
+
+def _model_tokens(policy, ids):
+    """Tokens the model reads for ids, special tokens included"""
+    return [len(window) + SPECIAL_TOKENS for window in policy.windows(ids)]
+
+
+@pytest.mark.parametrize("length", [0, 1, 100, 510, 511, 5000, 10 ** 6])
+def test_first_n_and_headline_read_one_window_within_512(length):
+    ids = list(range(length))
+    for mode in ("first_n", "headline"):
+        for max_tokens in (64, 512, 4096):
+            tokens = _model_tokens(TruncationPolicy(mode, max_tokens=max_tokens), ids)
+            assert len(tokens) == 1
+            assert tokens[0] <= min(max_tokens, MODEL_MAX_TOKENS)
+            assert tokens[0] == min(length, min(max_tokens, MODEL_MAX_TOKENS) - SPECIAL_TOKENS) + SPECIAL_TOKENS
+
+
+@pytest.mark.parametrize("max_tokens,window,stride", [(512, 256, 128), (1024, 256, 128), (2048, 512, 256),
+                                                      (100, 256, 128), (1000, 64, 1)])
+def test_sliding_windows_stay_within_budget(max_tokens, window, stride):
+    policy = TruncationPolicy("sliding", max_tokens=max_tokens, window=window, stride=stride)
+    size = min(window, max_tokens, MODEL_MAX_TOKENS)
+    for length in (0, 10, size - SPECIAL_TOKENS, size, 3000, 10 ** 6):
+        ids = np.arange(length)
+        windows = policy.windows(ids)
+        tokens = [len(w) + SPECIAL_TOKENS for w in windows]
+        assert 1 <= len(windows) <= max(1, max_tokens // size)
+        assert all(t <= size for t in tokens)
+        assert sum(tokens) <= max(max_tokens, size)
+        # Windows start at the beginning and advance by the stride
+        assert windows[0][:1].tolist() == ids[:1].tolist()
+        step = min(stride, size - SPECIAL_TOKENS)
+        assert [w[0] for w in windows[1:]] == [step * i for i in range(1, len(windows))]
+
+
+def test_sliding_window_count_for_long_article():
+    policy = TruncationPolicy("sliding", max_tokens=1024, window=256, stride=128)
+    assert len(policy.windows(list(range(100000)))) == 4
+    # A short article is not padded out to more windows than it needs
+    assert len(policy.windows(list(range(200)))) == 1
+    assert len(policy.windows(list(range(300)))) == 2
+
+
+def test_prepare_text_headline_and_char_cap():
+    headline = TruncationPolicy("headline", max_tokens=64)
+    assert headline.prepare_text("\n  Bitcoin tops $70k. Analysts cheer\nBody text") == "Bitcoin tops $70k."
+    assert headline.prepare_text(None) == ""
+    assert len(TruncationPolicy("first_n").prepare_text("x" * 10 ** 6)) < 10 ** 6
+
+
+def test_combine():
+    logits = np.array([[1.0, 0.0, 3.0], [3.0, 2.0, 1.0]])
+    assert TruncationPolicy("sliding", aggregate="mean").combine(logits).tolist() == [2.0, 1.0, 2.0]
+    assert TruncationPolicy("sliding", aggregate="max").combine(logits).tolist() == [3.0, 2.0, 3.0]
+    assert TruncationPolicy("sliding").combine(logits[:1]).tolist() == [1.0, 0.0, 3.0]
+
+
+def test_invalid_policies_are_rejected():
+    for kwargs in ({"mode": "bogus"}, {"aggregate": "median"}, {"max_tokens": 0}, {"window": 0},
+                   {"stride": 0}, {"max_tokens": -5}, {"mode": ""}):
+        with pytest.raises(ValueError):
+            TruncationPolicy(**kwargs)
+
+
+def test_keys_and_cache_namespaces():
+    default = TruncationPolicy("first_n", max_tokens=512)
+    assert TruncationPolicy("first_n", max_tokens=4096).key == default.key == "first_n-512"
+    sliding = TruncationPolicy("sliding", max_tokens=1024, window=256, stride=128, aggregate="max")
+    assert sliding.key == "sliding-256-128-max-1024"
+    assert cache_model(None, default) == cache_model(default, default) == "finbert"
+    assert cache_model(sliding, default) == "finbert/sliding-256-128-max-1024"
@@ -0,0 +1,60 @@
+"""
+UTC timestamp helpers.
+
+Dates are stored twice: a display string in UTC ('YYYY-MM-DD HH:MM:SS')
+and an indexed integer epoch (published_ts) that date filters and ordering
+use. Naive inputs are taken to be UTC.
+"""
+
+import calendar
+import datetime
+import time
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def now_ts():
+    return int(time.time())
+
+
+def struct_time_ts(value):
+    """Epoch of a UTC struct_time (as feedparser returns); time.mktime would assume local time"""
+    return calendar.timegm(value)
+
+
+def parse_ts(value):
+    """Epoch seconds from an epoch number, a datetime or an ISO-like string; None if unparseable"""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value) if value > 0 else None
+    if isinstance(value, datetime.datetime):
+        dt = value
+    else:
+        text = str(value).strip()
+        if not text:
+            return None
+        try:
+            dt = datetime.datetime.fromisoformat(text.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=datetime.timezone.utc)
+    return int(dt.timestamp())
+
+
+def format_ts(ts):
+    """UTC display string of an epoch"""
+    return time.strftime(DATE_FORMAT, time.gmtime(ts))
+
+
+def day_start_ts(day):
+    """Epoch of 00:00:00 UTC on a YYYY-MM-DD day"""
+    return calendar.timegm(datetime.datetime.strptime(day, "%Y-%m-%d").timetuple())
+
+
+def day_end_ts(day):
+    """Epoch of 23:59:59 UTC on a YYYY-MM-DD day"""
+    return day_start_ts(day) + 86399
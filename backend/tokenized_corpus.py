@@ -0,0 +1,194 @@
+"""
+Pre-tokenized corpora for repeated FinBERT runs.
+
+Benchmark runs and full-table rescoring tokenize the same articles every
+time. A corpus stores their FinBERT token ids once, as flat memory-mapped
+NumPy arrays, per tokenizer revision:
+
+    data/tokenized/<tokenizer revision>/<name>-<build>.ids.npy      int32, all sequences back to back
+    data/tokenized/<tokenizer revision>/<name>-<build>.offsets.npy  int64, sequence i = ids[offsets[i]:offsets[i+1]]
+    data/tokenized/<tokenizer revision>/<name>-<build>.hashes.npy   text hash of each sequence (as in the result cache)
+    data/tokenized/<tokenizer revision>/<name>.json                 metadata, written last (points at the build)
+
+Sequences are looked up by text hash, so callers pass plain texts and only
+the ones missing from the corpus are tokenized. They hold the content
+tokens of the whole text (no special tokens, no truncation), so any
+truncation policy can cut its windows from them. Attention masks are not
+stored: an unpadded sequence's mask is all ones, and the padded mask is
+built with the batch.
+
+Build the corpus of the news table (used by reanalysis):
+    python tokenized_corpus.py build news
+"""
+
+import argparse
+import json
+import os
+import re
+import time
+
+import numpy as np
+
+from sentiment_cache import normalize_text, text_hash
+
+TOKENIZED_DIR = os.getenv(
+    "TOKENIZED_CORPUS_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "tokenized"),
+)
+# Texts tokenized per call while building
+BUILD_CHUNK_SIZE = 2000
+# Bumped when the stored sequences change meaning; older builds are ignored
+CORPUS_FORMAT = 2
+
+
+def _revision_dir(tokenizer_revision):
+    return os.path.join(TOKENIZED_DIR, re.sub(r"[^A-Za-z0-9_.-]+", "_", tokenizer_revision))
+
+
+def _meta_path(tokenizer_revision, name):
+    return os.path.join(_revision_dir(tokenizer_revision), f"{name}.json")
+
+
+class TokenizedCorpus:
+    """Read-only, memory-mapped token ids of a set of texts"""
+
+    def __init__(self, meta, input_ids, offsets, hashes):
+        self.meta = meta
+        self.input_ids = input_ids
+        self.offsets = offsets
+        self.lengths = np.diff(offsets)
+        self._index = {h: i for i, h in enumerate(hashes.tolist())}
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def tokenizer_revision(self):
+        return self.meta["tokenizer_revision"]
+
+    def find(self, texts):
+        """Corpus position of each text, or None where the text is not in the corpus"""
+        return [self._index.get(text_hash(text).encode("ascii")) for text in texts]
+
+    def sequence(self, i):
+        """Token ids of sequence i: a view into the memory map, nothing is copied"""
+        return self.input_ids[self.offsets[i]:self.offsets[i + 1]]
+
+
+def current_build(tokenizer_revision, name):
+    """Build id the corpus metadata points at, or None if there is no corpus (cheap: reads the metadata only)"""
+    try:
+        with open(_meta_path(tokenizer_revision, name)) as f:
+            return json.load(f).get("build")
+    except (OSError, ValueError):
+        return None
+
+
+def load_corpus(tokenizer_revision, name):
+    """The corpus built under this tokenizer revision, or None if there is none"""
+    meta_path = _meta_path(tokenizer_revision, name)
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get("tokenizer_revision") != tokenizer_revision or meta.get("format") != CORPUS_FORMAT:
+        return None
+    prefix = os.path.join(os.path.dirname(meta_path), meta["build"])
+    try:
+        return TokenizedCorpus(
+            meta,
+            np.load(prefix + ".ids.npy", mmap_mode="r"),
+            np.load(prefix + ".offsets.npy", mmap_mode="r"),
+            np.load(prefix + ".hashes.npy"),
+        )
+    except OSError:
+        return None
+
+
+def build_corpus(ai, name, texts):
+    """Tokenize the distinct texts with ai's FinBERT tokenizer and store them as corpus name"""
+    started = time.perf_counter()
+    unique = {}
+    for text in texts:
+        unique.setdefault(text_hash(text), normalize_text(text))
+    hashes = list(unique)
+
+    offsets = np.zeros(len(hashes) + 1, dtype=np.int64)
+    chunks = []
+    for start in range(0, len(hashes), BUILD_CHUNK_SIZE):
+        chunk = [unique[h] for h in hashes[start:start + BUILD_CHUNK_SIZE]]
+        for i, ids in enumerate(ai.tokenize_finbert(chunk), start):
+            offsets[i + 1] = offsets[i] + len(ids)
+            chunks.append(np.asarray(ids, dtype=np.int32))
+
+    revision = ai.tokenizer_revision
+    directory = _revision_dir(revision)
+    os.makedirs(directory, exist_ok=True)
+    build = f"{name}-{int(time.time() * 1000)}"
+    prefix = os.path.join(directory, build)
+    np.save(prefix + ".ids.npy", np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int32))
+    np.save(prefix + ".offsets.npy", offsets)
+    np.save(prefix + ".hashes.npy", np.array(hashes, dtype="S64"))
+
+    meta = {"tokenizer_revision": revision, "format": CORPUS_FORMAT, "build": build,
+            "count": len(hashes), "tokens": int(offsets[-1])}
+    meta_path = _meta_path(revision, name)
+    previous = None
+    try:
+        with open(meta_path) as f:
+            previous = json.load(f).get("build")
+    except (OSError, ValueError):
+        pass
+    with open(meta_path + ".tmp", "w") as f:
+        json.dump(meta, f)
+    # The metadata switch is atomic; readers holding the previous build's maps keep them
+    os.replace(meta_path + ".tmp", meta_path)
+    if previous and previous != build:
+        for suffix in (".ids.npy", ".offsets.npy", ".hashes.npy"):
+            try:
+                os.remove(os.path.join(directory, previous + suffix))
+            except OSError:
+                pass
+    print(f"🧩 Tokenized corpus '{name}': {meta['count']} texts, {meta['tokens']} tokens "
+          f"in {time.perf_counter() - started:.1f}s ({revision})")
+    return load_corpus(revision, name)
+
+
+def load_or_build(ai, name, texts):
+    """The stored corpus if it covers every text, else a fresh build over texts"""
+    corpus = load_corpus(ai.tokenizer_revision, name)
+    if corpus is not None and None not in corpus.find(texts):
+        return corpus
+    return build_corpus(ai, name, texts)
+
+
+def news_texts(db):
+    """Texts of the news rows as reanalysis scores them"""
+    from models import News
+    rows = db.query(News.title, News.summary).order_by(News.id).yield_per(5000)
+    return [text for text in (f"{title or ''} {summary or ''}".strip() for title, summary in rows) if text]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-tokenized corpora for FinBERT")
+    parser.add_argument("command", choices=["build", "info"])
+    parser.add_argument("name", choices=["news"])
+    args = parser.parse_args()
+
+    from engine_provider import get_engine
+    ai = get_engine()
+    if args.command == "build":
+        from database import SessionLocal
+        db = SessionLocal()
+        try:
+            build_corpus(ai, args.name, news_texts(db))
+        finally:
+            db.close()
+        return
+    corpus = load_corpus(ai.tokenizer_revision, args.name)
+    print(corpus.meta if corpus is not None else f"No '{args.name}' corpus for {ai.tokenizer_revision}")
+
+
+if __name__ == "__main__":
+    main()
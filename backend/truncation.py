@@ -0,0 +1,129 @@
+"""
+FinBERT truncation policies.
+
+FinBERT reads at most 512 tokens, and attention cost grows with the square
+of the sequence length. A policy decides which tokens of an article the
+model sees, under a hard per-article token budget (max_tokens, special
+tokens included), so the worst-case work per article is fixed:
+
+- headline: the headline only (first line / sentence), at most max_tokens
+- first_n:  the first max_tokens tokens (default; 512 matches the old behaviour)
+- sliding:  windows of `window` tokens every `stride` tokens, as many as the
+            budget allows; their logits are aggregated by mean or max
+
+The defaults come from FINBERT_TRUNCATION, FINBERT_MAX_TOKENS,
+FINBERT_WINDOW_TOKENS, FINBERT_WINDOW_STRIDE and FINBERT_WINDOW_AGGREGATE.
+A policy's key is part of the FinBERT revision, so results computed under
+another policy are neither served from the cache nor kept by reanalysis.
+"""
+
+import os
+import re
+
+# Longest sequence (special tokens included) FinBERT accepts
+MODEL_MAX_TOKENS = 512
+POLICIES = ("headline", "first_n", "sliding")
+AGGREGATES = ("mean", "max")
+# [CLS] and [SEP] around every window
+SPECIAL_TOKENS = 2
+
+FINBERT_TRUNCATION = os.getenv("FINBERT_TRUNCATION", "first_n")
+FINBERT_MAX_TOKENS = int(os.getenv("FINBERT_MAX_TOKENS", str(MODEL_MAX_TOKENS)))
+FINBERT_WINDOW_TOKENS = int(os.getenv("FINBERT_WINDOW_TOKENS", "256"))
+FINBERT_WINDOW_STRIDE = int(os.getenv("FINBERT_WINDOW_STRIDE", "128"))
+FINBERT_WINDOW_AGGREGATE = os.getenv("FINBERT_WINDOW_AGGREGATE", "mean")
+
+# Characters tokenized per budgeted token: text far beyond the budget is never tokenized
+_CHARS_PER_TOKEN = 20
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+class TruncationPolicy:
+    """Which tokens of an article FinBERT scores, and how window results are combined"""
+
+    def __init__(self, mode=None, max_tokens=None, window=None, stride=None, aggregate=None):
+        # None means "not given"; explicit values (0, "") are validated, not replaced by defaults
+        self.mode = (FINBERT_TRUNCATION if mode is None else mode).strip().lower()
+        self.max_tokens = int(FINBERT_MAX_TOKENS if max_tokens is None else max_tokens)
+        self.window = int(FINBERT_WINDOW_TOKENS if window is None else window)
+        self.stride = int(FINBERT_WINDOW_STRIDE if stride is None else stride)
+        self.aggregate = (FINBERT_WINDOW_AGGREGATE if aggregate is None else aggregate).strip().lower()
+        if self.mode not in POLICIES:
+            raise ValueError(f"truncation must be one of {', '.join(POLICIES)}")
+        if self.aggregate not in AGGREGATES:
+            raise ValueError(f"aggregate must be one of {', '.join(AGGREGATES)}")
+        if self.max_tokens <= SPECIAL_TOKENS or self.window <= SPECIAL_TOKENS or self.stride < 1:
+            raise ValueError(f"max_tokens and window must exceed {SPECIAL_TOKENS}, stride must be positive")
+
+    @property
+    def key(self):
+        """Stable identifier of the policy, used in revisions and cache keys"""
+        if self.mode == "sliding":
+            return f"sliding-{self._window_size()}-{self.stride}-{self.aggregate}-{self.max_tokens}"
+        return f"{self.mode}-{min(self.max_tokens, MODEL_MAX_TOKENS)}"
+
+    def to_dict(self):
+        return {
+            "mode": self.mode,
+            "max_tokens": self.max_tokens,
+            "window": self.window,
+            "stride": self.stride,
+            "aggregate": self.aggregate,
+            "key": self.key,
+        }
+
+    def _window_size(self):
+        return min(self.window, self.max_tokens, MODEL_MAX_TOKENS)
+
+    def _max_windows(self):
+        return max(1, self.max_tokens // self._window_size())
+
+    def prepare_text(self, text):
+        """The part of text the policy tokenizes at all"""
+        text = str(text) if text is not None else ""
+        if self.mode == "headline":
+            lines = [line for line in text.strip().splitlines() if line.strip()]
+            text = _SENTENCE_END.split(lines[0].strip(), 1)[0] if lines else ""
+        if self.mode == "sliding":
+            covered = (self._max_windows() - 1) * self.stride + self._window_size()
+        else:
+            covered = min(self.max_tokens, MODEL_MAX_TOKENS)
+        return text[:covered * _CHARS_PER_TOKEN]
+
+    def windows(self, ids):
+        """
+        Slices of ids (content token ids, no special tokens) the model reads, each at most
+        the window size minus the special tokens; together within max_tokens
+        """
+        if self.mode != "sliding":
+            return [ids[:min(self.max_tokens, MODEL_MAX_TOKENS) - SPECIAL_TOKENS]]
+        size = self._window_size() - SPECIAL_TOKENS
+        stride = min(self.stride, size)
+        starts = [0]
+        while starts[-1] + size < len(ids) and len(starts) < self._max_windows():
+            starts.append(starts[-1] + stride)
+        return [ids[start:start + size] for start in starts]
+
+    def combine(self, logits):
+        """One row of logits from the rows of an article's windows (a NumPy array)"""
+        if len(logits) == 1:
+            return logits[0]
+        return logits.max(axis=0) if self.aggregate == "max" else logits.mean(axis=0)
+
+
+_default_policy = None
+
+
+def default_policy():
+    """The policy configured by the FINBERT_* environment variables"""
+    global _default_policy
+    if _default_policy is None:
+        _default_policy = TruncationPolicy()
+    return _default_policy
+
+
+def cache_model(policy, default):
+    """Result cache namespace of FinBERT results under policy ("finbert" for the engine's default)"""
+    if policy is None or policy.key == default.key:
+        return "finbert"
+    return f"finbert/{policy.key}"
@@ -21,10 +21,22 @@ class LiveNewsController extends GetxController {
   var finbertNegativeCount = 0.obs;
   var finbertNeutralCount = 0.obs;
 
+  // Live news stream (server-sent events); resumes after the last received id.
+  // Null until anything is received: the stream then starts from now instead
+  // of replaying the whole live news table.
+  http.Client? _streamClient;
+  int? _lastStreamId;
+
   @override
   void onInit() {
     super.onInit();
-    fetchLiveNews();
+    fetchLiveNews().then((_) => _listenForLiveNews());
+  }
+
+  @override
+  void onClose() {
+    _streamClient?.close();
+    super.onClose();
   }
 
   Future<void> fetchLiveNews() async {
@@ -43,6 +55,7 @@ class LiveNewsController extends GetxController {
             .map((json) => LiveNewsModel.fromJson(json))
             .toList();
         news.assignAll(newItems);
+        newItems.forEach(_rememberId);
 
         // Update sentiment stats based on ALL current news
         _updateSentimentStats(news); // Recalculate stats for the entire list
@@ -54,6 +67,52 @@ class LiveNewsController extends GetxController {
     }
   }
 
+  // Receive newly scored news as the backend stores it instead of refetching the list
+  Future<void> _listenForLiveNews() async {
+    while (!isClosed) {
+      _streamClient = http.Client();
+      try {
+        final query = _lastStreamId == null ? '' : '?last_id=$_lastStreamId';
+        final request = http.Request(
+          'GET',
+          Uri.parse('${ApiConstants.baseUrl}/api/live_news/stream$query'),
+        );
+        final response = await _streamClient!.send(request);
+        String? eventData;
+        await for (final line in response.stream
+            .transform(utf8.decoder)
+            .transform(const LineSplitter())) {
+          if (line.startsWith('data:')) {
+            eventData = line.substring(5).trim();
+          } else if (line.isEmpty && eventData != null) {
+            _addStreamedNews(LiveNewsModel.fromJson(json.decode(eventData)));
+            eventData = null;
+          }
+        }
+      } catch (e) {
+        print('Live news stream disconnected: $e');
+      } finally {
+        _streamClient?.close();
+      }
+      if (!isClosed) await Future.delayed(const Duration(seconds: 3));
+    }
+  }
+
+  void _rememberId(LiveNewsModel item) {
+    final lastId = _lastStreamId;
+    if (lastId == null || item.id > lastId) _lastStreamId = item.id;
+  }
+
+  void _addStreamedNews(LiveNewsModel item) {
+    _rememberId(item);
+    if (news.any((existing) => existing.id == item.id)) return;
+    news.insert(0, item);
+    if (news.length > newsLimit.value) {
+      news.removeRange(newsLimit.value, news.length);
+    }
+    _updateSentimentStats(news);
+  }
+
   // Method to update sentiment stats
   void _updateSentimentStats(List<LiveNewsModel> newsList) {
     int vaderPos = 0, vaderNeg = 0, vaderNeut = 0;
@@ -98,11 +157,20 @@ class LiveNewsController extends GetxController {
   Future<void> syncLiveNews() async {
     try {
       isSyncing.value = true;
-      await http.post(
-        Uri.parse('${ApiConstants.baseUrl}/api/fetch_live_news'),
-        body: {'limit': '5'},
+      final response = await http.post(
+        Uri.parse('${ApiConstants.baseUrl}/api/fetch_live_news?limit=5'),
       );
-      await fetchLiveNews(); // Refresh the news after sync
+      // The sync runs in the background; poll its job until it finishes
+      final jobId = json.decode(response.body)['job_id'];
+      var status = json.decode(response.body)['status'];
+      for (var i = 0; i < 60 && status != 'done' && status != 'error'; i++) {
+        await Future.delayed(const Duration(seconds: 1));
+        final jobResponse = await http.get(
+          Uri.parse('${ApiConstants.baseUrl}/api/fetch_live_news/$jobId'),
+        );
+        status = json.decode(jobResponse.body)['status'];
+      }
+      // New items arrive through the live news stream, no refetch needed
     } catch (e) {
       print('Error syncing live news: $e');
     } finally {
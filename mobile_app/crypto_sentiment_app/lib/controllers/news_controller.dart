@@ -15,7 +15,8 @@ class NewsController extends GetxController {
   var selectedCoin = 'All'.obs;
 
   static const int _pageSize = 20;
-  int _currentPage = 0;
+  // Opaque keyset cursor returned by /api/news; empty requests the first page
+  String _nextCursor = '';
 
   @override
   void onInit() {
@@ -30,20 +31,19 @@ class NewsController extends GetxController {
         isLoadingMore(true);
       } else {
         isLoading(true);
-        _currentPage = 0;
+        _nextCursor = '';
         newsList.clear();
         hasMore(true);
       }
 
       // Using 10.0.2.2 for Android emulator to access host machine
       String url = '${ApiConstants.baseUrl}/api/news';
-      final skip = _currentPage * _pageSize;
 
       final queryParams = <String>[];
       if (coin != null && coin != 'All') {
         queryParams.add('q=${Uri.encodeComponent(coin)}');
       }
-      queryParams.add('skip=$skip');
+      queryParams.add('cursor=${Uri.encodeComponent(_nextCursor)}');
       queryParams.add('limit=$_pageSize');
 
       if (queryParams.isNotEmpty) {
@@ -56,7 +56,8 @@ class NewsController extends GetxController {
       );
 
       if (response.statusCode == 200) {
-        final List<dynamic> jsonData = json.decode(response.body);
+        final Map<String, dynamic> page = json.decode(response.body);
+        final List<dynamic> jsonData = page['items'];
         final newItems = jsonData
             .map((item) => NewsModel.fromJson(item))
             .toList();
@@ -67,11 +68,12 @@ class NewsController extends GetxController {
           newsList.value = newItems;
         }
 
-        // Check if there are more items
-        if (newItems.length < _pageSize) {
+        // The server returns no cursor after the last page
+        final String? nextCursor = page['next_cursor'];
+        if (nextCursor == null) {
           hasMore(false);
         } else {
-          _currentPage++;
+          _nextCursor = nextCursor;
         }
       } else {
         Get.snackbar(
@@ -1,6 +1,6 @@
 "use client";
 
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import axios from "axios";
 import { RefreshCw, ExternalLink, Radio, Calendar } from "lucide-react";
 import Sidebar from "../components/Sidebar";
@@ -30,12 +30,43 @@ export default function LivePage() {
   const [error, setError] = useState<string | null>(null);
   const [newsCount, setNewsCount] = useState<number>(20); // Default to 20 news items
   const [filteredNews, setFilteredNews] = useState<LiveNewsItem[]>([]);
+  // Read by the stream listener, which outlives renders: refs, not state, so they never go stale
+  const lastIdRef = useRef<number | null>(null); // newest id received; null until anything arrives
+  const newsCountRef = useRef(newsCount);
+  newsCountRef.current = newsCount;
+
+  const rememberId = (id: number) => {
+    if (lastIdRef.current === null || id > lastIdRef.current) lastIdRef.current = id;
+  };
 
   // Fetch live news on component mount
   useEffect(() => {
     fetchLiveNews();
   }, []);
 
+  // Receive newly scored news as the backend stores it (server-sent events);
+  // EventSource reconnects on its own and resumes after the last received id.
+  // With nothing seen yet last_id is omitted, so the stream starts from now
+  // instead of replaying the whole live news table.
+  useEffect(() => {
+    if (loading) return;
+    const query =
+      lastIdRef.current === null ? "" : `?last_id=${lastIdRef.current}`;
+    const source = new EventSource(
+      `http://127.0.0.1:8000/api/live_news/stream${query}`
+    );
+    source.addEventListener("live_news", (event) => {
+      const item: LiveNewsItem = JSON.parse((event as MessageEvent).data);
+      rememberId(item.id);
+      setNews((prev) =>
+        prev.some((existing) => existing.id === item.id)
+          ? prev
+          : [item, ...prev].slice(0, newsCountRef.current)
+      );
+    });
+    return () => source.close();
+  }, [loading]);
+
   // Update filtered news when news changes
   useEffect(() => {
     setFilteredNews([...news]);
@@ -51,6 +82,7 @@ export default function LivePage() {
 
       const response = await axios.get<LiveNewsItem[]>(url);
       setNews(response.data);
+      response.data.forEach((item) => rememberId(item.id));
       // The filtered news will be set by the useEffect when news changes
     } catch (err) {
       console.error("Error fetching live news:", err);
@@ -69,13 +101,23 @@ export default function LivePage() {
       setSyncing(true);
       setError(null);
 
-      // Trigger the sync endpoint with a limit of 5
-      await axios.post("http://127.0.0.1:8000/api/fetch_live_news", null, {
-        params: { limit: 5 },
-      });
+      // Trigger the sync endpoint with a limit of 5 (returns a job id immediately)
+      const { data: job } = await axios.post(
+        "http://127.0.0.1:8000/api/fetch_live_news",
+        null,
+        { params: { limit: 5 } }
+      );
 
-      // After sync, refresh the news with current date filters
-      await fetchLiveNews();
+      // Keep the sync indicator on until the job has analyzed and stored its news
+      let status = job.status;
+      for (let i = 0; i < 60 && status !== "done" && status !== "error"; i++) {
+        await new Promise((resolve) => setTimeout(resolve, 1000));
+        const { data } = await axios.get(
+          `http://127.0.0.1:8000/api/fetch_live_news/${job.job_id}`
+        );
+        status = data.status;
+      }
+      // New items arrive through the live news stream, no refetch needed
     } catch (err) {
       console.error("Error syncing live news:", err);
       setError(
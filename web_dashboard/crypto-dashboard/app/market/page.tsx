@@ -44,9 +44,10 @@ export default function MarketPage() {
 
         const promises = coins.map(async (coin) => {
           try {
+            // Coin tags are assigned at ingest, so this is an indexed lookup
             const response = await axios.get(
-              `http://127.0.0.1:8000/api/stats?q=${encodeURIComponent(
-                coin.name
+              `http://127.0.0.1:8000/api/stats?coin=${encodeURIComponent(
+                coin.symbol
               )}`
             );
             return {